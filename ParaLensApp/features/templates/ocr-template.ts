@@ -1,3 +1,5 @@
+// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.
+
 import { TemplateLayout } from './use-template-layout';
 import { loadTemplateConfig } from './template';
 import type { ExpectedUnitConfig } from '@/features/ocr';
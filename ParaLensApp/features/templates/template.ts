@@ -1,3 +1,5 @@
+// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.
+
 import type { ExpectedUnitConfig } from '@/features/ocr';
 
 interface TemplateBox{
@@ -13,6 +15,7 @@ interface TemplateBox{
     cells?: number;
     valuesRegion?: { x: number; y: number; width: number; height: number };
     checkboxThreshold?: number;
+    blackRatioMin?: number;
     readValue?: boolean;
     valueBoxId?: string;
     single?: boolean;
@@ -34,40 +37,212 @@ enum TemplateLayout {
   CylinderHeating = 'CylinderHeating',
 }
 
-// Statically require all JSON files so Metro can bundle them
+// Normalisierte Geometrie (0..1 des Screens), je Box x, y, Breite, Höhe hintereinander
+const TEMPLATE_GEOMETRY: Record<TemplateLayout, readonly number[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    0.0154, 0.0462, 0.0439, 0.0348, 0.016, 0.1109, 0.0422, 0.0344,
+    0.0151, 0.1756, 0.0445, 0.033, 0.0162, 0.2398, 0.0427, 0.0335,
+    0.0146, 0.3695, 0.0445, 0.0326, 0.0156, 0.4337, 0.0433, 0.0339,
+    0.0145, 0.4983, 0.0439, 0.0344, 0.0156, 0.5623, 0.0427, 0.0326,
+    0.0159, 0.6256, 0.0427, 0.0326, 0.0154, 0.6876, 0.0433, 0.033,
+    0.0979, 0.0004, 0.0436, 0.0337, 0.94, 0.0458, 0.0448, 0.0351,
+    0.941, 0.1122, 0.0448, 0.0337, 0.941, 0.1762, 0.0438, 0.0323,
+    0.939, 0.2393, 0.0476, 0.0337, 0.9429, 0.3055, 0.041, 0.0323,
+    0.939, 0.3697, 0.0467, 0.0344, 0.94, 0.4343, 0.0457, 0.0344,
+    0.9405, 0.4981, 0.0438, 0.0344, 0.9424, 0.5621, 0.0429, 0.0337,
+    0.94, 0.6249, 0.0457, 0.0344, 0.0842, 0.9515, 0.1676, 0.0479,
+    0.3053, 0.9502, 0.1684, 0.0473, 0.5283, 0.9509, 0.1668, 0.0467,
+    0.7482, 0.9516, 0.1701, 0.0467,
+  ],
+  [TemplateLayout.Injection]: [
+    0.7365, 0.4198, 0.1264, 0.0275, 0.7921, 0.5061, 0.0286, 0.0209,
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    0.0772, 0.7237, 0.0399, 0.067, 0.0776, 0.7228, 0.8492, 0.0682,
+    0.8576, 0.7236, 0.0681, 0.0666,
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    0.1261, 0.1383, 0.027, 0.0202, 0.7255, 0.1618, 0.1375, 0.0276,
+    0.1246, 0.2529, 0.027, 0.0214, 0.7327, 0.278, 0.1093, 0.0293,
+    0.1242, 0.3131, 0.0277, 0.0202, 0.734, 0.3376, 0.1253, 0.0282,
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    0.7369, 0.3701, 0.1084, 0.0321, 0.7356, 0.5291, 0.1084, 0.0331,
+    0.7405, 0.6485, 0.1245, 0.0341,
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    0.0826, 0.725, 0.0292, 0.0683, 0.0835, 0.725, 0.8425, 0.0683,
+  ],
+  [TemplateLayout.Dosing]: [
+    0.7127, 0.3666, 0.1424, 0.0282, 0.7245, 0.4364, 0.1068, 0.0259,
+    0.349, 0.6051, 0.0864, 0.0233, 0.7166, 0.6041, 0.1356, 0.0271,
+    0.7244, 0.6567, 0.1503, 0.031, 0.7242, 0.688, 0.1526, 0.0328,
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    0.0616, 0.626, 0.049, 0.0636, 0.0817, 0.6264, 0.8465, 0.0629,
+    0.0636, 0.7241, 0.046, 0.0674, 0.0832, 0.7211, 0.8455, 0.072,
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    0.3173, 0.34, 0.571, 0.0351,
+  ],
+};
 
-import screenDetection from "./0.12 Bildschirmaufbau_Screendetection.json";
+const TEMPLATE_IDS: Record<TemplateLayout, readonly string[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    "box_1", "box_2", "box_3", "box_4",
+    "box_5", "box_6", "box_7", "box_8",
+    "box_9", "box_10", "box_11", "box_12",
+    "box_13", "box_14", "box_15", "box_16",
+    "box_17", "box_18", "box_19", "box_20",
+    "box_21", "box_22", "box_23", "box_24",
+    "box_25",
+  ],
+  [TemplateLayout.Injection]: [
+    "spray_pessure_limit", "increase_specific_point_printer_checkbox",
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    "injection_speed_start", "injection_speed_items", "injection_speed_end",
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    "transshipment_position_checkbox", "transshipment_position", "switch_over_time_checkbox", "switch_over_time",
+    "switching_pressure_checkbox", "switching_pressure",
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    "holding_pressure_time", "cooling_time", "screw_diameter",
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    "specific_back_pressure_start", "specific_back_pressure_items",
+  ],
+  [TemplateLayout.Dosing]: [
+    "dosing_stroke", "dosing_delay_time", "relieve_dosing", "relieve_after_dosing",
+    "discharge_speed_before", "discharge_speed_after",
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    "dosing_speed_start", "dosing_speed_items", "specific_back_pressure_start", "specific_back_pressure_items",
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    "cylinder_heating_items",
+  ],
+};
 
-const injection: TemplateBox[] = require("./1. Einspritzen.json");
-const injectionSpeedScroll: TemplateBox[] = require(
-  "./1.1 Einspritzgeschwindigkeit_ScrollBar.json",
-);
-const injectionSwitchType: TemplateBox[] = require(
-  "./1.2 Umschaltart_Switch.json",
-);
-const holdingPressure: TemplateBox[] = require("./2. Nachdruck.json");
-const holdingPressureScroll: TemplateBox[] = require(
-  "./2.1 Nachdruck_ScrollBar.json",
-);
-const dosing: TemplateBox[] = require("./3. Dosieren.json");
-const dosingScroll: TemplateBox[] = require("./3.1 Dosieren_ScrollBar.json");
-const cylinderHeating: TemplateBox[] = require("./4. ZylinerHeizung.json");
+const TEMPLATE_LABELS: Record<TemplateLayout, readonly string[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    "Box 1", "Box 2", "Box 3",
+    "Box 4", "Box 5", "Box 6",
+    "Box 7", "Box 8", "Box 9",
+    "Box 10", "Box 11", "Box 12",
+    "Box 13", "Box 14", "Box 15",
+    "Box 16", "Box 17", "Box 18",
+    "Box 19", "Box 20", "Box 21",
+    "Box 22", "Box 23", "Box 24",
+    "Box 25",
+  ],
+  [TemplateLayout.Injection]: [
+    "Spray Pessure Limit", "Increase Specific Point Printer Checkbox",
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    "Injection Speed Start", "Injection Speed Items", "Injection Speed End",
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    "Transshipment Position Checkbox", "Transshipment Position", "Switch Over Time Checkbox",
+    "Switch Over Time", "Switching Pressure Checkbox", "Switching Pressure",
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    "Holding Pressure Time", "Cooling Time", "Screw Diameter",
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    "Specific Back Pressure Start", "Specific Back Pressure Items",
+  ],
+  [TemplateLayout.Dosing]: [
+    "Dosing Stroke", "Dosing Delay Time", "Relieve Dosing",
+    "Relieve After Dosing", "Discharge Speed Before", "Discharge Speed After",
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    "Dosing Speed Start", "Dosing Speed Items", "Specific Back Pressure Start",
+    "Specific Back Pressure Items",
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    "Cylinder Heating Items",
+  ],
+};
 
-const TEMPLATE_DATA: Record<TemplateLayout, TemplateBox[]> = {
-  [TemplateLayout.ScreenDetection]: screenDetection,
-  [TemplateLayout.Injection]: injection,
-  [TemplateLayout.InjectionSpeed_ScrollBar]: injectionSpeedScroll,
-  [TemplateLayout.Injection_SwitchType]: injectionSwitchType,
-  [TemplateLayout.HoldingPressure]: holdingPressure,
-  [TemplateLayout.HoldingPressure_ScrollBar]: holdingPressureScroll,
-  [TemplateLayout.Dosing]: dosing,
-  [TemplateLayout.Dosing_ScrollBar]: dosingScroll,
-  [TemplateLayout.CylinderHeating]: cylinderHeating,
+// OCR-Felder je Box-ID (nur Boxen, die welche haben)
+const TEMPLATE_FIELDS: Partial<Record<TemplateLayout, Record<string, Partial<TemplateBox>>>> = {
+  [TemplateLayout.Injection]: {
+    "spray_pessure_limit": {"expectedUnits": {"imperial": {"absolute": "psi", "relative": "psi"}, "iso": {"absolute": "bar", "relative": "bar"}}, "type": "value"},
+    "increase_specific_point_printer_checkbox": {"options": {"checkboxThreshold": 214.0, "readValue": false}, "type": "checkbox"},
+  },
+  [TemplateLayout.InjectionSpeed_ScrollBar]: {
+    "injection_speed_start": {"type": "value"},
+    "injection_speed_items": {"expectedKeyUnits": {"imperial": {"absolute": "in^3", "relative": "in"}, "iso": {"absolute": "cm^3", "relative": "mm"}}, "expectedUnits": {"imperial": {"absolute": "in^3/s", "relative": "in/s"}, "iso": {"absolute": "cm^3/s", "relative": "mm/s"}}, "options": {"cells": 10, "orientation": "horizontal", "valuesRegion": {"height": 6.0, "width": 84.92, "x": 7.76, "y": 79.1}}, "type": "scrollbar"},
+    "injection_speed_end": {"type": "value"},
+  },
+  [TemplateLayout.Injection_SwitchType]: {
+    "transshipment_position_checkbox": {"options": {"blackRatioMin": 0.3, "readValue": true, "valueBoxId": "transshipment_position"}, "type": "checkbox"},
+    "transshipment_position": {"expectedUnits": {"imperial": {"absolute": "in^3", "relative": "in"}, "iso": {"absolute": "cm^3", "relative": "mm"}}, "type": "value"},
+    "switch_over_time_checkbox": {"options": {"blackRatioMin": 0.3, "readValue": true, "valueBoxId": "switch_over_time"}, "type": "checkbox"},
+    "switch_over_time": {"expectedUnits": {"imperial": {"absolute": "s", "relative": "s"}, "iso": {"absolute": "s", "relative": "s"}}, "type": "value"},
+    "switching_pressure_checkbox": {"options": {"blackRatioMin": 0.3, "readValue": true, "valueBoxId": "switching_pressure"}, "type": "checkbox"},
+    "switching_pressure": {"expectedUnits": {"imperial": {"absolute": "psi", "relative": "psi"}, "iso": {"absolute": "bar", "relative": "bar"}}, "type": "value"},
+  },
+  [TemplateLayout.HoldingPressure]: {
+    "holding_pressure_time": {"expectedUnits": {"imperial": {"absolute": "s", "relative": "s"}, "iso": {"absolute": "s", "relative": "s"}}, "type": "value"},
+    "cooling_time": {"expectedUnits": {"imperial": {"absolute": "s", "relative": "s"}, "iso": {"absolute": "s", "relative": "s"}}, "type": "value"},
+    "screw_diameter": {"expectedUnits": {"imperial": {"absolute": "in", "relative": "in"}, "iso": {"absolute": "mm", "relative": "mm"}}, "type": "value"},
+  },
+  [TemplateLayout.HoldingPressure_ScrollBar]: {
+    "specific_back_pressure_start": {"type": "value"},
+    "specific_back_pressure_items": {"expectedKeyUnits": {"imperial": {"absolute": "s", "relative": "s"}, "iso": {"absolute": "s", "relative": "s"}}, "expectedUnits": {"imperial": {"absolute": "psi", "relative": "psi"}, "iso": {"absolute": "bar", "relative": "bar"}}, "options": {"cells": 10, "orientation": "horizontal", "valuesRegion": {"height": 6.0, "width": 84.25, "x": 8.35, "y": 79.33}}, "type": "scrollbar"},
+  },
+  [TemplateLayout.Dosing]: {
+    "dosing_stroke": {"expectedUnits": {"imperial": {"absolute": "in^3", "relative": "in"}, "iso": {"absolute": "cm^3", "relative": "mm"}}, "type": "value"},
+    "dosing_delay_time": {"expectedUnits": {"imperial": {"absolute": "s", "relative": "s"}, "iso": {"absolute": "s", "relative": "s"}}, "type": "value"},
+    "relieve_dosing": {"sameUnitAs": "relieve_after_dosing", "type": "value"},
+    "relieve_after_dosing": {"expectedUnits": {"imperial": {"absolute": "in^3", "relative": "in"}, "iso": {"absolute": "cm^3", "relative": "mm"}}, "type": "value"},
+    "discharge_speed_before": {"expectedUnits": {"imperial": {"absolute": "in^3/s", "relative": "%"}, "iso": {"absolute": "cm^3/s", "relative": "%"}}, "type": "value"},
+    "discharge_speed_after": {"expectedUnits": {"imperial": {"absolute": "in^3/s", "relative": "%"}, "iso": {"absolute": "cm^3/s", "relative": "%"}}, "type": "value"},
+  },
+  [TemplateLayout.Dosing_ScrollBar]: {
+    "dosing_speed_items": {"expectedKeyUnits": {"imperial": {"absolute": "in^3", "relative": "in^3"}, "iso": {"absolute": "cm^3", "relative": "cm^3"}}, "expectedUnits": {"imperial": {"absolute": "in/s", "relative": "ft/s"}, "iso": {"absolute": "m/s", "relative": "m/s"}}, "options": {"cells": 10, "orientation": "horizontal", "valuesRegion": {"height": 6.0, "width": 84.65, "x": 8.17, "y": 68.93}}, "type": "scrollbar"},
+    "specific_back_pressure_start": {"type": "value"},
+    "specific_back_pressure_items": {"expectedKeyUnits": {"imperial": {"absolute": "in^3", "relative": "in^3"}, "iso": {"absolute": "cm^3", "relative": "cm^3"}}, "expectedUnits": {"imperial": {"absolute": "psi", "relative": "psi"}, "iso": {"absolute": "bar", "relative": "bar"}}, "options": {"cells": 10, "orientation": "horizontal", "valuesRegion": {"height": 6.0, "width": 84.55, "x": 8.32, "y": 79.31}}, "type": "scrollbar"},
+  },
+  [TemplateLayout.CylinderHeating]: {
+    "cylinder_heating_items": {"expectedUnits": {"imperial": {"absolute": "°F", "relative": "°F"}, "iso": {"absolute": "°C", "relative": "°C"}}, "options": {"cells": 6, "orientation": "horizontal", "single": true}, "type": "scrollbar"},
+  },
 };
 
+const TEMPLATE_CACHE: Partial<Record<TemplateLayout, TemplateBox[]>> = {};
+
+// Flache Geometrie ohne Objekt-Erzeugung (z. B. für Overlays): [x0, y0, w0, h0, x1, ...]
+function loadTemplateGeometry(layout: TemplateLayout): readonly number[] {
+  return TEMPLATE_GEOMETRY[layout] ?? [];
+}
+
+function loadTemplateIds(layout: TemplateLayout): readonly string[] {
+  return TEMPLATE_IDS[layout] ?? [];
+}
+
+// Boxen in Prozent wie in den JSON-Templates; werden je Layout einmal gebaut
 function loadTemplateConfig(layout: TemplateLayout): TemplateBox[] {
-  return TEMPLATE_DATA[layout] ?? [];
+  const cached = TEMPLATE_CACHE[layout];
+  if (cached) return cached;
+  const geometry = loadTemplateGeometry(layout);
+  const ids = loadTemplateIds(layout);
+  const labels = TEMPLATE_LABELS[layout] ?? [];
+  const fields = TEMPLATE_FIELDS[layout] ?? {};
+  const boxes: TemplateBox[] = ids.map((id, i) => ({
+    ...fields[id],
+    id,
+    x: geometry[i * 4] * 100,
+    y: geometry[i * 4 + 1] * 100,
+    width: geometry[i * 4 + 2] * 100,
+    height: geometry[i * 4 + 3] * 100,
+    label: labels[i],
+  }));
+  TEMPLATE_CACHE[layout] = boxes;
+  return boxes;
 }
 
 export type { TemplateBox }
-export { TemplateLayout, loadTemplateConfig }
\ No newline at end of file
+export { TemplateLayout, loadTemplateConfig, loadTemplateGeometry, loadTemplateIds }
@@ -0,0 +1,156 @@
+import time
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+BACKEND_NDARRAY = "ndarray"
+BACKEND_UMAT = "umat"
+BACKEND_AUTO = "auto"
+
+BENCHMARK_FRAME_SIZE = (1080, 1920)  # (Breite, Höhe) eines typischen Kamera-Frames
+BENCHMARK_WARMUP = 3
+BENCHMARK_ITERATIONS = 15
+CANNY_LOW = 50
+CANNY_HIGH = 150
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class ArrayBackend:
+    """
+    Führt die Kantenstufe (Graustufen, Canny, Konturen) auf plain ``np.ndarray`` aus.
+
+    Die Konturen sind bei jedem Backend gewöhnliche Arrays, alle folgende Geometrie
+    bleibt davon unberührt.
+    """
+
+    name = BACKEND_NDARRAY
+
+    def detect_contours(
+        self,
+        frame: np.ndarray,
+        gray_dst: Optional[np.ndarray] = None,
+        edges_dst: Optional[np.ndarray] = None,
+        canny_low: int = CANNY_LOW,
+        canny_high: int = CANNY_HIGH,
+    ) -> tuple:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_dst)
+        edges = cv2.Canny(gray, canny_low, canny_high, edges=edges_dst)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+
+class UMatBackend(ArrayBackend):
+    """
+    Kantenstufe über OpenCVs T-API (``cv2.UMat``).
+
+    Mit OpenCL-Laufzeit (auch CPU-OpenCL) verteilt OpenCV ``cvtColor`` und ``Canny``
+    transparent; ohne fällt es auf die normalen CPU-Pfade zurück. Die Zielpuffer des
+    ndarray-Backends werden hier nicht verwendet.
+    """
+
+    name = BACKEND_UMAT
+
+    def detect_contours(
+        self,
+        frame: np.ndarray,
+        gray_dst: Optional[np.ndarray] = None,
+        edges_dst: Optional[np.ndarray] = None,
+        canny_low: int = CANNY_LOW,
+        canny_high: int = CANNY_HIGH,
+    ) -> tuple:
+        gray = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray, canny_low, canny_high)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Aus UMat-Eingaben entstehen UMat-Konturen; die Geometrie arbeitet mit ndarrays.
+        return tuple(contour.get() if isinstance(contour, cv2.UMat) else contour for contour in contours)
+
+
+BACKENDS: Dict[str, ArrayBackend] = {
+    BACKEND_NDARRAY: ArrayBackend(),
+    BACKEND_UMAT: UMatBackend(),
+}
+
+_active_backend: ArrayBackend = BACKENDS[BACKEND_NDARRAY]
+
+
+def get_backend() -> ArrayBackend:
+    return _active_backend
+
+
+def set_backend(backend: ArrayBackend) -> None:
+    global _active_backend  # pylint: disable=global-statement
+    _active_backend = backend
+    cv2.ocl.setUseOpenCL(backend.name == BACKEND_UMAT and cv2.ocl.haveOpenCL())
+
+
+# ---------------------------------------------------------------------------
+# Micro-Benchmark & Auswahl
+# ---------------------------------------------------------------------------
+def make_benchmark_frame(size=BENCHMARK_FRAME_SIZE) -> np.ndarray:
+    """Rauschen mit einigen Rechtecken, damit Canny und findContours realistisch arbeiten."""
+    width, height = size
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (width // 8, height // 8), (width * 7 // 8, height * 7 // 8), (220, 220, 220), -1)
+    for index in range(12):
+        y = height // 6 + index * height // 18
+        cv2.rectangle(frame, (width // 5, y), (width * 4 // 5, y + height // 30), (30, 30, 30), 3)
+    return frame
+
+
+def benchmark_backend(
+    backend: ArrayBackend,
+    frame: np.ndarray,
+    iterations: int = BENCHMARK_ITERATIONS,
+    warmup: int = BENCHMARK_WARMUP,
+) -> float:
+    """Mittlere Laufzeit der Kantenstufe in Millisekunden."""
+    previous = cv2.ocl.useOpenCL()
+    cv2.ocl.setUseOpenCL(backend.name == BACKEND_UMAT and cv2.ocl.haveOpenCL())
+    try:
+        # Aufwärmen: OpenCL kompiliert Kernel beim ersten Aufruf.
+        for _ in range(warmup):
+            backend.detect_contours(frame)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            backend.detect_contours(frame)
+        return (time.perf_counter() - start) / iterations * 1000.0
+    finally:
+        cv2.ocl.setUseOpenCL(previous)
+
+
+def select_backend(name: str = BACKEND_AUTO, sample_frame: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Aktiviert ein Backend und gibt einen kurzen Bericht zurück.
+
+    ``auto`` misst beide Backends auf ``sample_frame`` (oder einem synthetischen Frame)
+    und nimmt das schnellere. UMat kommt dabei nur in Frage, wenn OpenCV eine
+    OpenCL-Laufzeit findet, sonst bringt die T-API keinen Vorteil.
+    """
+    if name != BACKEND_AUTO:
+        if name not in BACKENDS:
+            raise ValueError(f"Unbekanntes Array-Backend '{name}', erlaubt: {', '.join(BACKENDS)}, {BACKEND_AUTO}")
+        set_backend(BACKENDS[name])
+        return {"backend": name, "timings_ms": {}}
+
+    if not cv2.ocl.haveOpenCL():
+        set_backend(BACKENDS[BACKEND_NDARRAY])
+        return {"backend": BACKEND_NDARRAY, "timings_ms": {}}
+
+    frame = sample_frame if sample_frame is not None else make_benchmark_frame()
+    candidates = [BACKEND_NDARRAY, BACKEND_UMAT]
+    timings = {candidate: benchmark_backend(BACKENDS[candidate], frame) for candidate in candidates}
+    best = min(timings, key=timings.get)
+    set_backend(BACKENDS[best])
+    return {"backend": best, "timings_ms": timings}
+
+
+def describe_selection(report: Dict[str, Any]) -> str:
+    timings = ", ".join(f"{name} {value:.1f} ms" for name, value in report["timings_ms"].items())
+    return f"Array-Backend: {report['backend']}" + (f" ({timings})" if timings else "")
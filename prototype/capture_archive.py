@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+HASH_GRID = 16  # dHash über 17x16 Pixel -> 256 Bit
+DEFAULT_MAX_HASH_DISTANCE = 8
+# Verifikation: Grauwert-Miniatur, Blockweise mittlere Abweichung. Ein geänderter
+# Zahlenwert im Screen betrifft nur wenige Blöcke, muss aber trotzdem erkannt werden.
+THUMB_SIZE = (150, 200)
+VERIFY_BLOCK_PX = 10
+DEFAULT_MAX_BLOCK_DIFF = 12.0
+DEFAULT_ARCHIVE_FORMAT = ".webp"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    hash BLOB NOT NULL,
+    thumb BLOB NOT NULL,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL REFERENCES objects (key),
+    timestamp REAL NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_key ON refs (key);
+CREATE INDEX IF NOT EXISTS idx_refs_timestamp ON refs (timestamp);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Perzeptueller Hash & Vergleich
+# ---------------------------------------------------------------------------
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def perceptual_hash(image: np.ndarray) -> np.ndarray:
+    """Differenz-Hash (dHash) als gepacktes uint8-Array mit HASH_GRID² Bits."""
+    small = cv2.resize(_to_gray(image), (HASH_GRID + 1, HASH_GRID), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits.reshape(-1))
+
+
+def make_thumbnail(image: np.ndarray) -> np.ndarray:
+    return cv2.resize(_to_gray(image), THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def hamming_distances(hashes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Hamming-Distanz von ``query`` zu jeder Zeile in ``hashes`` (beide gepackte uint8)."""
+    if hashes.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.unpackbits(np.bitwise_xor(hashes, query), axis=1).sum(axis=1)
+
+
+def max_block_difference(thumb_a: np.ndarray, thumb_b: np.ndarray) -> float:
+    diff = cv2.absdiff(thumb_a, thumb_b).astype(np.float32)
+    height, width = diff.shape
+    rows, cols = height // VERIFY_BLOCK_PX, width // VERIFY_BLOCK_PX
+    blocks = diff[:rows * VERIFY_BLOCK_PX, :cols * VERIFY_BLOCK_PX].reshape(
+        rows, VERIFY_BLOCK_PX, cols, VERIFY_BLOCK_PX
+    )
+    return float(blocks.mean(axis=(1, 3)).max())
+
+
+# ---------------------------------------------------------------------------
+# Inhaltsadressiertes Archiv
+# ---------------------------------------------------------------------------
+class CaptureArchive:
+    """
+    Speichert entzerrte Screens inhaltsadressiert über ihren perzeptuellen Hash.
+
+    Ein neuer Screen wird mit allen gespeicherten Hashes verglichen; liegt ein Kandidat
+    innerhalb ``max_distance`` und stimmen die Miniaturen blockweise überein, wird nur
+    eine Referenz auf das vorhandene Bild angelegt. Bilder werden verlustfrei (WebP/PNG)
+    oder mit einstellbarer Qualität abgelegt.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        image_format: str = DEFAULT_ARCHIVE_FORMAT,
+        quality: Optional[int] = None,
+        max_distance: int = DEFAULT_MAX_HASH_DISTANCE,
+        max_block_diff: float = DEFAULT_MAX_BLOCK_DIFF,
+    ) -> None:
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.image_format = image_format
+        self.max_distance = max_distance
+        self.max_block_diff = max_block_diff
+        self._encode_params = self._encode_params_for(image_format, quality)
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+        self._keys: List[str] = []
+        self._thumbs: List[np.ndarray] = []
+        hashes: List[np.ndarray] = []
+        for key, hash_bytes, thumb_bytes in self._connection.execute("SELECT key, hash, thumb FROM objects"):
+            self._keys.append(key)
+            hashes.append(np.frombuffer(hash_bytes, dtype=np.uint8))
+            self._thumbs.append(np.frombuffer(thumb_bytes, dtype=np.uint8).reshape(THUMB_SIZE[1], THUMB_SIZE[0]))
+        hash_bytes_len = HASH_GRID * HASH_GRID // 8
+        self._hashes = np.array(hashes, dtype=np.uint8).reshape(-1, hash_bytes_len)
+
+    @staticmethod
+    def _encode_params_for(image_format: str, quality: Optional[int]) -> List[int]:
+        if image_format == ".webp":
+            # Qualität > 100 bedeutet bei OpenCV verlustfreies WebP.
+            return [cv2.IMWRITE_WEBP_QUALITY, 101 if quality is None else quality]
+        if image_format in (".jpg", ".jpeg"):
+            return [cv2.IMWRITE_JPEG_QUALITY, 95 if quality is None else quality]
+        if image_format == ".png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, 9 if quality is None else quality]
+        return []
+
+    def find_duplicate(self, image_hash: np.ndarray, thumb: np.ndarray) -> Optional[str]:
+        distances = hamming_distances(self._hashes, image_hash)
+        for index in np.argsort(distances, kind="stable"):
+            if distances[index] > self.max_distance:
+                break
+            if max_block_difference(self._thumbs[index], thumb) <= self.max_block_diff:
+                return self._keys[index]
+        return None
+
+    def _new_key(self, image_hash: np.ndarray) -> str:
+        base = image_hash.tobytes().hex()
+        key = base
+        suffix = 1
+        while key in self._keys:
+            suffix += 1
+            key = f"{base}-{suffix}"
+        return key
+
+    def add(
+        self,
+        warped: np.ndarray,
+        metadata: Optional[Dict[str, object]] = None,
+        timestamp: Optional[float] = None,
+    ) -> Tuple[str, bool]:
+        """Legt eine Referenz an; gibt Schlüssel und ob ein neues Bild gespeichert wurde zurück."""
+        image_hash = perceptual_hash(warped)
+        thumb = make_thumbnail(warped)
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            key = self.find_duplicate(image_hash, thumb)
+            is_new = key is None
+            if key is None:
+                key = self._new_key(image_hash)
+                relative_path = self._store_image(key, warped)
+                self._connection.execute(
+                    "INSERT INTO objects (key, hash, thumb, path, bytes, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        image_hash.tobytes(),
+                        thumb.tobytes(),
+                        relative_path,
+                        os.path.getsize(self._absolute_path(relative_path)),
+                        timestamp,
+                    ),
+                )
+                self._keys.append(key)
+                self._thumbs.append(thumb)
+                self._hashes = np.vstack([self._hashes, image_hash[np.newaxis, :]])
+
+            self._connection.execute(
+                "INSERT INTO refs (key, timestamp, metadata) VALUES (?, ?, ?)",
+                (key, timestamp, json.dumps(metadata or {}, separators=(",", ":"))),
+            )
+            self._connection.commit()
+        return key, is_new
+
+    def _store_image(self, key: str, image: np.ndarray) -> str:
+        """Schreibt das Bild und gibt den Pfad relativ zu ``root`` zurück (mit '/' getrennt)."""
+        relative_path = "/".join(("objects", key[:2], key + self.image_format))
+        path = self._absolute_path(relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ok, encoded = cv2.imencode(self.image_format, image, self._encode_params)
+        if not ok:
+            raise ValueError(f"Bild konnte nicht als '{self.image_format}' kodiert werden.")
+        with open(path, "wb") as handle:
+            handle.write(encoded.tobytes())
+        return relative_path
+
+    def _absolute_path(self, relative_path: str) -> str:
+        # Relative Pfade halten das Archiv verschieb- und zwischen Rechnern kopierbar.
+        if os.path.isabs(relative_path):  # Einträge älterer Archive
+            return relative_path
+        return os.path.join(self.root, *relative_path.split("/"))
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._connection.execute("SELECT path FROM objects WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return cv2.imread(self._absolute_path(row[0]), cv2.IMREAD_COLOR)
+
+    def unique_keys(self) -> List[str]:
+        """Alle gespeicherten Bilder, z. B. für eine spätere Batch-OCR ohne Duplikate."""
+        with self._lock:
+            return list(self._keys)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            refs, = self._connection.execute("SELECT COUNT(*) FROM refs").fetchone()
+            stored_bytes, = self._connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM objects").fetchone()
+        return {"objects": len(self._keys), "references": refs, "bytes": stored_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
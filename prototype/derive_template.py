@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from array_backend import BACKENDS, BACKEND_NDARRAY
+from main2 import (
+    DEFAULT_DETECTION_PROFILE,
+    TARGET_SCREEN_HEIGHT,
+    TARGET_SCREEN_WIDTH,
+    TemplateBox,
+    TemplateAnalyzer,
+    add_runtime_arguments,
+    apply_runtime_config,
+    contour_to_quadrilateral,
+    format_runtime_report,
+    get_runtime_config,
+    init_opencv_threads,
+    iou,
+    load_runtime_config,
+)
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+CLUSTER_MIN_IOU = 0.6  # gleiche Box in verschiedenen Screenshots
+MIN_SUPPORT = 0.8  # Anteil der Screenshots, in denen eine Box vorkommen muss
+MIN_BOX_PERCENT = 1.0  # Mindestbreite/-höhe in Prozent des Screens
+MAX_BOX_AREA_PERCENT = 25.0  # größere Rechtecke sind Rahmen/Container, keine Merkmale
+MIN_CONTRAST = 0.08  # Helligkeitssprung Rand innen/außen, 0..1
+SEPARATION_PERCENT = 0.5  # Mindestabstand zwischen zwei gewählten Boxen
+MAX_BOXES = 16
+BORDER_BAND_PX = 3
+
+# (x, y, Breite, Höhe) in Prozent und Kantenkontrast
+Observation = Tuple[float, float, float, float, float]
+PercentRect = Tuple[float, float, float, float]
+
+
+@dataclass
+class RectCluster:
+    """Dasselbe Rechteck über mehrere Screenshots hinweg."""
+
+    members: List[Observation] = field(default_factory=list)
+    images: set = field(default_factory=set)
+
+    @property
+    def rect(self) -> PercentRect:
+        x, y, w, h = np.median(np.array([member[:4] for member in self.members]), axis=0)
+        return float(x), float(y), float(w), float(h)
+
+    @property
+    def contrast(self) -> float:
+        return float(np.mean([member[4] for member in self.members]))
+
+    def spread(self) -> float:
+        """Mittlere Abweichung der Kanten vom Median in Prozent (Lagestabilität)."""
+        return float(np.mean(np.abs(np.array([member[:4] for member in self.members]) - self.rect)))
+
+
+# ---------------------------------------------------------------------------
+# Rechtecke je Screenshot (läuft in Worker-Prozessen)
+# ---------------------------------------------------------------------------
+def edge_contrast(gray: np.ndarray, rect: Tuple[int, int, int, int], band: int = BORDER_BAND_PX) -> float:
+    x, y, w, h = rect
+    height, width = gray.shape
+    outer = gray[max(0, y - band):min(height, y + h + band), max(0, x - band):min(width, x + w + band)]
+    inner = gray[y + band:y + h - band, x + band:x + w - band]
+    if inner.size == 0 or outer.size <= inner.size:
+        return 0.0
+    ring_sum = float(outer.sum(dtype=np.float64)) - float(inner.sum(dtype=np.float64))
+    ring_mean = ring_sum / (outer.size - inner.size)
+    return abs(float(inner.mean()) - ring_mean) / 255.0
+
+
+def extract_rectangles(path: str, canny_low: int, canny_high: int) -> List[Observation]:
+    """
+    Viereckige Konturen eines entzerrten Screenshots in Prozentkoordinaten.
+
+    Nutzt dieselbe Kantenstufe und Vierecks-Näherung wie die Live-Detektion auf dem
+    entzerrten Zielformat, damit nur Boxen vorgeschlagen werden, die diese auch findet.
+    """
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        print(f"Bild '{path}' konnte nicht gelesen werden, übersprungen.", file=sys.stderr)
+        return []
+    image = cv2.resize(image, (TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    contours = BACKENDS[BACKEND_NDARRAY].detect_contours(image, canny_low=canny_low, canny_high=canny_high)
+
+    observations: List[Observation] = []
+    for contour in contours:
+        quad = contour_to_quadrilateral(contour)
+        if quad is None:
+            continue
+        rect = cv2.boundingRect(quad.reshape(-1, 1, 2).astype(np.int32))
+        x, y, w, h = rect
+        observations.append((
+            x / TARGET_SCREEN_WIDTH * 100.0,
+            y / TARGET_SCREEN_HEIGHT * 100.0,
+            w / TARGET_SCREEN_WIDTH * 100.0,
+            h / TARGET_SCREEN_HEIGHT * 100.0,
+            edge_contrast(gray, rect),
+        ))
+    return observations
+
+
+def collect_observations(paths: Sequence[str], workers: int, canny_low: int, canny_high: int) -> List[List[Observation]]:
+    if workers <= 1 or len(paths) <= 1:
+        return [extract_rectangles(path, canny_low, canny_high) for path in paths]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_opencv_threads,
+        initargs=(get_runtime_config().opencv_threads,),
+    ) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(executor.map(
+            extract_rectangles, paths, [canny_low] * len(paths), [canny_high] * len(paths), chunksize=chunksize
+        ))
+
+
+# ---------------------------------------------------------------------------
+# Clustern & Auswahl
+# ---------------------------------------------------------------------------
+def cluster_rectangles(per_image: Sequence[Sequence[Observation]], min_iou: float = CLUSTER_MIN_IOU) -> List[RectCluster]:
+    """Ordnet jedes Rechteck dem Cluster mit der höchsten IoU zu (pro Screenshot höchstens einmal)."""
+    clusters: List[RectCluster] = []
+    for image_index, observations in enumerate(per_image):
+        # Größere Rechtecke zuerst, damit kleine Nachbarn keinen Cluster "stehlen".
+        for observation in sorted(observations, key=lambda item: item[2] * item[3], reverse=True):
+            best: Optional[RectCluster] = None
+            best_iou = min_iou
+            for cluster in clusters:
+                if image_index in cluster.images:
+                    continue
+                overlap = iou(observation[:4], cluster.members[0][:4])
+                if overlap >= best_iou:
+                    best, best_iou = cluster, overlap
+            if best is None:
+                best = RectCluster()
+                clusters.append(best)
+            best.members.append(observation)
+            best.images.add(image_index)
+    return clusters
+
+
+def _separated(rect: PercentRect, chosen: Sequence[PercentRect], margin: float) -> bool:
+    x, y, w, h = rect
+    for other_x, other_y, other_w, other_h in chosen:
+        if (
+            x < other_x + other_w + margin
+            and other_x < x + w + margin
+            and y < other_y + other_h + margin
+            and other_y < y + h + margin
+        ):
+            return False
+    return True
+
+
+def select_clusters(
+    clusters: Sequence[RectCluster],
+    image_count: int,
+    min_support: float = MIN_SUPPORT,
+    max_boxes: int = MAX_BOXES,
+) -> List[RectCluster]:
+    """
+    Wählt stabile, kontrastreiche und voneinander getrennte Rechtecke.
+
+    Rangfolge nach Unterstützung mal Kontrast, abgewertet durch Lageschwankung; gierig
+    übernommen wird nur, was mit ``SEPARATION_PERCENT`` Abstand zu allen bisher gewählten
+    Boxen liegt (keine Überlappung, keine Verwechslung bei der IoU-Zuordnung).
+    """
+    candidates = []
+    for cluster in clusters:
+        support = len(cluster.images) / image_count
+        x, y, w, h = cluster.rect
+        if support < min_support or cluster.contrast < MIN_CONTRAST:
+            continue
+        if w < MIN_BOX_PERCENT or h < MIN_BOX_PERCENT or w * h > MAX_BOX_AREA_PERCENT * 100.0:
+            continue
+        score = support * cluster.contrast / (1.0 + cluster.spread())
+        candidates.append((score, cluster))
+
+    chosen: List[RectCluster] = []
+    for _, cluster in sorted(candidates, key=lambda item: item[0], reverse=True):
+        if len(chosen) >= max_boxes:
+            break
+        if _separated(cluster.rect, [item.rect for item in chosen], SEPARATION_PERCENT):
+            chosen.append(cluster)
+    # Lesereihenfolge: oben nach unten, links nach rechts
+    return sorted(chosen, key=lambda item: (round(item.rect[1]), item.rect[0]))
+
+
+def derive_template(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    min_support: float = MIN_SUPPORT,
+    max_boxes: int = MAX_BOXES,
+    canny_low: int = DEFAULT_DETECTION_PROFILE.canny_low,
+    canny_high: int = DEFAULT_DETECTION_PROFILE.canny_high,
+) -> List[TemplateBox]:
+    if not paths:
+        return []
+    if workers is None:
+        workers = get_runtime_config().effective_detection_workers
+    per_image = collect_observations(paths, workers, canny_low, canny_high)
+    chosen = select_clusters(cluster_rectangles(per_image), len(paths), min_support, max_boxes)
+
+    boxes: List[TemplateBox] = []
+    for index, cluster in enumerate(chosen, start=1):
+        x, y, w, h = cluster.rect
+        boxes.append({
+            "id": f"box_{index}",
+            "x": round(x, 2),
+            "y": round(y, 2),
+            "width": round(w, 2),
+            "height": round(h, 2),
+            "label": f"Box {index} (Support {len(cluster.images)}/{len(paths)}, Kontrast {cluster.contrast:.2f})",
+        })
+    # Letzte Prüfung mit denselben Regeln wie für handgeschriebene Templates.
+    return TemplateAnalyzer().select_boxes(boxes, "derived")
+
+
+def collect_image_paths(inputs: Sequence[str]) -> List[str]:
+    paths: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(
+                os.path.join(item, name) for name in sorted(os.listdir(item)) if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            paths.append(item)
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Leitet aus entzerrten Screenshots desselben Screens ein Detektions-Template ab."
+    )
+    parser.add_argument("inputs", nargs="+", help="Screenshots oder Verzeichnisse mit Screenshots")
+    parser.add_argument("--output", help="Ziel-JSON (Template-Format); sonst Ausgabe auf stdout")
+    parser.add_argument("--min-support", type=float, default=MIN_SUPPORT)
+    parser.add_argument("--max-boxes", type=int, default=MAX_BOXES)
+    add_runtime_arguments(parser)
+    args = parser.parse_args()
+    config = apply_runtime_config(load_runtime_config(args))
+    # Statusmeldungen nach stderr: ohne --output ist stdout allein das Template-JSON.
+    print(format_runtime_report(config), file=sys.stderr)
+
+    paths = collect_image_paths(args.inputs)
+    boxes = derive_template(paths, config.effective_detection_workers, args.min_support, args.max_boxes)
+    print(f"{len(boxes)} Boxen aus {len(paths)} Screenshots abgeleitet.", file=sys.stderr)
+    text = json.dumps(boxes, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        print(f"Template gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import json
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Deque, Dict, Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+PROFILE_POLL_INTERVAL = 1.0
+STATS_WINDOW_FRAMES = 300
+
+RoiConfig = Dict[str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class DetectionProfile:
+    """
+    Alle Schwellwerte der Detektion als unveränderlicher Satz.
+
+    Ein neu geladenes Profil ersetzt das alte als Ganzes; ein laufender Frame sieht
+    daher nie eine Mischung aus alten und neuen Werten. ``benchmark`` hält die zuletzt
+    gemessenen Kennzahlen (z. B. FPS, Latenz, Accuracy, Datensatz) für den A/B-Vergleich.
+    """
+
+    name: str
+    box_accuracy_threshold: float
+    unlock_accuracy_threshold: float
+    roi_tolerance_px: int
+    template_match_min_iou: float
+    canny_low: int
+    canny_high: int
+    roi_outer: RoiConfig
+    roi_inner: RoiConfig
+    benchmark: Dict[str, Any] = field(default_factory=dict)
+
+
+def validate_profile(profile: DetectionProfile) -> DetectionProfile:
+    for name in ("box_accuracy_threshold", "unlock_accuracy_threshold", "template_match_min_iou"):
+        value = getattr(profile, name)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"'{name}' muss zwischen 0 und 1 liegen (ist {value}).")
+    if profile.unlock_accuracy_threshold > profile.box_accuracy_threshold:
+        raise ValueError("'unlock_accuracy_threshold' darf nicht größer als 'box_accuracy_threshold' sein.")
+    if not 0 <= profile.canny_low <= profile.canny_high:
+        raise ValueError(f"Ungültige Canny-Grenzen {profile.canny_low}/{profile.canny_high}.")
+    for roi_name in ("roi_outer", "roi_inner"):
+        roi = getattr(profile, roi_name)
+        missing = {"x", "y", "width", "height"} - set(roi)
+        if missing:
+            raise ValueError(f"'{roi_name}' fehlt: {', '.join(sorted(missing))}")
+    return profile
+
+
+def profile_from_dict(data: Dict[str, Any], defaults: DetectionProfile) -> DetectionProfile:
+    """Fehlende Schlüssel übernehmen den Wert aus ``defaults``."""
+    known = {item.name for item in fields(DetectionProfile)}
+    unknown = set(data) - known
+    if unknown:
+        raise ValueError(f"Unbekannte Profil-Schlüssel: {', '.join(sorted(unknown))}")
+
+    values = asdict(defaults)
+    values.update(data)
+    for name in ("roi_tolerance_px", "canny_low", "canny_high"):
+        values[name] = int(values[name])
+    for name in ("box_accuracy_threshold", "unlock_accuracy_threshold", "template_match_min_iou"):
+        values[name] = float(values[name])
+    return validate_profile(DetectionProfile(**values))
+
+
+def load_profile(path: str, defaults: DetectionProfile) -> DetectionProfile:
+    """Lädt ein Profil aus JSON oder TOML (nach Dateiendung)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".toml":
+        if tomllib is None:
+            raise RuntimeError("TOML-Profile benötigen Python 3.11 (tomllib).")
+        with open(path, "rb") as handle:
+            data = tomllib.load(handle)
+    else:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return profile_from_dict(data, defaults)
+
+
+# ---------------------------------------------------------------------------
+# Hot-Reload
+# ---------------------------------------------------------------------------
+class ProfileWatcher:
+    """
+    Prüft die Profil-Datei höchstens alle ``poll_interval`` Sekunden per ``stat``.
+
+    ``poll`` wird aus der Detektionsschleife aufgerufen und kostet zwischen den Prüfungen
+    nur einen Zeitvergleich. Bei einer fehlerhaften Datei bleibt das bisherige Profil aktiv.
+    """
+
+    def __init__(self, path: str, defaults: DetectionProfile, poll_interval: float = PROFILE_POLL_INTERVAL) -> None:
+        self.path = path
+        self.defaults = defaults
+        self.poll_interval = poll_interval
+        self.version = 0
+        self._signature: Optional[tuple] = None
+        self._next_check = 0.0
+        self.current = defaults
+        self._reload()
+
+    def _stat_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self) -> bool:
+        signature = self._stat_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            profile = load_profile(self.path, self.defaults)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Profil '{self.path}' ungültig, behalte '{self.current.name}': {exc}")
+            return False
+        self.current = profile
+        self.version += 1
+        return True
+
+    def poll(self) -> DetectionProfile:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.poll_interval
+            if self._reload():
+                print(f"Detektionsprofil '{self.current.name}' geladen (Version {self.version}).")
+        return self.current
+
+
+# ---------------------------------------------------------------------------
+# Live-Kennzahlen je Profil (A/B)
+# ---------------------------------------------------------------------------
+class ProfileStats:
+    """Gleitende Latenz, Accuracy und Akzeptanzrate des gerade aktiven Profils."""
+
+    def __init__(self, window: int = STATS_WINDOW_FRAMES) -> None:
+        self._durations_ms: Deque[float] = deque(maxlen=window)
+        self._accuracies: Deque[float] = deque(maxlen=window)
+        self._accepted: Deque[bool] = deque(maxlen=window)
+        self._times: Deque[float] = deque(maxlen=window)
+
+    def record(self, duration_ms: float, accuracy: float, accepted: bool) -> None:
+        self._times.append(time.perf_counter())
+        self._durations_ms.append(duration_ms)
+        self._accuracies.append(accuracy)
+        self._accepted.append(accepted)
+
+    def reset(self) -> None:
+        self._durations_ms.clear()
+        self._accuracies.clear()
+        self._accepted.clear()
+        self._times.clear()
+
+    def summary(self) -> Dict[str, float]:
+        frames = len(self._durations_ms)
+        if frames == 0:
+            return {"frames": 0}
+        span = self._times[-1] - self._times[0]
+        durations = sorted(self._durations_ms)
+        return {
+            "frames": frames,
+            "fps": (frames - 1) / span if span > 0 else 0.0,
+            "detection_ms_p50": durations[frames // 2],
+            "detection_ms_p95": durations[min(frames - 1, int(frames * 0.95))],
+            "accuracy": sum(self._accuracies) / frames,
+            "accept_rate": sum(self._accepted) / frames,
+        }
+
+
+def format_profile_report(profile: DetectionProfile, stats: ProfileStats) -> str:
+    live = stats.summary()
+    if not live["frames"]:
+        return f"Profil '{profile.name}': noch keine Frames"
+    parts = []
+    for key, value in live.items():
+        if key == "frames":
+            continue
+        reference = profile.benchmark.get(key)
+        reference_text = f" (Benchmark {reference:.2f})" if isinstance(reference, (int, float)) else ""
+        parts.append(f"{key} {value:.2f}{reference_text}")
+    return f"Profil '{profile.name}' über {live['frames']} Frames: " + ", ".join(parts)
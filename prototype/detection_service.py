@@ -0,0 +1,343 @@
+import argparse
+import base64
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from main2 import (
+    ARRAY_BACKEND,
+    DEFAULT_TEMPLATE_BOXES,
+    JSON_TEMPLATE_PATH,
+    TARGET_SCREEN_HEIGHT,
+    TARGET_SCREEN_WIDTH,
+    FrameEvaluation,
+    TemplateSource,
+    activate_detection_profile,
+    add_profile_argument,
+    add_runtime_arguments,
+    apply_runtime_config,
+    describe_selection,
+    evaluate_oriented_frame,
+    format_runtime_report,
+    get_registry,
+    get_runtime_config,
+    load_runtime_config,
+    select_backend,
+    template_geometry,
+)
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DEFAULT_SERVICE_HOST = "127.0.0.1"
+DEFAULT_SERVICE_PORT = 8765
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+DEFAULT_TEMPLATE_NAME = os.path.splitext(os.path.basename(JSON_TEMPLATE_PATH))[0]
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+ROTATIONS = {
+    "none": None,
+    "cw": cv2.ROTATE_90_CLOCKWISE,
+    "ccw": cv2.ROTATE_90_COUNTERCLOCKWISE,
+    "180": cv2.ROTATE_180,
+}
+
+
+class ServiceError(Exception):
+    """Fehler, der als HTTP-Antwort mit Statuscode an den Client geht."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------------------------------------------------------------------
+# Vorab geladene Templates und Geometrie
+# ---------------------------------------------------------------------------
+@dataclass
+class CompiledTemplate:
+    name: str
+    ids: List[str]
+    geometry: np.ndarray  # (N, 4) float32: x, y, w, h in Prozent
+    box_rects: np.ndarray  # (N, 4) int32: x, y, w, h im entzerrten Screen
+    parent: Optional[str] = None
+    # Geometrie für die Screen-Erkennung: die des obersten Eltern-Layouts, sonst die eigene.
+    detection_geometry: Optional[np.ndarray] = None
+
+
+def compile_template(
+    name: str,
+    boxes: TemplateSource,
+    ids: Optional[List[str]] = None,
+    parent: Optional[str] = None,
+) -> CompiledTemplate:
+    geometry = template_geometry(boxes)
+    if ids is None:
+        ids = [box["id"] for box in boxes]
+    scale = np.array(
+        [TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT, TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT], dtype=np.float64
+    ) / 100
+    rects = geometry.astype(np.float64) * scale
+    return CompiledTemplate(name, ids, geometry, rects.astype(np.int32), parent, geometry)
+
+
+def link_parent_layouts(templates: Dict[str, CompiledTemplate]) -> None:
+    """
+    Kinder erkennen den Screen über die Boxen ihres obersten Eltern-Layouts; die eigenen
+    Felder dienen nur noch zum Ausschneiden. Fehlt ein Elternteil, bleibt die eigene Geometrie.
+    """
+    for template in templates.values():
+        root, seen = template, {template.name}
+        while root.parent in templates and root.parent not in seen:
+            seen.add(root.parent)
+            root = templates[root.parent]
+        template.detection_geometry = root.geometry
+
+
+def load_templates(templates_dir: str, bundle_path: Optional[str] = None) -> Dict[str, CompiledTemplate]:
+    """
+    Lädt alle Templates vorab. Mit ``bundle_path`` kommt die Geometrie direkt aus dem
+    gemappten Bundle (ohne JSON-Parsing und Box-Dicts), sonst aus ``templates_dir``.
+    """
+    if bundle_path:
+        bundle = get_registry().bundle(bundle_path)
+        templates = {
+            name: compile_template(name, bundle.geometry(name), bundle.ids(name), bundle.parent(name))
+            for name in bundle.names
+        }
+    else:
+        templates = {
+            name: compile_template(name, template.as_dicts(with_label=False), parent=template.parent)
+            for name, template in get_registry().scan(templates_dir).items()
+        }
+    link_parent_layouts(templates)
+
+    if DEFAULT_TEMPLATE_NAME not in templates:
+        templates[DEFAULT_TEMPLATE_NAME] = compile_template(DEFAULT_TEMPLATE_NAME, DEFAULT_TEMPLATE_BOXES)
+    return templates
+
+
+# ---------------------------------------------------------------------------
+# Auswertung
+# ---------------------------------------------------------------------------
+def decode_image(data: bytes) -> np.ndarray:
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ServiceError(400, "Bild konnte nicht dekodiert werden.")
+    return image
+
+
+def encode_png(image: np.ndarray) -> str:
+    ok, encoded = cv2.imencode(".png", image)
+    if not ok:
+        raise ServiceError(500, "PNG-Kodierung fehlgeschlagen.")
+    return base64.b64encode(encoded.tobytes()).decode("ascii")
+
+
+def warp_screen(evaluation: FrameEvaluation, frame: np.ndarray, rotation: Optional[int]) -> Optional[np.ndarray]:
+    if evaluation.homography is None:
+        return None
+    source = evaluation.capture_frame
+    if source is None:
+        source = frame if rotation is None else cv2.rotate(frame, rotation)
+    return cv2.warpPerspective(
+        source,
+        np.linalg.inv(evaluation.homography),
+        (TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT),
+    )
+
+
+def extract_crops(warped: np.ndarray, template: CompiledTemplate) -> Dict[str, str]:
+    crops: Dict[str, str] = {}
+    for box_id, (x, y, w, h) in zip(template.ids, template.box_rects):
+        crop = warped[max(0, y):y + h, max(0, x):x + w]
+        if crop.size:
+            crops[box_id] = encode_png(crop)
+    return crops
+
+
+def process_image(
+    data: bytes,
+    template: CompiledTemplate,
+    rotation: Optional[int],
+    want_warped: bool,
+    want_crops: bool,
+) -> Dict[str, Any]:
+    frame = decode_image(data)
+    evaluation = evaluate_oriented_frame(frame, template.detection_geometry, rotation)
+
+    result: Dict[str, Any] = {
+        "template": template.name,
+        "accuracy": evaluation.accuracy,
+        "accepted": evaluation.capture_frame is not None,
+        "homography": evaluation.homography.tolist() if evaluation.homography is not None else None,
+    }
+
+    if want_warped or want_crops:
+        warped = warp_screen(evaluation, frame, rotation)
+        if warped is not None:
+            if want_warped:
+                result["warped"] = encode_png(warped)
+            if want_crops:
+                result["crops"] = extract_crops(warped, template)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# HTTP-Service
+# ---------------------------------------------------------------------------
+class DetectionService:
+    """Hält Templates und Worker-Pool über die gesamte Laufzeit im Speicher."""
+
+    def __init__(
+        self,
+        templates_dir: str = TEMPLATES_DIR,
+        workers: Optional[int] = None,
+        bundle_path: Optional[str] = None,
+    ) -> None:
+        self.templates = load_templates(templates_dir, bundle_path)
+        self.workers = workers or get_runtime_config().effective_detection_workers
+        # OpenCV gibt in Canny/findContours/warpPerspective den GIL frei, Threads skalieren daher.
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detection")
+
+    def resolve_template(self, name: Optional[str]) -> CompiledTemplate:
+        template = self.templates.get(name or DEFAULT_TEMPLATE_NAME)
+        if template is None:
+            raise ServiceError(404, f"Unbekanntes Template '{name}'.")
+        return template
+
+    def run(self, images: List[bytes], query: Dict[str, List[str]], want_warped: bool, want_crops: bool) -> List[Dict[str, Any]]:
+        template = self.resolve_template(query.get("template", [None])[0])
+        rotation_name = query.get("rotation", ["none"])[0]
+        if rotation_name not in ROTATIONS:
+            raise ServiceError(400, f"Unbekannte Rotation '{rotation_name}', erlaubt: {', '.join(ROTATIONS)}")
+        rotation = ROTATIONS[rotation_name]
+
+        futures = [
+            self.executor.submit(process_image, data, template, rotation, want_warped, want_crops)
+            for data in images
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def _read_images(handler: BaseHTTPRequestHandler) -> List[bytes]:
+    length = int(handler.headers.get("Content-Length") or 0)
+    if length <= 0:
+        raise ServiceError(400, "Leerer Request-Body.")
+    if length > MAX_REQUEST_BYTES:
+        raise ServiceError(413, "Request zu groß.")
+    body = handler.rfile.read(length)
+
+    content_type = (handler.headers.get("Content-Type") or "").split(";")[0].strip()
+    if content_type != "application/json":
+        return [body]
+
+    try:
+        payload = json.loads(body)
+        return [base64.b64decode(item) for item in payload["images"]]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ServiceError(400, f"Ungültiger Batch-Request: {exc}") from exc
+
+
+def _make_handler(service: DetectionService) -> type:
+    class DetectionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server-Schnittstelle
+            path = urlparse(self.path).path
+            if path == "/health":
+                self._send_json(200, {"status": "ok", "workers": service.workers})
+            elif path == "/templates":
+                self._send_json(
+                    200,
+                    {name: len(template.ids) for name, template in service.templates.items()},
+                )
+            else:
+                self._send_json(404, {"error": "Unbekannter Pfad."})
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server-Schnittstelle
+            url = urlparse(self.path)
+            endpoints = {
+                "/evaluate": (False, False),
+                "/homography": (False, False),
+                "/warp": (True, False),
+                "/crops": (False, True),
+            }
+            if url.path not in endpoints:
+                self._send_json(404, {"error": "Unbekannter Pfad."})
+                return
+
+            want_warped, want_crops = endpoints[url.path]
+            try:
+                images = _read_images(self)
+                results = service.run(images, parse_qs(url.query), want_warped, want_crops)
+            except ServiceError as exc:
+                self._send_json(exc.status, {"error": str(exc)})
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                self._send_json(500, {"error": str(exc)})
+                return
+
+            if url.path == "/homography":
+                results = [{"homography": result["homography"]} for result in results]
+            batch = (self.headers.get("Content-Type") or "").startswith("application/json")
+            self._send_json(200, {"results": results} if batch else results[0])
+
+        def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+            return
+
+    return DetectionHandler
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screen-Detektion als lokaler HTTP-Service.")
+    parser.add_argument("--host", default=DEFAULT_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVICE_PORT)
+    parser.add_argument("--templates", default=TEMPLATES_DIR, help="Verzeichnis mit Template-JSONs")
+    parser.add_argument("--bundle", help="Binäres Template-Bundle (.ptb); ersetzt das Laden aus --templates")
+    add_profile_argument(parser)
+    add_runtime_arguments(parser)
+    args = parser.parse_args()
+    print(format_runtime_report(apply_runtime_config(load_runtime_config(args))))
+    # Die Worker sind Threads und lesen das prozessweite Profil und Backend.
+    print(f"Detektionsprofil: {activate_detection_profile(args.profile).name}")
+    print(describe_selection(select_backend(ARRAY_BACKEND)))
+
+    service = DetectionService(args.templates, args.detection_workers, args.bundle)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(service))
+    server.daemon_threads = True
+    print(
+        f"Detection-Service auf http://{args.host}:{args.port} "
+        f"({len(service.templates)} Templates, {service.workers} Worker)"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DISPLAY_MAX_FPS = 20.0
+DISPLAY_IDLE_WAIT_MS = 10
+QUIT_KEY = ord("q")
+
+RenderFn = Callable[[Any], np.ndarray]
+ReleaseFn = Callable[[Any], None]
+
+
+# ---------------------------------------------------------------------------
+# Asynchrone Anzeige
+# ---------------------------------------------------------------------------
+class DisplaySink:
+    """
+    Zeigt Frames in einem eigenen Thread an, damit der Detektor nie auf GUI-Events wartet.
+
+    ``show`` legt nur den neuesten Frame je Aufruf in eine Queue der Länge 1; ältere,
+    noch nicht gezeichnete Frames werden verworfen. Der Anzeige-Thread zeichnet höchstens
+    ``max_fps`` Bilder pro Sekunde und pumpt dazwischen die HighGUI-Events (``waitKey``).
+
+    Optional übernimmt ``render`` die Aufbereitung (z. B. Verkleinern) im Anzeige-Thread,
+    ``release`` wird aufgerufen, sobald der Frame gezeichnet oder verworfen wurde.
+
+    Hinweis: Unter macOS muss HighGUI im Haupt-Thread laufen, dort ``enabled=False`` nutzen.
+    """
+
+    def __init__(self, max_fps: float = DISPLAY_MAX_FPS, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._queue: "queue.Queue[Tuple[str, Any, Optional[RenderFn], Optional[ReleaseFn]]]" = queue.Queue(maxsize=1)
+        self._stopped = threading.Event()
+        self._key_condition = threading.Condition()
+        self._last_key: Optional[int] = None
+        self._key_sequence = 0
+        self._windows = set()
+        self.quit_requested = threading.Event()
+        self.dropped_frames = 0
+        self._thread: Optional[threading.Thread] = None
+        if enabled:
+            self._thread = threading.Thread(target=self._run, name="display-sink", daemon=True)
+            self._thread.start()
+
+    def show(
+        self,
+        window_name: str,
+        payload: Any,
+        render: Optional[RenderFn] = None,
+        release: Optional[ReleaseFn] = None,
+    ) -> None:
+        if not self.enabled or self._stopped.is_set():
+            if release is not None:
+                release(payload)
+            return
+
+        item = (window_name, payload, render, release)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                self._drop_pending()
+
+    def _drop_pending(self) -> None:
+        try:
+            _, payload, _, release = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self.dropped_frames += 1
+        if release is not None:
+            release(payload)
+
+    def wait_key(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Blockiert bis zum nächsten Tastendruck im Anzeige-Thread (ohne Anzeige: sofort None)."""
+        if not self.enabled:
+            return None
+        with self._key_condition:
+            sequence = self._key_sequence
+            self._key_condition.wait_for(
+                lambda: self._key_sequence != sequence or self._stopped.is_set(),
+                timeout=timeout,
+            )
+            return self._last_key if self._key_sequence != sequence else None
+
+    def _record_key(self, key: int) -> None:
+        if key < 0:
+            return
+        key &= 0xFF
+        if key == QUIT_KEY:
+            self.quit_requested.set()
+        with self._key_condition:
+            self._last_key = key
+            self._key_sequence += 1
+            self._key_condition.notify_all()
+
+    def _run(self) -> None:
+        last_render = 0.0
+        while not self._stopped.is_set():
+            try:
+                window_name, payload, render, release = self._queue.get(timeout=DISPLAY_IDLE_WAIT_MS / 1000.0)
+            except queue.Empty:
+                if self._windows:
+                    self._record_key(cv2.waitKey(1))
+                continue
+
+            wait = self._min_interval - (time.perf_counter() - last_render)
+            if wait > 0:
+                # Während der Wartezeit eintreffende Frames ersetzen diesen.
+                time.sleep(wait)
+                if not self._queue.empty():
+                    self.dropped_frames += 1
+                    if release is not None:
+                        release(payload)
+                    continue
+
+            try:
+                image = render(payload) if render is not None else payload
+                cv2.imshow(window_name, image)
+                self._windows.add(window_name)
+            finally:
+                if release is not None:
+                    release(payload)
+            last_render = time.perf_counter()
+            self._record_key(cv2.waitKey(1))
+
+        for window_name in self._windows:
+            cv2.destroyWindow(window_name)
+
+    def close(self) -> None:
+        self._stopped.set()
+        with self._key_condition:
+            self._key_condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        while not self._queue.empty():
+            self._drop_pending()
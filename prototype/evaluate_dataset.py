@@ -0,0 +1,491 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from array_backend import BACKENDS
+from detection_profile import DetectionProfile, load_profile
+from main2 import (
+    DEFAULT_DETECTION_PROFILE,
+    DEFAULT_TEMPLATE_BOXES,
+    JSON_TEMPLATE_PATH,
+    ORIENTATION_AWARE_DETECTION,
+    TARGET_SCREEN_HEIGHT,
+    TARGET_SCREEN_WIDTH,
+    FrameBufferPool,
+    TemplateBox,
+    build_projected_rectangles,
+    evaluate_frame,
+    iou,
+    load_template_boxes,
+)
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DATASET_PATH = os.path.join(os.path.dirname(__file__), "dataset", "ground_truth.json")
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+ROTATIONS = {
+    "none": None,
+    "cw": cv2.ROTATE_90_CLOCKWISE,
+    "ccw": cv2.ROTATE_90_COUNTERCLOCKWISE,
+    "180": cv2.ROTATE_180,
+}
+INVERSE_ROTATIONS = {
+    None: None,
+    cv2.ROTATE_90_CLOCKWISE: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    cv2.ROTATE_90_COUNTERCLOCKWISE: cv2.ROTATE_90_CLOCKWISE,
+    cv2.ROTATE_180: cv2.ROTATE_180,
+}
+ORIENTATION_AWARE = "aware"
+ORIENTATION_ROTATE = "rotate"
+# Standard ist der Pfad, den main2 live fährt
+DEFAULT_ORIENTATION = ORIENTATION_AWARE if ORIENTATION_AWARE_DETECTION else ORIENTATION_ROTATE
+STAGES = ("rotate", "prepare", "edges", "candidate", "scoring", "capture", "classification")
+
+# Referenzkonfiguration: jede andere Konfiguration darf bei Eckfehler und Akzeptanzrate
+# nicht hinter ihr zurückfallen, sonst endet der Lauf mit Exit-Code 1.
+BASELINE_OPTIONS = {"backend": "ndarray", "buffers": "off", "orientation": ORIENTATION_ROTATE}
+CORNER_ERROR_TOLERANCE_PX = 0.5
+ACCEPT_RATE_TOLERANCE = 1e-9
+
+# Synthetische Screenshots (``render`` im Datensatz)
+RENDER_SIZE = (768, 1024)
+RENDER_BACKGROUND = 40
+RENDER_FOREGROUND = 220
+RENDER_FRAME_PX = 6
+
+SCREEN_CORNERS_TEMPLATE = np.float32(
+    [[0, 0], [TARGET_SCREEN_WIDTH, 0], [TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT], [0, TARGET_SCREEN_HEIGHT]]
+)
+
+
+# ---------------------------------------------------------------------------
+# Datensatz
+# ---------------------------------------------------------------------------
+@dataclass
+class Sample:
+    """
+    Ein gelabeltes Bild.
+
+    ``screen_corners`` liegen im rotierten Frame (oben links, oben rechts, unten rechts,
+    unten links). Mit ``view`` ist ``image`` ein Screenshot, der in diese Ecken auf eine
+    Leinwand gerendert und anschließend in die Kamera-Lage (``rotation`` rückwärts)
+    gedreht wird.
+
+    ``template_id`` ``None`` heißt „zeigt kein bekanntes Template“ und wird als eigene
+    Kategorie gewertet; fehlt das Feld im Datensatz, ist das Sample für die
+    Klassifikation ungelabelt (``template_labeled`` False) und zählt dort nicht.
+    """
+
+    id: str
+    frame: np.ndarray
+    rotation: Optional[int]
+    template_id: Optional[str]
+    screen_corners: Optional[np.ndarray]
+    boxes: List[TemplateBox]
+    template_labeled: bool = True
+
+
+@dataclass
+class Dataset:
+    samples: List[Sample]
+    classification_templates: Dict[str, List[TemplateBox]]
+
+
+def render_view(screenshot: np.ndarray, corners: np.ndarray, view: Dict[str, Any]) -> np.ndarray:
+    width, height = view.get("canvas", (1080, 1920))
+    background = int(view.get("background", 40))
+    source = np.float32(
+        [[0, 0], [screenshot.shape[1], 0], [screenshot.shape[1], screenshot.shape[0]], [0, screenshot.shape[0]]]
+    )
+    matrix = cv2.getPerspectiveTransform(source, corners.astype(np.float32))
+    return cv2.warpPerspective(
+        screenshot,
+        matrix,
+        (int(width), int(height)),
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=(background, background, background),
+    )
+
+
+def render_template_screenshot(boxes: List[TemplateBox], size: Sequence[int] = RENDER_SIZE) -> np.ndarray:
+    """
+    Synthetischer Screenshot aus Template-Boxen mit exakt bekannter Geometrie.
+
+    Die Boxen werden gefüllt auf dunklem Grund gezeichnet, dazu ein heller Bildschirmrand
+    mit einer kleinen Lücke links: wie beim echten Display ist der Rand keine geschlossene
+    Kante, sonst verdeckte er bei ``RETR_EXTERNAL`` alle inneren Boxen.
+    """
+    width, height = int(size[0]), int(size[1])
+    image = np.full((height, width, 3), RENDER_BACKGROUND, np.uint8)
+    foreground = (RENDER_FOREGROUND,) * 3
+    cv2.rectangle(image, (0, 0), (width - 1, height - 1), foreground, RENDER_FRAME_PX)
+    image[height // 2 - RENDER_FRAME_PX : height // 2 + RENDER_FRAME_PX, : RENDER_FRAME_PX + 2] = RENDER_BACKGROUND
+    for box in boxes:
+        x0 = int(round(float(box["x"]) / 100.0 * width))
+        y0 = int(round(float(box["y"]) / 100.0 * height))
+        x1 = int(round((float(box["x"]) + float(box["width"])) / 100.0 * width))
+        y1 = int(round((float(box["y"]) + float(box["height"])) / 100.0 * height))
+        cv2.rectangle(image, (x0, y0), (x1, y1), foreground, cv2.FILLED)
+    return image
+
+
+def load_dataset(path: str, templates_dir: str = TEMPLATES_DIR) -> Dataset:
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    base = os.path.dirname(os.path.abspath(path))
+
+    template_cache: Dict[str, List[TemplateBox]] = {}
+
+    def template_boxes(template_id: str) -> List[TemplateBox]:
+        if template_id not in template_cache:
+            template_path = os.path.join(templates_dir, template_id + ".json")
+            template_cache[template_id] = load_template_boxes(template_path, [])
+        return template_cache[template_id]
+
+    samples: List[Sample] = []
+    for entry in data["samples"]:
+        if "render" in entry:
+            render = entry["render"]
+            boxes_to_draw = [box for name in render["templates"] for box in template_boxes(name)]
+            image = render_template_screenshot(boxes_to_draw, render.get("size", RENDER_SIZE))
+        else:
+            image = cv2.imread(os.path.join(base, entry["image"]), cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"Warnung: Bild '{entry['image']}' nicht lesbar, Sample '{entry['id']}' übersprungen.")
+            continue
+
+        rotation_name = entry.get("rotation", "none")
+        if rotation_name not in ROTATIONS:
+            raise ValueError(f"Sample '{entry['id']}': unbekannte Rotation '{rotation_name}'.")
+        rotation = ROTATIONS[rotation_name]
+
+        corners = entry.get("screen_corners")
+        corners = None if corners is None else np.float32(corners).reshape(4, 2)
+        if "view" in entry:
+            if corners is None:
+                raise ValueError(f"Sample '{entry['id']}': 'view' benötigt 'screen_corners'.")
+            image = render_view(image, corners, entry["view"])
+            inverse = INVERSE_ROTATIONS[rotation]
+            if inverse is not None:
+                image = cv2.rotate(image, inverse)
+
+        template_id = entry.get("template_id")
+        boxes = entry.get("boxes") or (template_boxes(template_id) if template_id else [])
+        samples.append(
+            Sample(entry["id"], image, rotation, template_id, corners, boxes, template_labeled="template_id" in entry)
+        )
+
+    names = data.get("classification_templates") or sorted(
+        os.path.splitext(name)[0] for name in os.listdir(templates_dir) if name.endswith(".json")
+    )
+    classification = {name: template_boxes(name) for name in names}
+    return Dataset(samples, {name: boxes for name, boxes in classification.items() if boxes})
+
+
+# ---------------------------------------------------------------------------
+# Metriken
+# ---------------------------------------------------------------------------
+def corner_errors(homography: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    detected = cv2.perspectiveTransform(SCREEN_CORNERS_TEMPLATE.reshape(-1, 1, 2), homography).reshape(4, 2)
+    return np.linalg.norm(detected - expected, axis=1)
+
+
+def box_ious(homography: Optional[np.ndarray], expected: np.ndarray, boxes: List[TemplateBox]) -> List[float]:
+    if not boxes:
+        return []
+    if homography is None:
+        return [0.0] * len(boxes)
+    expected_homography = cv2.getPerspectiveTransform(SCREEN_CORNERS_TEMPLATE, expected.astype(np.float32))
+    detected_rects = build_projected_rectangles(boxes, homography)
+    expected_rects = build_projected_rectangles(boxes, expected_homography)
+    return [iou(detected, truth) for detected, truth in zip(detected_rects, expected_rects)]
+
+
+@dataclass
+class RunResult:
+    options: Dict[str, str]
+    samples: int = 0
+    labeled: int = 0
+    detected: int = 0
+    accepted: int = 0
+    classified: int = 0
+    classified_correct: int = 0
+    no_template: int = 0
+    no_template_correct: int = 0
+    corner_errors_px: List[float] = field(default_factory=list)
+    corner_errors_rel: List[float] = field(default_factory=list)
+    box_ious: List[float] = field(default_factory=list)
+    totals_ms: List[float] = field(default_factory=list)
+    stages_ms: Dict[str, List[float]] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        totals = np.asarray(self.totals_ms) if self.totals_ms else np.zeros(1)
+        return {
+            "options": self.options,
+            "samples": self.samples,
+            "detection_rate": self.detected / self.labeled if self.labeled else None,
+            "accept_rate": self.accepted / self.samples if self.samples else None,
+            "corner_error_px_mean": float(np.mean(self.corner_errors_px)) if self.corner_errors_px else None,
+            "corner_error_px_max": float(np.max(self.corner_errors_px)) if self.corner_errors_px else None,
+            "corner_error_rel_mean": float(np.mean(self.corner_errors_rel)) if self.corner_errors_rel else None,
+            "box_iou_mean": float(np.mean(self.box_ious)) if self.box_ious else None,
+            "classification_accuracy": self.classified_correct / self.classified if self.classified else None,
+            "no_template_accuracy": self.no_template_correct / self.no_template if self.no_template else None,
+            "latency_ms_p50": float(np.percentile(totals, 50)),
+            "latency_ms_p95": float(np.percentile(totals, 95)),
+            "stages_ms_mean": {stage: float(np.mean(values)) for stage, values in self.stages_ms.items()},
+        }
+
+
+# ---------------------------------------------------------------------------
+# Auswertung
+# ---------------------------------------------------------------------------
+def classify(
+    frame: np.ndarray,
+    rotation: Optional[int],
+    templates: Dict[str, List[TemplateBox]],
+    threshold: float,
+    **kwargs: Any,
+) -> Optional[str]:
+    """Template mit der höchsten Accuracy; unterhalb der Akzeptanzschwelle keines."""
+    best_name, best_accuracy = None, 0.0
+    for name, boxes in templates.items():
+        accuracy = evaluate_frame(frame, boxes, rotation=rotation, **kwargs).accuracy
+        if accuracy > best_accuracy:
+            best_name, best_accuracy = name, accuracy
+    return best_name if best_accuracy >= threshold else None
+
+
+def run_configuration(
+    dataset: Dataset,
+    detection_boxes: List[TemplateBox],
+    backend_name: str,
+    use_buffers: bool,
+    orientation: str,
+    profile: DetectionProfile,
+    repeat: int = 1,
+) -> RunResult:
+    result = RunResult(
+        {
+            "backend": backend_name,
+            "buffers": "on" if use_buffers else "off",
+            "orientation": orientation,
+            "profile": profile.name,
+        }
+    )
+    backend = BACKENDS[backend_name]
+    buffers = FrameBufferPool() if use_buffers else None
+
+    for sample in dataset.samples:
+        for iteration in range(repeat):
+            timings: Dict[str, float] = {}
+            start = time.perf_counter()
+            frame, rotation = sample.frame, sample.rotation
+            if orientation == ORIENTATION_ROTATE and rotation is not None:
+                frame, rotation = cv2.rotate(frame, rotation), None
+                timings["rotate"] = (time.perf_counter() - start) * 1000.0
+
+            evaluation = evaluate_frame(
+                frame,
+                detection_boxes,
+                rotation=rotation,
+                buffers=buffers,
+                backend=backend,
+                profile=profile,
+                timings=timings,
+            )
+            result.totals_ms.append((time.perf_counter() - start) * 1000.0)
+
+            classification_start = time.perf_counter()
+            predicted = classify(
+                frame,
+                rotation,
+                dataset.classification_templates,
+                profile.box_accuracy_threshold,
+                buffers=buffers,
+                backend=backend,
+                profile=profile,
+            )
+            timings["classification"] = (time.perf_counter() - classification_start) * 1000.0
+            for stage, value in timings.items():
+                result.stages_ms.setdefault(stage, []).append(value)
+
+            if iteration:
+                continue  # Korrektheit nur einmal je Sample zählen
+            result.samples += 1
+            result.accepted += int(evaluation.capture_frame is not None)
+            if sample.template_labeled and sample.template_id is None:
+                # „Kein Template“ ist eine eigene Kategorie, kein Treffer für die Klassifikation.
+                result.no_template += 1
+                result.no_template_correct += int(predicted is None)
+            elif sample.template_labeled:
+                result.classified += 1
+                result.classified_correct += int(predicted == sample.template_id)
+
+            if sample.screen_corners is None:
+                continue
+            result.labeled += 1
+            if evaluation.homography is not None:
+                result.detected += 1
+                errors = corner_errors(evaluation.homography, sample.screen_corners)
+                diagonal = float(np.linalg.norm(sample.screen_corners[2] - sample.screen_corners[0]))
+                result.corner_errors_px.extend(errors.tolist())
+                result.corner_errors_rel.extend((errors / diagonal).tolist())
+            result.box_ious.extend(box_ious(evaluation.homography, sample.screen_corners, sample.boxes))
+    return result
+
+
+def run_matrix(
+    dataset: Dataset,
+    detection_boxes: List[TemplateBox],
+    backends: Sequence[str],
+    buffer_modes: Sequence[bool],
+    orientations: Sequence[str],
+    profiles: Sequence[DetectionProfile],
+    repeat: int = 1,
+) -> List[RunResult]:
+    return [
+        run_configuration(dataset, detection_boxes, backend, use_buffers, orientation, profile, repeat)
+        for backend, use_buffers, orientation, profile in itertools.product(
+            backends, buffer_modes, orientations, profiles
+        )
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Bericht
+# ---------------------------------------------------------------------------
+def _fmt(value: Optional[float], pattern: str = "{:.3f}") -> str:
+    return "-" if value is None else pattern.format(value)
+
+
+def format_report(results: List[RunResult]) -> str:
+    header = (
+        f"{'Optionen':<46} {'Det.':>5} {'Akz.':>5} {'Ecke px':>8} {'Ecke max':>8} "
+        f"{'Box IoU':>7} {'Klass.':>6} {'Kein T.':>7} {'p50 ms':>7} {'p95 ms':>7}  Stufen (Mittel ms)"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        summary = result.summary()
+        options = ", ".join(f"{key}={value}" for key, value in summary["options"].items())
+        stages = " ".join(
+            f"{stage} {summary['stages_ms_mean'][stage]:.1f}" for stage in STAGES if stage in summary["stages_ms_mean"]
+        )
+        lines.append(
+            f"{options:<46} {_fmt(summary['detection_rate'], '{:.2f}'):>5} {_fmt(summary['accept_rate'], '{:.2f}'):>5} "
+            f"{_fmt(summary['corner_error_px_mean'], '{:.1f}'):>8} {_fmt(summary['corner_error_px_max'], '{:.1f}'):>8} "
+            f"{_fmt(summary['box_iou_mean']):>7} {_fmt(summary['classification_accuracy'], '{:.2f}'):>6} "
+            f"{_fmt(summary['no_template_accuracy'], '{:.2f}'):>7} "
+            f"{summary['latency_ms_p50']:>7.1f} {summary['latency_ms_p95']:>7.1f}  {stages}"
+        )
+    return "\n".join(lines)
+
+
+def is_baseline(result: RunResult) -> bool:
+    options = result.options
+    return all(options.get(key) == value for key, value in BASELINE_OPTIONS.items()) and (
+        options.get("profile") == DEFAULT_DETECTION_PROFILE.name
+    )
+
+
+def find_regressions(results: List[RunResult], baseline: RunResult) -> List[str]:
+    """Konfigurationen, die bei Eckfehler oder Akzeptanzrate hinter ``baseline`` zurückfallen."""
+    reference = baseline.summary()
+    regressions: List[str] = []
+    for result in results:
+        if result is baseline:
+            continue
+        summary = result.summary()
+        options = ", ".join(f"{key}={value}" for key, value in summary["options"].items())
+        if reference["corner_error_px_mean"] is not None and (
+            summary["corner_error_px_mean"] is None
+            or summary["corner_error_px_mean"] > reference["corner_error_px_mean"] + CORNER_ERROR_TOLERANCE_PX
+        ):
+            regressions.append(
+                f"{options}: Eckfehler {_fmt(summary['corner_error_px_mean'], '{:.1f}')} px "
+                f"> Baseline {reference['corner_error_px_mean']:.1f} px"
+            )
+        if (summary["accept_rate"] or 0.0) < (reference["accept_rate"] or 0.0) - ACCEPT_RATE_TOLERANCE:
+            regressions.append(
+                f"{options}: Akzeptanzrate {_fmt(summary['accept_rate'], '{:.2f}')} "
+                f"< Baseline {_fmt(reference['accept_rate'], '{:.2f}')}"
+            )
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Detektor gegen gelabelte Ground Truth auswerten.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--templates", default=TEMPLATES_DIR)
+    parser.add_argument("--backends", default="ndarray", help=f"Kommagetrennt aus {', '.join(BACKENDS)}")
+    parser.add_argument("--buffers", default="off", help="off,on")
+    parser.add_argument("--orientation", default=DEFAULT_ORIENTATION, help=f"{ORIENTATION_AWARE},{ORIENTATION_ROTATE}")
+    parser.add_argument("--profiles", default="", help="Profil-Dateien (JSON/TOML), leer = eingebaute Vorgaben")
+    parser.add_argument("--all", action="store_true", help="Alle Backends, Puffer- und Orientierungs-Modi kombinieren")
+    parser.add_argument("--repeat", type=int, default=1, help="Wiederholungen je Sample für stabilere Latenzen")
+    parser.add_argument("--json", default=None, help="Ergebnisse zusätzlich als JSON schreiben")
+    args = parser.parse_args()
+
+    backends = list(BACKENDS) if args.all else _split(args.backends)
+    buffer_modes = [False, True] if args.all else [mode == "on" for mode in _split(args.buffers)]
+    orientations = [ORIENTATION_AWARE, ORIENTATION_ROTATE] if args.all else _split(args.orientation)
+    profiles = [load_profile(path, DEFAULT_DETECTION_PROFILE) for path in _split(args.profiles)]
+    profiles = profiles or [DEFAULT_DETECTION_PROFILE]
+    for name in backends:
+        if name not in BACKENDS:
+            parser.error(f"Unbekanntes Backend '{name}'.")
+
+    dataset = load_dataset(args.dataset, args.templates)
+    detection_boxes = load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES)
+    print(
+        f"{len(dataset.samples)} Samples, {len(dataset.classification_templates)} Templates zur Klassifikation, "
+        f"{len(backends) * len(buffer_modes) * len(orientations) * len(profiles)} Konfigurationen"
+    )
+
+    results = run_matrix(dataset, detection_boxes, backends, buffer_modes, orientations, profiles, args.repeat)
+    baseline = next((result for result in results if is_baseline(result)), None)
+    if baseline is None:
+        # Die Referenz läuft immer mit, auch wenn die Matrix sie nicht enthält.
+        baseline = run_configuration(
+            dataset,
+            detection_boxes,
+            BASELINE_OPTIONS["backend"],
+            BASELINE_OPTIONS["buffers"] == "on",
+            BASELINE_OPTIONS["orientation"],
+            DEFAULT_DETECTION_PROFILE,
+            args.repeat,
+        )
+        results.insert(0, baseline)
+    print(format_report(results))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump([result.summary() for result in results], handle, indent=2)
+
+    regressions = find_regressions(results, baseline)
+    if regressions:
+        print("Regression gegenüber der Baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import cv2
 import os
-import json
+import sys
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template-gen"))
+from utils.template_registry import get_registry
+
 # --- Default-Template (prozentual) ---
 DEFAULT_TEMPLATE_BOXES = [
     {"id": "box_1", "x": 1.54, "y": 4.62, "width": 4.39, "height": 3.48},
@@ -24,27 +27,8 @@ BOX_ACCURACY_THRESHOLD = 0.6  # Mindestens 70% der Boxen müssen erkannt werden
 # JSON-Template laden (Datei mit Liste von Box-Objekten)
 def load_template_from_json(file_path):
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Template JSON muss eine Liste sein.")
-
-        normalized_boxes = []
-        for item in data:
-            # Nur Elemente mit den benötigten Schlüsseln übernehmen
-            if not all(k in item for k in ("id", "x", "y", "width", "height")):
-                continue
-            normalized_boxes.append({
-                "id": str(item["id"]),
-                "x": float(item["x"]),
-                "y": float(item["y"]),
-                "width": float(item["width"]),
-                "height": float(item["height"]),
-            })
-
-        if not normalized_boxes:
-            raise ValueError("Keine gültigen Boxen in JSON gefunden.")
-        return normalized_boxes
+        # Parsen und Validieren übernimmt die gemeinsame Template-Registry
+        return get_registry().get(file_path).as_dicts(with_label=False)
     except Exception as e:
         print(f"Fehler beim Laden der Template-Datei '{file_path}': {e}")
         return None
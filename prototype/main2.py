@@ -1,11 +1,39 @@
+import argparse
 import cv2
-import json
 import os
+import sys
+import threading
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from array_backend import (
+    BACKEND_AUTO,
+    BACKENDS,
+    CANNY_HIGH,
+    CANNY_LOW,
+    ArrayBackend,
+    describe_selection,
+    get_backend,
+    select_backend,
+    set_backend,
+)
+from capture_archive import CaptureArchive
+from detection_profile import DetectionProfile, ProfileStats, ProfileWatcher, format_profile_report, load_profile
+from display_sink import DisplaySink
+from screen_lock import EVENT_STABLE, LockEvent, ScreenLockStateMachine
+from session_store import SessionStore
+from template_watcher import TemplateWatcher
+
+TEMPLATE_GEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template-gen")
+if TEMPLATE_GEN_DIR not in sys.path:
+    sys.path.insert(0, TEMPLATE_GEN_DIR)
+from modules.template_analyzer import TemplateAnalyzer  # noqa: E402 - liegt in template-gen
+from modules.template_versions import TemplateDiff, diff_templates  # noqa: E402 - liegt in template-gen
+from utils.template_registry import get_registry  # noqa: E402 - liegt in template-gen
+
 # ---------------------------------------------------------------------------
 # Konfiguration & Konstanten
 # ---------------------------------------------------------------------------
@@ -31,6 +59,22 @@ TARGET_SCREEN_HEIGHT = 1600
 STREAM_URL = "rtsp://127.0.0.1:8080/h264.sdp"
 FFMPEG_CAPTURE_OPTIONS = "rtsp_transport;udp|max_delay;0"
 WINDOW_SCALE = 0.5
+FRAME_ROTATION = cv2.ROTATE_90_CLOCKWISE
+# Kanten auf dem unrotierten Frame; per evaluate_dataset.py nur nahezu gleichwertig
+# zum Drehen vor der Detektion (Canny/findContours sind nicht exakt rotationsinvariant).
+ORIENTATION_AWARE_DETECTION = False
+# Kandidaten, deren Rechteckigkeit höchstens so weit unter der besten liegt, gelten als
+# gleichwertig; dann gewinnt die größere Fläche statt der Kontur-Reihenfolge.
+CANDIDATE_SCORE_TOLERANCE = 0.02
+# Kantenstufe: "ndarray", "umat" (OpenCV T-API) oder "auto" (Micro-Benchmark beim Start).
+ARRAY_BACKEND = BACKEND_AUTO
+DISPLAY_ENABLED = True
+# Hysterese der Screen-Erkennung: Erfassen ab BOX_ACCURACY_THRESHOLD, Verlust erst darunter.
+UNLOCK_ACCURACY_THRESHOLD = 0.6
+LOCK_MIN_DWELL_FRAMES = 5
+LOCK_LOSS_FRAMES = 3
+# Dauerbetrieb ohne GUI-Interaktion: jede stabile Phase wird einmal gespeichert.
+CONTINUOUS_DETECTION = False
 
 ROI_OUTER = {
     "x": {"mode": "percent", "value": 10.0},
@@ -46,14 +90,83 @@ ROI_INNER = {
     "height": {"mode": "percent", "value": 60.0},
 }
 
+# Obige Schwellwerte sind die Vorgaben; zur Laufzeit gilt das Detektionsprofil
+# (JSON/TOML, wird bei Änderung der Datei ohne Neustart des Streams neu geladen).
+DETECTION_PROFILE_PATH = os.path.join(os.path.dirname(__file__), "profiles", "default.json")
+
 Rect = Tuple[int, int, int, int]
 TemplateBox = Dict[str, float]
+# Box-Dicts oder float32-Geometrie (N, 4) in Prozent, z. B. direkt aus einem Template-Bundle
+TemplateSource = Union[List[TemplateBox], np.ndarray]
 
 JSON_TEMPLATE_PATH = os.path.join(
     os.path.dirname(__file__),
     "templates",
     "0.1 Bildschirmaufbau_Screendetection.json",
 )
+TEMPLATE_ID = os.path.splitext(os.path.basename(JSON_TEMPLATE_PATH))[0]
+# Geänderte Templates in diesem Verzeichnis werden zwischen zwei Frames übernommen ("" = aus).
+TEMPLATE_WATCH_DIR = os.path.dirname(JSON_TEMPLATE_PATH)
+# Nur die vom Template-Analyzer empfohlenen Boxen bewerten (ohne Gruppen-Boxen,
+# Duplikate und degenerierte Boxen, siehe template-gen/modules/template_analyzer.py).
+DETECTION_BOX_SUBSET = False
+
+SESSION_STORE_ENABLED = True
+SESSION_STORE_PATH = os.path.join(os.path.dirname(__file__), "data", "sessions.sqlite3")
+CAPTURE_ARCHIVE_ENABLED = True
+CAPTURE_ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), "data", "archive")
+
+# Laufzeit-Parallelität (überschreibbar per Umgebung SCREEN_* oder CLI, siehe RuntimeConfig).
+# None bedeutet jeweils: Standard von OpenCV bzw. Anzahl CPU-Kerne.
+OPENCV_THREADS: Optional[int] = None
+CPU_AFFINITY: Optional[str] = None  # z. B. "0-3,6"
+CAPTURE_THREADS: Optional[int] = None  # FFmpeg-Decoder-Threads pro Capture
+DETECTION_WORKERS: Optional[int] = None
+RUNTIME_ENV_PREFIX = "SCREEN_"
+
+
+DEFAULT_DETECTION_PROFILE = DetectionProfile(
+    name="builtin",
+    box_accuracy_threshold=BOX_ACCURACY_THRESHOLD,
+    unlock_accuracy_threshold=UNLOCK_ACCURACY_THRESHOLD,
+    roi_tolerance_px=ROI_TOLERANCE_PX,
+    template_match_min_iou=TEMPLATE_MATCH_MIN_IOU,
+    canny_low=CANNY_LOW,
+    canny_high=CANNY_HIGH,
+    roi_outer=ROI_OUTER,
+    roi_inner=ROI_INNER,
+)
+_detection_profile = DEFAULT_DETECTION_PROFILE
+
+
+def get_detection_profile() -> DetectionProfile:
+    return _detection_profile
+
+
+def set_detection_profile(profile: DetectionProfile) -> None:
+    global _detection_profile  # pylint: disable=global-statement
+    _detection_profile = profile
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", default=DETECTION_PROFILE_PATH, help="Detektionsprofil (JSON/TOML)")
+
+
+def activate_detection_profile(path: Optional[str]) -> DetectionProfile:
+    """
+    Lädt ``path`` und setzt es als aktives Profil dieses Prozesses. Fehlt die Datei oder
+    ist sie ungültig, gelten die eingebauten Vorgaben (wie beim ``ProfileWatcher``).
+    """
+    profile = DEFAULT_DETECTION_PROFILE
+    if path and os.path.exists(path):
+        try:
+            profile = load_profile(path, DEFAULT_DETECTION_PROFILE)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Profil '{path}' ungültig, nutze eingebaute Vorgaben: {exc}")
+    elif path:
+        print(f"Profil '{path}' nicht gefunden, nutze eingebaute Vorgaben.")
+    set_detection_profile(profile)
+    return profile
 
 
 @dataclass
@@ -64,6 +177,186 @@ class FrameEvaluation:
     capture_frame: Optional[np.ndarray]
     homography: Optional[np.ndarray]
     accuracy: float
+    rotation: Optional[int] = None
+    box_scores: Optional[List[float]] = None
+
+
+class FrameBufferPool:
+    """
+    Wiederverwendbare Arbeits-Arrays für die Detektionsschleife.
+
+    Die Puffer werden beim ersten Frame angelegt und nur bei Auflösungswechsel neu
+    alloziert. Arrays aus dem Pool (z. B. ``annotated_frame``) werden im nächsten
+    Durchlauf überschrieben und müssen bei Bedarf vom Aufrufer kopiert werden.
+    Wer einen Puffer länger braucht (z. B. ein Anzeige-Thread), löst ihn mit ``detach``
+    heraus und gibt ihn danach mit ``recycle`` zurück.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._spares: Dict[str, List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: type = np.uint8) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._take_spare(name, shape, dtype)
+            if buffer is None:
+                buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+
+    def _take_spare(self, name: str, shape: Tuple[int, ...], dtype: type) -> Optional[np.ndarray]:
+        with self._lock:
+            spares = self._spares.get(name, [])
+            while spares:
+                spare = spares.pop()
+                if spare.shape == shape and spare.dtype == dtype:
+                    return spare
+        return None
+
+    def detach(self, name: str) -> Optional[np.ndarray]:
+        return self._buffers.pop(name, None)
+
+    def recycle(self, name: str, buffer: np.ndarray) -> None:
+        with self._lock:
+            self._spares.setdefault(name, []).append(buffer)
+
+    def clear(self) -> None:
+        self._buffers.clear()
+        with self._lock:
+            self._spares.clear()
+
+
+# ---------------------------------------------------------------------------
+# Laufzeit-Konfiguration (Threads, CPU-Affinität, Worker-Anzahl)
+# ---------------------------------------------------------------------------
+@dataclass
+class RuntimeConfig:
+    """
+    Parallelitäts-Einstellungen des Detektors.
+
+    Priorität: CLI vor Umgebung (``SCREEN_OPENCV_THREADS``, ``SCREEN_CPU_AFFINITY``,
+    ``SCREEN_CAPTURE_THREADS``, ``SCREEN_DETECTION_WORKERS``) vor Modul-Konstanten.
+    ``opencv_threads`` gilt pro Prozess, also auch in jedem Detektions-Worker; bei
+    N Worker-Prozessen verhindert ein kleiner Wert die Überbelegung der Kerne.
+    """
+
+    opencv_threads: Optional[int] = None
+    cpu_affinity: Optional[List[int]] = None
+    capture_threads: Optional[int] = None
+    detection_workers: Optional[int] = None
+
+    @property
+    def effective_detection_workers(self) -> int:
+        if self.detection_workers:
+            return self.detection_workers
+        if self.cpu_affinity:
+            return len(self.cpu_affinity)
+        return os.cpu_count() or 1
+
+
+_runtime_config = RuntimeConfig()
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parst CPU-Listen wie ``"0-3,6"``."""
+    cpus: List[int] = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    if not cpus:
+        raise ValueError(f"Leere CPU-Liste '{text}'.")
+    return sorted(set(cpus))
+
+
+def add_runtime_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("Laufzeit")
+    group.add_argument("--opencv-threads", type=int, default=None, help="cv2.setNumThreads pro Prozess (0 = seriell)")
+    group.add_argument("--cpu-affinity", default=None, help="CPU-Kerne, z. B. 0-3,6")
+    group.add_argument("--capture-threads", type=int, default=None, help="Decoder-Threads pro Capture")
+    group.add_argument(
+        "--detection-workers",
+        "--workers",
+        dest="detection_workers",
+        type=int,
+        default=None,
+        help="Anzahl Detektions-Worker (Standard: CPU-Kerne)",
+    )
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(RUNTIME_ENV_PREFIX + name)
+    return int(value) if value not in (None, "") else None
+
+
+def load_runtime_config(args: Optional[argparse.Namespace] = None) -> RuntimeConfig:
+    def pick(attribute: str, env_value, default):
+        cli_value = getattr(args, attribute, None) if args is not None else None
+        if cli_value is not None:
+            return cli_value
+        return env_value if env_value is not None else default
+
+    affinity = pick("cpu_affinity", os.environ.get(RUNTIME_ENV_PREFIX + "CPU_AFFINITY") or None, CPU_AFFINITY)
+    return RuntimeConfig(
+        opencv_threads=pick("opencv_threads", _env_int("OPENCV_THREADS"), OPENCV_THREADS),
+        cpu_affinity=parse_cpu_list(affinity) if affinity else None,
+        capture_threads=pick("capture_threads", _env_int("CAPTURE_THREADS"), CAPTURE_THREADS),
+        detection_workers=pick("detection_workers", _env_int("DETECTION_WORKERS"), DETECTION_WORKERS),
+    )
+
+
+def init_opencv_threads(threads: Optional[int]) -> None:
+    """Auch als ``initializer`` für Worker-Prozesse gedacht."""
+    if threads is not None:
+        cv2.setNumThreads(threads)
+
+
+def detection_worker_initargs() -> Tuple[Optional[int], DetectionProfile, str]:
+    """Argumente für ``init_detection_worker``: Threads, Profil und Backend dieses Prozesses."""
+    return get_runtime_config().opencv_threads, get_detection_profile(), get_backend().name
+
+
+def init_detection_worker(threads: Optional[int], profile: DetectionProfile, backend_name: str) -> None:
+    """
+    ``initializer`` für Detektions-Worker: übernimmt Threads, Profil und Backend des
+    Elternprozesses, damit alle Prozesse mit denselben Schwellwerten arbeiten.
+    """
+    init_opencv_threads(threads)
+    set_detection_profile(profile)
+    set_backend(BACKENDS[backend_name])
+
+
+def apply_runtime_config(config: RuntimeConfig) -> RuntimeConfig:
+    """Setzt Threads und Affinität für diesen Prozess und merkt sich die Konfiguration."""
+    global _runtime_config  # pylint: disable=global-statement
+    init_opencv_threads(config.opencv_threads)
+    if config.cpu_affinity:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, config.cpu_affinity)
+        else:
+            print("Hinweis: CPU-Affinität wird auf dieser Plattform nicht unterstützt.", file=sys.stderr)
+    _runtime_config = config
+    return config
+
+
+def get_runtime_config() -> RuntimeConfig:
+    return _runtime_config
+
+
+def format_runtime_report(config: RuntimeConfig) -> str:
+    affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    return (
+        f"Laufzeit: OpenCV-Threads {cv2.getNumThreads()}"
+        f" (angefordert {config.opencv_threads if config.opencv_threads is not None else 'Standard'}),"
+        f" CPU-Affinität {affinity if affinity is not None else 'n/a'},"
+        f" Capture-Threads {config.capture_threads if config.capture_threads is not None else 'Standard'},"
+        f" Detektions-Worker {config.effective_detection_workers},"
+        f" CPU-Kerne {os.cpu_count()}"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -180,6 +473,53 @@ def rect_within_roi(
     return True
 
 
+# ---------------------------------------------------------------------------
+# Orientierungs-Helfer (Rotation analytisch statt per Pixelkopie)
+# ---------------------------------------------------------------------------
+def oriented_size(rotation: Optional[int], width: int, height: int) -> Tuple[int, int]:
+    if rotation in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE):
+        return height, width
+    return width, height
+
+
+def rotation_matrix(rotation: Optional[int], width: int, height: int) -> np.ndarray:
+    """Bildet Pixelkoordinaten des unrotierten Frames auf die von cv2.rotate ab (3x3)."""
+    if rotation is None:
+        return np.eye(3, dtype=np.float64)
+    if rotation == cv2.ROTATE_90_CLOCKWISE:
+        return np.array([[0, -1, height - 1], [1, 0, 0], [0, 0, 1]], dtype=np.float64)
+    if rotation == cv2.ROTATE_90_COUNTERCLOCKWISE:
+        return np.array([[0, 1, 0], [-1, 0, width - 1], [0, 0, 1]], dtype=np.float64)
+    if rotation == cv2.ROTATE_180:
+        return np.array([[-1, 0, width - 1], [0, -1, height - 1], [0, 0, 1]], dtype=np.float64)
+    raise ValueError(f"Unbekannte Rotation: {rotation}")
+
+
+def rotate_contours(contours: List[np.ndarray], matrix: np.ndarray) -> List[np.ndarray]:
+    """
+    Überführt Konturen in die rotierte Lage. Jede Kontur beginnt danach wie bei
+    findContours auf dem rotierten Bild am obersten, linkesten Punkt, weil
+    approxPolyDP vom Startpunkt abhängt.
+    """
+    linear = matrix[:2, :2].astype(np.int32)
+    offset = matrix[:2, 2].astype(np.int32)
+    rotated = []
+    for contour in contours:
+        mapped = contour @ linear.T + offset
+        points = mapped.reshape(-1, 2)
+        start = int(np.argmin(points[:, 1] * 65536 + points[:, 0]))
+        rotated.append(np.roll(mapped, -start, axis=0) if start else mapped)
+    return rotated
+
+
+def transform_rect(rect: Rect, matrix: np.ndarray) -> Rect:
+    corners = rect_to_pts_xyxy(rect).reshape(-1, 1, 2)
+    mapped = cv2.transform(corners, matrix[:2]).reshape(-1, 2)
+    min_x, min_y = np.min(mapped, axis=0)
+    max_x, max_y = np.max(mapped, axis=0)
+    return int(round(min_x)), int(round(min_y)), int(round(max_x - min_x)), int(round(max_y - min_y))
+
+
 # ---------------------------------------------------------------------------
 # Template- und Homographie-Helfer
 # ---------------------------------------------------------------------------
@@ -192,6 +532,16 @@ def percent_box_to_pts(box: TemplateBox, tw: int, th: int) -> np.ndarray:
     return np.float32([tl, tr, br, bl])
 
 
+def template_geometry(template_boxes: TemplateSource) -> np.ndarray:
+    """(N, 4) float32 mit x, y, Breite, Höhe in Prozent; Arrays werden unverändert durchgereicht."""
+    if isinstance(template_boxes, np.ndarray):
+        return template_boxes
+    return np.array(
+        [[box["x"], box["y"], box["width"], box["height"]] for box in template_boxes],
+        dtype=np.float32,
+    ).reshape(-1, 4)
+
+
 def build_correspondences(
     template_boxes: List[TemplateBox],
     matches: List[Optional[Rect]],
@@ -271,41 +621,63 @@ def iou(box_a: Tuple[float, float, float, float], box_b: Tuple[float, float, flo
 # ---------------------------------------------------------------------------
 def load_template_boxes(template_path: str, fallback: List[TemplateBox]) -> List[TemplateBox]:
     try:
-        with open(template_path, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-        if not isinstance(data, list):
-            raise ValueError("Template JSON muss eine Liste sein.")
-
-        normalized: List[TemplateBox] = []
-        for item in data:
-            if not all(key in item for key in ("id", "x", "y", "width", "height")):
-                continue
-            normalized.append(
-                {
-                    "id": str(item["id"]),
-                    "x": float(item["x"]),
-                    "y": float(item["y"]),
-                    "width": float(item["width"]),
-                    "height": float(item["height"]),
-                }
-            )
-
-        if not normalized:
-            raise ValueError("Keine gültigen Boxen in JSON gefunden.")
-        return normalized
+        return get_registry().get(template_path).as_dicts(with_label=False)
     except Exception as exc:  # pylint: disable=broad-except
         print(f"Fehler beim Laden der Template-Datei '{template_path}': {exc}")
         return fallback
 
 
+def load_bundle_template(
+    bundle_path: str, name: str = TEMPLATE_ID
+) -> Optional[Tuple[np.ndarray, List[TemplateBox]]]:
+    """
+    Template aus einem binären Bundle (``utils.template_bundle``). Die Geometrie ist ein
+    read-only View auf die gemappte Datei und geht unverändert in ``evaluate_frame``;
+    die Box-Dicts dienen nur Session-Store und Warp-Anzeige.
+    """
+    try:
+        bundle = get_registry().bundle(bundle_path)
+        geometry = bundle.geometry(name)
+        ids = bundle.ids(name)
+    except (OSError, KeyError, ValueError) as exc:
+        print(f"Fehler beim Laden des Bundles '{bundle_path}': {exc}")
+        return None
+    # Kürzeste float32-Darstellung wie in TemplateBundle.template (22.68 statt 22.680000305)
+    boxes = [
+        dict(zip(("id", "x", "y", "width", "height"), (box_id, *(float(str(value)) for value in row))))
+        for box_id, row in zip(ids, geometry)
+    ]
+    return geometry, boxes
+
+
+def select_detection_boxes(template_boxes: List[TemplateBox], name: str = TEMPLATE_ID) -> List[TemplateBox]:
+    selected = TemplateAnalyzer().select_boxes(template_boxes, name)
+    if len(selected) < len(template_boxes):
+        dropped = sorted({box["id"] for box in template_boxes} - {box["id"] for box in selected})
+        print(f"Template '{name}': {len(selected)}/{len(template_boxes)} Boxen für die Detektion, ohne {', '.join(dropped)}")
+    return selected
+
+
 def configure_capture(stream_url: str) -> cv2.VideoCapture:
     os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_CAPTURE_OPTIONS)
-    cap = cv2.VideoCapture(stream_url)
+    capture_threads = get_runtime_config().capture_threads
+    if capture_threads is not None:
+        cap = cv2.VideoCapture(stream_url, cv2.CAP_ANY, [cv2.CAP_PROP_N_THREADS, capture_threads])
+    else:
+        cap = cv2.VideoCapture(stream_url)
     cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
     return cap
 
 
 def grab_latest_frame(cap: cv2.VideoCapture) -> Optional[np.ndarray]:
+    """
+    Neuester Frame. Bei Netzwerk-Streams werden gepufferte Frames verworfen; Quellen mit
+    ``drops_stale_frames`` (z. B. ``ReplayCapture``) takten selbst und werden genau einmal
+    gelesen, sonst sähe der Detektor im Replay nur jeden dritten Frame.
+    """
+    if getattr(cap, "drops_stale_frames", False):
+        ret, frame = cap.read()
+        return frame if ret else None
     for _ in range(3):
         cap.grab()
     ret, frame = cap.retrieve()
@@ -345,11 +717,16 @@ def find_best_screen_candidate(
     contours: List[np.ndarray],
     roi_inner_rect: Rect,
     roi_outer_rect: Rect,
+    tolerance: int = ROI_TOLERANCE_PX,
 ) -> Optional[Tuple[Rect, np.ndarray]]:
-    best_rect: Optional[Rect] = None
-    best_polygon: Optional[np.ndarray] = None
-    best_score = 0.0
-
+    """
+    Wählt das Screen-Viereck unabhängig von der Kontur-Reihenfolge.
+
+    Bewertet wird die Rechteckigkeit (Vierecksfläche / Fläche des umschließenden
+    Rechtecks), die verformte Näherungen erkennt. Bei nahezu gleicher Bewertung gewinnt
+    die größere Fläche, danach die Lage (oben links zuerst).
+    """
+    candidates = []
     for contour in contours:
         quad = contour_to_quadrilateral(contour)
         if quad is None:
@@ -357,87 +734,164 @@ def find_best_screen_candidate(
 
         x, y, w, h = cv2.boundingRect(quad.reshape(-1, 1, 2).astype(np.int32))
         screen_rect: Rect = (x, y, w, h)
-        if not rect_within_roi(screen_rect, roi_inner_rect, roi_outer_rect, tolerance=ROI_TOLERANCE_PX):
+        if not rect_within_roi(screen_rect, roi_inner_rect, roi_outer_rect, tolerance=tolerance):
             continue
 
-        score = iou(screen_rect, polygon_to_bbox(quad))
-        if score > best_score:
-            best_score = score
-            best_rect = screen_rect
-            best_polygon = quad
+        score = abs(float(cv2.contourArea(quad))) / float(max(1, w * h))
+        candidates.append((score, w * h, -y, -x, screen_rect, quad))
 
-    if best_rect is None or best_polygon is None:
+    if not candidates:
         return None
+    best_score = max(candidate[0] for candidate in candidates)
+    _, _, _, _, best_rect, best_polygon = max(
+        (candidate for candidate in candidates if candidate[0] >= best_score - CANDIDATE_SCORE_TOLERANCE),
+        key=lambda candidate: candidate[1:4],
+    )
     return best_rect, best_polygon
 
 
 def build_projected_rectangles(
-    template_boxes: List[TemplateBox],
+    template_boxes: TemplateSource,
     homography: np.ndarray,
 ) -> List[Tuple[float, float, float, float]]:
-    rectangles: List[Tuple[float, float, float, float]] = []
-    for template_box in template_boxes:
-        projected_poly = project_box(homography, template_box, TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT)
-        ordered_poly = order_polygon(projected_poly)
-        rectangles.append(polygon_to_bbox(ordered_poly))
-    return rectangles
+    geometry = template_geometry(template_boxes)
+    if not len(geometry):
+        return []
+    x0 = geometry[:, 0] / 100.0 * TARGET_SCREEN_WIDTH
+    y0 = geometry[:, 1] / 100.0 * TARGET_SCREEN_HEIGHT
+    x1 = (geometry[:, 0] + geometry[:, 2]) / 100.0 * TARGET_SCREEN_WIDTH
+    y1 = (geometry[:, 1] + geometry[:, 3]) / 100.0 * TARGET_SCREEN_HEIGHT
+    corners = np.stack([x0, y0, x1, y0, x1, y1, x0, y1], axis=1).astype(np.float32)
+    # Alle Boxen in einem Aufruf projizieren statt einmal pro Box.
+    projected = cv2.perspectiveTransform(corners.reshape(-1, 1, 2), homography).reshape(-1, 4, 2)
+    mins = projected.min(axis=1)
+    sizes = np.maximum(1.0, projected.max(axis=1) - mins)
+    return [
+        (float(min_x), float(min_y), float(width), float(height))
+        for (min_x, min_y), (width, height) in zip(mins.tolist(), sizes.tolist())
+    ]
+
+
+def compute_box_scores(
+    contours: List[np.ndarray],
+    projected_rectangles: List[Tuple[float, float, float, float]],
+) -> List[float]:
+    """Beste IoU je projizierter Template-Box gegen alle viereckigen Konturen."""
+    contour_rects: List[Rect] = []
+    for contour in contours:
+        quad = contour_to_quadrilateral(contour)
+        if quad is None:
+            continue
+        contour_rects.append(cv2.boundingRect(quad.reshape(-1, 1, 2).astype(np.int32)))
+
+    scores: List[float] = []
+    for rect_candidate in projected_rectangles:
+        best_iou_value = 0.0
+        for contour_rect in contour_rects:
+            best_iou_value = max(best_iou_value, iou(rect_candidate, contour_rect))
+        scores.append(best_iou_value)
+    return scores
+
+
+def accuracy_from_scores(box_scores: List[float], min_iou: float = TEMPLATE_MATCH_MIN_IOU) -> float:
+    if not box_scores:
+        return 0.0
+    matches = sum(1 for score in box_scores if score >= min_iou)
+    return matches / len(box_scores)
 
 
 def compute_template_accuracy(
     contours: List[np.ndarray],
     projected_rectangles: List[Tuple[float, float, float, float]],
 ) -> float:
-    if not projected_rectangles:
-        return 0.0
+    return accuracy_from_scores(compute_box_scores(contours, projected_rectangles))
 
-    matches = 0
-    for rect_candidate in projected_rectangles:
-        best_iou_value = 0.0
-        for contour in contours:
-            quad = contour_to_quadrilateral(contour)
-            if quad is None:
-                continue
-            cx, cy, cw, ch = cv2.boundingRect(quad.reshape(-1, 1, 2).astype(np.int32))
-            best_iou_value = max(best_iou_value, iou(rect_candidate, (cx, cy, cw, ch)))
-        if best_iou_value >= TEMPLATE_MATCH_MIN_IOU:
-            matches += 1
-
-    return matches / max(1, len(projected_rectangles))
-
-
-def evaluate_frame(frame: np.ndarray, template_boxes: List[TemplateBox]) -> FrameEvaluation:
-    base_capture = frame.copy()
-    annotated = frame.copy()
-
-    height, width = frame.shape[:2]
-    roi_outer_rect = compute_roi_rect(ROI_OUTER, width, height)
-    roi_inner_rect = compute_roi_rect(ROI_INNER, width, height)
-
-    cv2.rectangle(
-        annotated,
-        (roi_outer_rect[0], roi_outer_rect[1]),
-        (roi_outer_rect[0] + roi_outer_rect[2], roi_outer_rect[1] + roi_outer_rect[3]),
-        (0, 255, 0),
-        1,
-    )
-    cv2.rectangle(
-        annotated,
-        (roi_inner_rect[0], roi_inner_rect[1]),
-        (roi_inner_rect[0] + roi_inner_rect[2], roi_inner_rect[1] + roi_inner_rect[3]),
-        (0, 0, 255),
-        1,
+
+def draw_accuracy_label(
+    img: np.ndarray,
+    accuracy: float,
+    scale: float = 1.0,
+    threshold: float = BOX_ACCURACY_THRESHOLD,
+) -> None:
+    cv2.putText(
+        img,
+        f"Accuracy: {accuracy:.2f}",
+        (int(round(10 * scale)), int(round(30 * scale))),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1.0 * scale,
+        (0, 255, 0) if accuracy >= threshold else (0, 0, 255),
+        max(1, int(round(2 * scale))),
     )
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    candidate = find_best_screen_candidate(contours, roi_inner_rect, roi_outer_rect)
+def _record_stage(timings: Optional[Dict[str, float]], stage: str, start: float) -> float:
+    if timings is None:
+        return start
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + (now - start) * 1000.0
+    return now
+
+
+def evaluate_frame(
+    frame: np.ndarray,
+    template_boxes: TemplateSource,
+    rotation: Optional[int] = None,
+    buffers: Optional[FrameBufferPool] = None,
+    backend: Optional[ArrayBackend] = None,
+    profile: Optional[DetectionProfile] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> FrameEvaluation:
+    """
+    Wertet einen Frame aus. Mit ``rotation`` wird der unrotierte Kamera-Frame erwartet:
+    Kanten und Konturen entstehen im Originalbild, alle Geometrie (ROIs, Konturen,
+    Homographie) wird analytisch in die rotierte Lage überführt. Pixel werden nur für
+    den akzeptierten Capture gedreht; der annotierte Frame bleibt unrotiert.
+
+    Mit ``buffers`` schreiben alle Zwischenstufen in wiederverwendete Arrays. Die
+    Kantenstufe läuft auf ``backend`` (Standard: das beim Start gewählte Backend),
+    alle Schwellwerte kommen aus ``profile`` (Standard: das aktive Detektionsprofil).
+    Ein übergebenes ``timings``-Dict erhält die Dauer je Stufe in Millisekunden.
+    """
+    stage_start = time.perf_counter() if timings is not None else 0.0
+    if backend is None:
+        backend = get_backend()
+    if profile is None:
+        profile = get_detection_profile()
+    raw_height, raw_width = frame.shape[:2]
+    if buffers is None:
+        annotated = frame.copy()
+        gray_dst = edges_dst = None
+    else:
+        annotated = buffers.get("annotated", frame.shape)
+        np.copyto(annotated, frame)
+        gray_dst = buffers.get("gray", (raw_height, raw_width))
+        edges_dst = buffers.get("edges", (raw_height, raw_width))
+
+    width, height = oriented_size(rotation, raw_width, raw_height)
+    to_oriented = rotation_matrix(rotation, raw_width, raw_height)
+    to_frame = np.linalg.inv(to_oriented)
+
+    roi_outer_rect = compute_roi_rect(profile.roi_outer, width, height)
+    roi_inner_rect = compute_roi_rect(profile.roi_inner, width, height)
+
+    for roi_rect, color in ((roi_outer_rect, (0, 255, 0)), (roi_inner_rect, (0, 0, 255))):
+        rx, ry, rw, rh = roi_rect if rotation is None else transform_rect(roi_rect, to_frame)
+        cv2.rectangle(annotated, (rx, ry), (rx + rw, ry + rh), color, 1)
+
+    stage_start = _record_stage(timings, "prepare", stage_start)
+
+    contours = backend.detect_contours(frame, gray_dst, edges_dst, profile.canny_low, profile.canny_high)
+    if rotation is not None:
+        contours = rotate_contours(contours, to_oriented)
+    stage_start = _record_stage(timings, "edges", stage_start)
+
+    candidate = find_best_screen_candidate(contours, roi_inner_rect, roi_outer_rect, profile.roi_tolerance_px)
+    stage_start = _record_stage(timings, "candidate", stage_start)
     if candidate is None:
-        return FrameEvaluation(annotated, None, None, 0.0)
+        return FrameEvaluation(annotated, None, None, 0.0, rotation)
 
     screen_rect, screen_polygon = candidate
-    sx, sy, sw, sh = screen_rect
+    sx, sy, sw, sh = screen_rect if rotation is None else transform_rect(screen_rect, to_frame)
     cv2.rectangle(annotated, (sx, sy), (sx + sw, sy + sh), (255, 255, 0), 2)
 
     src_pts = np.float32(
@@ -452,47 +906,219 @@ def evaluate_frame(frame: np.ndarray, template_boxes: List[TemplateBox]) -> Fram
     homography = cv2.getPerspectiveTransform(src_pts, dst_pts)
 
     projected_rectangles = build_projected_rectangles(template_boxes, homography)
-    accuracy = compute_template_accuracy(contours, projected_rectangles)
+    box_scores = compute_box_scores(contours, projected_rectangles)
+    accuracy = accuracy_from_scores(box_scores, profile.template_match_min_iou)
+    stage_start = _record_stage(timings, "scoring", stage_start)
 
-    cv2.putText(
-        annotated,
-        f"Accuracy: {accuracy:.2f}",
-        (10, 30),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        1.0,
-        (0, 255, 0) if accuracy >= BOX_ACCURACY_THRESHOLD else (0, 0, 255),
-        2,
-    )
+    if rotation is None:
+        draw_accuracy_label(annotated, accuracy, threshold=profile.box_accuracy_threshold)
 
-    capture = base_capture if accuracy >= BOX_ACCURACY_THRESHOLD else None
-    return FrameEvaluation(annotated, capture, homography, accuracy)
+    capture = None
+    if accuracy >= profile.box_accuracy_threshold:
+        capture = frame.copy() if rotation is None else cv2.rotate(frame, rotation)
+    _record_stage(timings, "capture", stage_start)
+    return FrameEvaluation(annotated, capture, homography, accuracy, rotation, box_scores)
 
 
-def run_detection_loop(cap: cv2.VideoCapture, template_boxes: List[TemplateBox]) -> Optional[FrameEvaluation]:
-    while True:
-        frame = grab_latest_frame(cap)
-        if frame is None:
-            break
+def evaluate_oriented_frame(
+    frame: np.ndarray,
+    template_boxes: TemplateSource,
+    rotation: Optional[int] = FRAME_ROTATION,
+    orientation_aware: bool = ORIENTATION_AWARE_DETECTION,
+    buffers: Optional[FrameBufferPool] = None,
+    **kwargs: Any,
+) -> FrameEvaluation:
+    """
+    Wertet einen unrotierten Kamera-Frame in der Lage ``rotation`` aus.
+
+    Ohne ``orientation_aware`` wird der Frame vorher gedreht (Referenzpfad), sonst rechnet
+    ``evaluate_frame`` die Geometrie analytisch um. Homographie und Capture liegen in
+    beiden Fällen in der rotierten Lage.
+    """
+    if rotation is None or orientation_aware:
+        return evaluate_frame(frame, template_boxes, rotation=rotation, buffers=buffers, **kwargs)
+    rotated = None
+    if buffers is not None:
+        width, height = oriented_size(rotation, frame.shape[1], frame.shape[0])
+        rotated = buffers.get("rotated", (height, width) + frame.shape[2:])
+    frame = cv2.rotate(frame, rotation, dst=rotated)
+    return evaluate_frame(frame, template_boxes, buffers=buffers, **kwargs)
+
+
+def prepare_display_frame(evaluation: FrameEvaluation, buffers: Optional[FrameBufferPool] = None) -> np.ndarray:
+    height, width = evaluation.annotated_frame.shape[:2]
+    display_size = (int(round(width * WINDOW_SCALE)), int(round(height * WINDOW_SCALE)))
+    display_dst = None
+    if buffers is not None:
+        display_dst = buffers.get("display", (display_size[1], display_size[0], 3))
+    display = cv2.resize(evaluation.annotated_frame, display_size, dst=display_dst)
+
+    if evaluation.rotation is not None:
+        # Nur das verkleinerte Vorschaubild wird gedreht, nicht der volle Frame.
+        rotated_dst = None
+        if buffers is not None:
+            rotated_w, rotated_h = oriented_size(evaluation.rotation, display_size[0], display_size[1])
+            rotated_dst = buffers.get("display_rotated", (rotated_h, rotated_w, 3))
+        display = cv2.rotate(display, evaluation.rotation, dst=rotated_dst)
+        draw_accuracy_label(
+            display,
+            evaluation.accuracy,
+            scale=WINDOW_SCALE,
+            threshold=get_detection_profile().box_accuracy_threshold,
+        )
+    return display
+
+
+def active_template_geometry(template_watcher: Optional[TemplateWatcher], fallback: TemplateSource) -> TemplateSource:
+    compiled = template_watcher.get(TEMPLATE_ID) if template_watcher is not None else None
+    return compiled.geometry if compiled is not None else fallback
+
+
+def active_template_boxes(template_watcher: Optional[TemplateWatcher], fallback: List[TemplateBox]) -> List[TemplateBox]:
+    compiled = template_watcher.get(TEMPLATE_ID) if template_watcher is not None else None
+    return compiled.boxes if compiled is not None else fallback
+
+
+def patch_template_geometry(
+    geometry: np.ndarray,
+    old_boxes: List[TemplateBox],
+    new_boxes: List[TemplateBox],
+    changes: TemplateDiff,
+) -> np.ndarray:
+    """
+    Geometrie nach einem Hot-Reload. ``geometry`` gehört zeilenweise zu ``old_boxes``;
+    unveränderte (auch umbenannte oder umsortierte) Boxen werden als Zeilen übernommen,
+    nur neue und in der Geometrie geänderte Boxen werden aus ``new_boxes`` gelesen,
+    entfernte fallen weg. Ohne Änderung bleibt das bisherige Array bestehen.
+    """
+    if changes.is_empty:
+        return geometry
+    old_rows = {box["id"]: row for row, box in enumerate(old_boxes)}
+    old_ids = {new_id: old_id for old_id, new_id in changes.renamed.items()}
+    recompute = set(changes.geometry_changed_ids)
+
+    patched = np.empty((len(new_boxes), 4), dtype=np.float32)
+    kept_rows: List[int] = []
+    source_rows: List[int] = []
+    for row, box in enumerate(new_boxes):
+        source = None if box["id"] in recompute else old_rows.get(old_ids.get(box["id"], box["id"]))
+        if source is None:
+            patched[row] = (box["x"], box["y"], box["width"], box["height"])
+        else:
+            kept_rows.append(row)
+            source_rows.append(source)
+    patched[kept_rows] = geometry[source_rows]
+    patched.setflags(write=False)
+    return patched
+
+
+def create_screen_lock(on_event: Optional[Callable[[LockEvent], None]] = None) -> ScreenLockStateMachine:
+    profile = get_detection_profile()
+    return ScreenLockStateMachine(
+        lock_threshold=profile.box_accuracy_threshold,
+        unlock_threshold=profile.unlock_accuracy_threshold,
+        min_dwell_frames=LOCK_MIN_DWELL_FRAMES,
+        loss_frames=LOCK_LOSS_FRAMES,
+        on_event=on_event,
+    )
 
-        frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        evaluation = evaluate_frame(frame, template_boxes)
 
-        cv2.imshow(
-            "ROI Template Search",
-            cv2.resize(evaluation.annotated_frame, (0, 0), fx=WINDOW_SCALE, fy=WINDOW_SCALE),
-        )
+def run_detection_loop(
+    cap: cv2.VideoCapture,
+    template_boxes: List[TemplateBox],
+    orientation_aware: bool = ORIENTATION_AWARE_DETECTION,
+    display: Optional[DisplaySink] = None,
+    lock: Optional[ScreenLockStateMachine] = None,
+    continuous: bool = False,
+    profile_watcher: Optional[ProfileWatcher] = None,
+    template_watcher: Optional[TemplateWatcher] = None,
+    template_array: Optional[np.ndarray] = None,
+) -> Optional[FrameEvaluation]:
+    """
+    Liest Frames, bis der Screen stabil erkannt ist, und gibt diese Auswertung zurück.
+
+    Mit ``continuous`` läuft die Schleife bis zum Stream-Ende weiter; Ereignisse gehen
+    dann nur an ``lock`` (Payload ist die ``FrameEvaluation``). Deren ``annotated_frame``
+    stammt aus dem Puffer-Pool und ist nur während des Callbacks gültig.
+
+    Mit ``profile_watcher`` wird das Detektionsprofil zwischen zwei Frames getauscht,
+    sobald sich die Datei ändert; der Capture läuft dabei weiter. Beim Wechsel werden
+    die Live-Kennzahlen des alten Profils neben dessen Benchmark-Werten ausgegeben.
+    Ebenso übernimmt ``template_watcher`` eine geänderte Template-Datei zwischen zwei Frames.
+    ``template_array`` (z. B. aus einem Bundle) ersetzt die aus ``template_boxes`` abgeleitete Geometrie.
+    """
+    if profile_watcher is not None:
+        set_detection_profile(profile_watcher.poll())
+    if lock is None:
+        lock = create_screen_lock()
+    profile = get_detection_profile()
+    fallback_source: TemplateSource = template_boxes if template_array is None else template_array
+    # Einmal als Array, damit ein Hot-Reload nur geänderte Zeilen anfassen muss
+    template_source = template_geometry(active_template_geometry(template_watcher, fallback_source))
+    active_boxes = active_template_boxes(template_watcher, template_boxes)
+    stats = ProfileStats()
+    owns_display = display is None
+    if display is None:
+        display = DisplaySink(enabled=DISPLAY_ENABLED)
+
+    buffers = FrameBufferPool()
+    display_buffers = FrameBufferPool()
+
+    def render_preview(evaluation: FrameEvaluation) -> np.ndarray:
+        return prepare_display_frame(evaluation, display_buffers)
+
+    def release_preview(evaluation: FrameEvaluation) -> None:
+        buffers.recycle("annotated", evaluation.annotated_frame)
 
-        if evaluation.capture_frame is not None and evaluation.homography is not None:
-            print(f"Screen akzeptiert mit Accuracy {evaluation.accuracy:.2f}")
-            cv2.imshow(
-                "Screen Matched",
-                cv2.resize(evaluation.annotated_frame, (0, 0), fx=WINDOW_SCALE, fy=WINDOW_SCALE),
+    try:
+        while not display.quit_requested.is_set():
+            frame = grab_latest_frame(cap)
+            if frame is None:
+                break
+
+            if profile_watcher is not None and profile_watcher.poll() is not profile:
+                print(format_profile_report(profile, stats))
+                profile = profile_watcher.current
+                set_detection_profile(profile)
+                lock.unlock_threshold = min(profile.unlock_accuracy_threshold, profile.box_accuracy_threshold)
+                lock.lock_threshold = profile.box_accuracy_threshold
+                stats.reset()
+
+            if template_watcher is not None and TEMPLATE_ID in template_watcher.poll():
+                reloaded_boxes = active_template_boxes(template_watcher, template_boxes)
+                changes = diff_templates(active_boxes, reloaded_boxes)
+                template_source = patch_template_geometry(template_source, active_boxes, reloaded_boxes, changes)
+                active_boxes = reloaded_boxes
+                print(f"Template '{TEMPLATE_ID}' neu geladen: {changes.summary()} "
+                      f"(Geometrie neu: {', '.join(changes.geometry_changed_ids) or '-'})")
+
+            start = time.perf_counter()
+            evaluation = evaluate_oriented_frame(
+                frame, template_source, FRAME_ROTATION, orientation_aware, buffers=buffers, profile=profile
+            )
+            stats.record(
+                (time.perf_counter() - start) * 1000.0,
+                evaluation.accuracy,
+                evaluation.capture_frame is not None,
             )
-            cv2.waitKey(0)
-            return evaluation
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+            # Der annotierte Puffer gehört bis zum Zeichnen der Anzeige und kommt dann zurück in den Pool.
+            buffers.detach("annotated")
+
+            events = lock.update(evaluation.accuracy, TEMPLATE_ID, evaluation)
+            stable = any(event.kind == EVENT_STABLE for event in events)
+            if stable and not continuous and evaluation.capture_frame is not None and evaluation.homography is not None:
+                print(f"Screen akzeptiert mit Accuracy {evaluation.accuracy:.2f}")
+                display.show("Screen Matched", evaluation, render=prepare_display_frame)
+                display.wait_key()
+                return evaluation
+
+            display.show("ROI Template Search", evaluation, render=render_preview, release=release_preview)
+    finally:
+        if owns_display:
+            display.close()
+        if profile_watcher is not None:
+            print(format_profile_report(profile, stats))
 
     return None
 
@@ -596,24 +1222,142 @@ def show_warped_screen(
 # ---------------------------------------------------------------------------
 # Programm-Einstiegspunkt
 # ---------------------------------------------------------------------------
+def open_session_store() -> Tuple[SessionStore, Optional[CaptureArchive]]:
+    archive = CaptureArchive(CAPTURE_ARCHIVE_PATH) if CAPTURE_ARCHIVE_ENABLED else None
+    store = SessionStore(SESSION_STORE_PATH, (TARGET_SCREEN_WIDTH, TARGET_SCREEN_HEIGHT), archive=archive)
+    return store, archive
+
+
+def store_capture(store: SessionStore, evaluation: FrameEvaluation, template_boxes: List[TemplateBox]) -> None:
+    store.append(
+        TEMPLATE_ID,
+        evaluation.accuracy,
+        evaluation.homography,
+        [box["id"] for box in template_boxes],
+        evaluation.box_scores,
+        evaluation.capture_frame,
+    )
+
+
+def run_continuous(
+    cap: cv2.VideoCapture,
+    template_boxes: List[TemplateBox],
+    profile_watcher: Optional[ProfileWatcher] = None,
+    template_watcher: Optional[TemplateWatcher] = None,
+    template_array: Optional[np.ndarray] = None,
+) -> None:
+    store, archive = open_session_store() if SESSION_STORE_ENABLED else (None, None)
+
+    def on_event(event: LockEvent) -> None:
+        print(f"[Frame {event.frame_index}] {event.kind}: {event.template_id} (Accuracy {event.accuracy:.2f})")
+        evaluation = event.payload
+        if event.kind == EVENT_STABLE and store is not None and evaluation.capture_frame is not None:
+            store_capture(store, evaluation, active_template_boxes(template_watcher, template_boxes))
+
+    try:
+        if profile_watcher is not None:
+            set_detection_profile(profile_watcher.poll())
+        run_detection_loop(
+            cap,
+            template_boxes,
+            lock=create_screen_lock(on_event),
+            continuous=True,
+            profile_watcher=profile_watcher,
+            template_watcher=template_watcher,
+            template_array=template_array,
+        )
+    finally:
+        if store is not None:
+            store.close()
+        if archive is not None:
+            archive.close()
+
+
 def main() -> None:
-    template_boxes = load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES)
+    parser = argparse.ArgumentParser(description="Screen-Detektion im Kamera-Stream.")
+    add_profile_argument(parser)
+    parser.add_argument(
+        "--watch-templates",
+        default=TEMPLATE_WATCH_DIR,
+        help="Template-Verzeichnis, dessen Änderungen live übernommen werden (leer = aus)",
+    )
+    parser.add_argument(
+        "--box-subset",
+        action=argparse.BooleanOptionalAction,
+        default=DETECTION_BOX_SUBSET,
+        help="Nur die vom Template-Analyzer empfohlenen Boxen bewerten",
+    )
+    parser.add_argument(
+        "--bundle",
+        default=None,
+        help="Binäres Template-Bundle (.ptb); die Geometrie kommt dann direkt aus der gemappten Datei",
+    )
+    add_runtime_arguments(parser)
+    args = parser.parse_args()
+    print(format_runtime_report(apply_runtime_config(load_runtime_config(args))))
+    profile_watcher = ProfileWatcher(args.profile, DEFAULT_DETECTION_PROFILE) if os.path.exists(args.profile) else None
+
+    template_array: Optional[np.ndarray] = None
+    bundled = load_bundle_template(args.bundle) if args.bundle else None
+    if bundled is not None:
+        template_array, template_boxes = bundled
+    else:
+        template_boxes = load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES)
+    box_filter = select_detection_boxes if args.box_subset else None
+    if box_filter is not None:
+        selected = box_filter(template_boxes)
+        if template_array is not None and len(selected) < len(template_boxes):
+            keep = {box["id"] for box in selected}
+            template_array = template_array[[box["id"] in keep for box in template_boxes]]
+        template_boxes = selected
+    template_watcher = None
+    if bundled is not None:
+        print(f"Template '{TEMPLATE_ID}' aus Bundle '{args.bundle}' ({len(template_boxes)} Boxen, ohne Template-Watcher)")
+    elif args.watch_templates and os.path.isdir(args.watch_templates):
+        template_watcher = TemplateWatcher(args.watch_templates, get_registry(), box_filter=box_filter)
+        print(f"Template-Watcher ({template_watcher.mode}): {args.watch_templates}")
+    print(describe_selection(select_backend(ARRAY_BACKEND)))
 
     cap = configure_capture(STREAM_URL)
     if not cap.isOpened():
         print(f"Fehler: Konnte Stream '{STREAM_URL}' nicht öffnen.")
         return
 
+    if CONTINUOUS_DETECTION:
+        try:
+            run_continuous(cap, template_boxes, profile_watcher, template_watcher, template_array)
+        finally:
+            cap.release()
+            if template_watcher is not None:
+                template_watcher.close()
+        return
+
     try:
-        evaluation = run_detection_loop(cap, template_boxes)
+        evaluation = run_detection_loop(
+            cap,
+            template_boxes,
+            profile_watcher=profile_watcher,
+            template_watcher=template_watcher,
+            template_array=template_array,
+        )
     finally:
         cap.release()
+        if template_watcher is not None:
+            template_watcher.close()
+    template_boxes = active_template_boxes(template_watcher, template_boxes)
 
     if evaluation is None or evaluation.capture_frame is None or evaluation.homography is None:
         print("Kein valider Screen gefunden oder Homographie fehlgeschlagen.")
         cv2.destroyAllWindows()
         return
 
+    if SESSION_STORE_ENABLED:
+        store, archive = open_session_store()
+        with store:
+            store_capture(store, evaluation, template_boxes)
+        if archive is not None:
+            archive.close()
+
     show_warped_screen(evaluation.capture_frame, evaluation.homography, template_boxes)
     cv2.destroyAllWindows()
 
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from main2 import (
+    DEFAULT_TEMPLATE_BOXES,
+    FRAME_ROTATION,
+    ARRAY_BACKEND,
+    JSON_TEMPLATE_PATH,
+    TemplateBox,
+    activate_detection_profile,
+    add_profile_argument,
+    add_runtime_arguments,
+    apply_runtime_config,
+    configure_capture,
+    describe_selection,
+    detection_worker_initargs,
+    evaluate_oriented_frame,
+    format_runtime_report,
+    get_detection_profile,
+    get_runtime_config,
+    grab_latest_frame,
+    init_detection_worker,
+    load_runtime_config,
+    load_template_boxes,
+    select_backend,
+)
+from shm_workers import SharedFrameDetector
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+STATS_WINDOW_SECONDS = 5.0
+REPORT_INTERVAL_SECONDS = 2.0
+
+
+@dataclass
+class DetectionResult:
+    """Kompaktes Ergebnis, das aus dem Worker-Prozess zurückkommt (ohne Bilddaten)."""
+
+    stream: str
+    sequence: int
+    captured_at: float
+    accuracy: float
+    homography: Optional[np.ndarray]
+
+    @property
+    def accepted(self) -> bool:
+        return self.accuracy >= get_detection_profile().box_accuracy_threshold
+
+
+def detect_in_worker(frame: np.ndarray, template_boxes: List[TemplateBox], rotation: Optional[int]) -> tuple:
+    evaluation = evaluate_oriented_frame(frame, template_boxes, rotation)
+    return evaluation.accuracy, evaluation.homography
+
+
+# ---------------------------------------------------------------------------
+# Stream-Zustand
+# ---------------------------------------------------------------------------
+@dataclass
+class StreamState:
+    name: str
+    url: str
+    frame: Optional[np.ndarray] = None
+    frame_sequence: int = 0
+    frame_time: float = 0.0
+    processed_sequence: int = 0
+    captured: int = 0
+    processed: int = 0
+    skipped: int = 0
+    finished: bool = False
+    frame_ready: asyncio.Event = field(default_factory=asyncio.Event, init=False)
+    _processed_times: Deque[float] = field(default_factory=deque, init=False)
+
+    def publish(self, frame: np.ndarray) -> None:
+        if self.frame_sequence > self.processed_sequence:
+            self.skipped += 1
+        self.frame = frame
+        self.frame_sequence += 1
+        self.frame_time = time.perf_counter()
+        self.captured += 1
+        self.frame_ready.set()
+
+    def mark_processed(self, now: float) -> None:
+        self.processed += 1
+        self._processed_times.append(now)
+        while self._processed_times and now - self._processed_times[0] > STATS_WINDOW_SECONDS:
+            self._processed_times.popleft()
+
+    def fps(self, now: float) -> float:
+        while self._processed_times and now - self._processed_times[0] > STATS_WINDOW_SECONDS:
+            self._processed_times.popleft()
+        return len(self._processed_times) / STATS_WINDOW_SECONDS
+
+    @property
+    def backlog(self) -> int:
+        """Noch nicht ausgewertete Frames (0 oder 1, da jeder Stream nur einen Slot hat)."""
+        return 1 if self.frame_sequence > self.processed_sequence else 0
+
+
+# ---------------------------------------------------------------------------
+# Multi-Stream-Ingestion
+# ---------------------------------------------------------------------------
+class MultiStreamDetector:
+    """
+    Verwaltet N Capture-Quellen mit je einem Latest-Frame-Slot.
+
+    Jede Quelle liest in einem eigenen Thread. Pro Stream ist höchstens eine Detektion
+    unterwegs; der gemeinsame Prozess-Pool wird über eine FIFO-Semaphore vergeben, sodass
+    freie Worker reihum an die Streams gehen. Ein zusätzlicher Stream nimmt den anderen
+    damit nur dann Durchsatz weg, wenn alle Kerne ausgelastet sind.
+    """
+
+    def __init__(
+        self,
+        template_boxes: List[TemplateBox],
+        workers: Optional[int] = None,
+        rotation: Optional[int] = FRAME_ROTATION,
+        on_result: Optional[Callable[[DetectionResult], None]] = None,
+        executor: Optional[Executor] = None,
+        capture_factory: Callable[[str], object] = configure_capture,
+        shared_memory: bool = False,
+    ) -> None:
+        self.template_boxes = template_boxes
+        self.workers = workers or get_runtime_config().effective_detection_workers
+        self.rotation = rotation
+        self.on_result = on_result
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._capture_factory = capture_factory
+        self._use_shared_memory = shared_memory and executor is None
+        self._shared_detector: Optional[SharedFrameDetector] = None
+        self.streams: Dict[str, StreamState] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopped = False
+
+    def add_stream(self, name: str, url: str) -> None:
+        if name in self.streams:
+            raise ValueError(f"Stream '{name}' existiert bereits.")
+        self.streams[name] = StreamState(name, url)
+        if self._slots is not None:
+            self._start_stream(self.streams[name])
+
+    def _start_stream(self, state: StreamState) -> None:
+        loop = asyncio.get_running_loop()
+        self._tasks.append(loop.create_task(self._capture_stream(state), name=f"capture-{state.name}"))
+        self._tasks.append(loop.create_task(self._detect_stream(state), name=f"detect-{state.name}"))
+
+    async def _capture_stream(self, state: StreamState) -> None:
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"capture-{state.name}") as reader:
+            cap = await loop.run_in_executor(reader, self._capture_factory, state.url)
+            try:
+                if not cap.isOpened():
+                    print(f"Fehler: Konnte Stream '{state.url}' nicht öffnen.")
+                    return
+                while not self._stopped:
+                    frame = await loop.run_in_executor(reader, grab_latest_frame, cap)
+                    if frame is None:
+                        break
+                    state.publish(frame)
+            finally:
+                state.finished = True
+                state.frame_ready.set()
+                await loop.run_in_executor(reader, cap.release)
+
+    async def _detect_stream(self, state: StreamState) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._slots is not None
+        while not self._stopped:
+            if state.frame_sequence == state.processed_sequence:
+                if state.finished:
+                    return
+                state.frame_ready.clear()
+                await state.frame_ready.wait()
+                continue
+
+            async with self._slots:
+                frame, sequence, captured_at = state.frame, state.frame_sequence, state.frame_time
+                state.processed_sequence = sequence
+                if self._shared_detector is not None:
+                    # submit blockiert, bis ein Ring-Slot frei ist (bei Größenwechsel bis alle
+                    # frei sind); deshalb nicht auf dem Event-Loop aufrufen.
+                    future = await loop.run_in_executor(None, self._shared_detector.submit, frame)
+                    shared_result = await asyncio.wrap_future(future)
+                    accuracy, homography = shared_result.accuracy, shared_result.homography
+                else:
+                    accuracy, homography = await loop.run_in_executor(
+                        self._executor, detect_in_worker, frame, self.template_boxes, self.rotation
+                    )
+
+            state.mark_processed(time.perf_counter())
+            if self.on_result is not None:
+                self.on_result(DetectionResult(state.name, sequence, captured_at, accuracy, homography))
+
+    def report(self) -> str:
+        now = time.perf_counter()
+        parts = [
+            f"{state.name}: {state.fps(now):5.1f} FPS, Backlog {state.backlog}, übersprungen {state.skipped}"
+            for state in self.streams.values()
+        ]
+        return " | ".join(parts)
+
+    async def run(self, report_interval: float = REPORT_INTERVAL_SECONDS) -> None:
+        if self._use_shared_memory:
+            self._shared_detector = SharedFrameDetector(self.template_boxes, self.workers, self.rotation)
+        elif self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_detection_worker,
+                initargs=detection_worker_initargs(),
+            )
+        self._slots = asyncio.Semaphore(self.workers)
+        for state in self.streams.values():
+            self._start_stream(state)
+
+        try:
+            if report_interval > 0:
+                while not all(state.finished for state in self.streams.values()):
+                    await asyncio.sleep(report_interval)
+                    print(self.report())
+            # Ohne Bericht nur auf die Tasks warten; später hinzugefügte Streams mit abwarten.
+            waited = 0
+            while waited < len(self._tasks):
+                waited = len(self._tasks)
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopped = True
+        for task in self._tasks:
+            task.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._shared_detector is not None:
+            self._shared_detector.close()
+            self._shared_detector = None
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mehrere Kamera-Streams parallel auswerten.")
+    parser.add_argument("urls", nargs="+", help="Stream-URLs (RTSP/HTTP) oder name=URL")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL_SECONDS)
+    parser.add_argument("--shared-memory", action="store_true", help="Frames per Shared Memory statt Pickle übergeben")
+    add_profile_argument(parser)
+    add_runtime_arguments(parser)
+    args = parser.parse_args()
+    print(format_runtime_report(apply_runtime_config(load_runtime_config(args))))
+    # Die Worker übernehmen beides beim Start (init_detection_worker).
+    print(f"Detektionsprofil: {activate_detection_profile(args.profile).name}")
+    print(describe_selection(select_backend(ARRAY_BACKEND)))
+
+    template_boxes = load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES)
+
+    def print_accepted(result: DetectionResult) -> None:
+        if result.accepted:
+            print(f"[{result.stream}] Screen akzeptiert mit Accuracy {result.accuracy:.2f}")
+
+    detector = MultiStreamDetector(
+        template_boxes,
+        workers=args.detection_workers,
+        on_result=print_accepted,
+        shared_memory=args.shared_memory,
+    )
+    for index, entry in enumerate(args.urls):
+        name, _, url = entry.partition("=") if "=" in entry.split("://")[0] else (f"cam{index + 1}", "", entry)
+        detector.add_stream(name, url)
+
+    try:
+        asyncio.run(detector.run(args.report_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import os
+import re
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+REPLAY_MODE_REALTIME = "realtime"
+REPLAY_MODE_FAST = "fast"
+REPLAY_MODE_FIXED = "fixed"
+REPLAY_MODES = (REPLAY_MODE_REALTIME, REPLAY_MODE_FAST, REPLAY_MODE_FIXED)
+
+DEFAULT_REPLAY_FPS = 30.0
+FRAME_FILE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+_TIMESTAMP_PATTERN = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+# ---------------------------------------------------------------------------
+# Frame-Quellen (Videodatei oder Verzeichnis mit Einzelbildern)
+# ---------------------------------------------------------------------------
+class _VideoFrames:
+    """
+    Liest Frames sequenziell aus einer Videodatei.
+
+    Zeitstempel kommen nach jedem ``grab`` aus ``CAP_PROP_POS_MSEC``, damit auch
+    Aufnahmen mit variabler Bildrate im Echtzeit-Modus nicht driften. Für noch nicht
+    gelesene Frames wird vom letzten bekannten Zeitstempel aus mit ``fps`` geschätzt.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._cap = cv2.VideoCapture(path)
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self.fps = float(fps) if fps and fps > 0 else DEFAULT_REPLAY_FPS
+        self.frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self._position = -1
+        self._timestamps: List[float] = []
+        self._fallback_warned = False
+
+    def is_opened(self) -> bool:
+        return self._cap.isOpened()
+
+    def timestamp_ms(self, index: int) -> float:
+        if index < len(self._timestamps):
+            return self._timestamps[index]
+        if not self._timestamps:
+            return index * 1000.0 / self.fps
+        last = len(self._timestamps) - 1
+        return self._timestamps[last] + (index - last) * 1000.0 / self.fps
+
+    def _record_timestamp(self) -> None:
+        if self._position < len(self._timestamps):
+            return  # nach rewind bereits bekannt
+        position_ms = self._cap.get(cv2.CAP_PROP_POS_MSEC)
+        # Manche Backends liefern 0 oder Rückschritte; dann gleichmäßig weiterzählen.
+        if self._timestamps and position_ms <= self._timestamps[-1]:
+            if not self._fallback_warned:
+                print(f"Warnung: Video liefert keine monotonen Zeitstempel, Replay nutzt ab hier {self.fps:g} fps.")
+                self._fallback_warned = True
+            position_ms = self._timestamps[-1] + 1000.0 / self.fps
+        self._timestamps.append(float(position_ms))
+
+    def has_frame(self, index: int) -> bool:
+        return self.frame_count <= 0 or index < self.frame_count
+
+    def grab_to(self, index: int) -> bool:
+        while self._position < index:
+            if not self._cap.grab():
+                return False
+            self._position += 1
+            self._record_timestamp()
+        return True
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        ret, frame = self._cap.retrieve()
+        return frame if ret else None
+
+    def rewind(self) -> bool:
+        self._position = -1
+        return bool(self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0))
+
+    def release(self) -> None:
+        self._cap.release()
+
+
+class _DirectoryFrames:
+    """Liest Einzelbilder eines Verzeichnisses, Zeitstempel (ms) kommen aus dem Dateinamen."""
+
+    def __init__(self, path: str, fps: float) -> None:
+        names = [name for name in os.listdir(path) if name.lower().endswith(FRAME_FILE_EXTENSIONS)]
+        names, self._timestamps = self._order_frames(names, fps)
+        self._paths = [os.path.join(path, name) for name in names]
+        self.fps = fps
+        self.frame_count = len(self._paths)
+        self._position = -1
+
+    @staticmethod
+    def _order_frames(names: List[str], fps: float) -> Tuple[List[str], List[float]]:
+        """Sortiert nach dem Zeitstempel im Dateinamen (``9.jpg`` vor ``10.jpg``)."""
+        parsed: List[Tuple[float, str]] = []
+        for name in names:
+            match = _TIMESTAMP_PATTERN.search(os.path.splitext(name)[0])
+            if match is not None:
+                parsed.append((float(match.group(1)), name))
+
+        if len(parsed) == len(names):
+            parsed.sort()
+            return [name for _, name in parsed], [timestamp for timestamp, _ in parsed]
+
+        # Ohne Zeitstempel in jedem Dateinamen wird ein gleichmäßiger Takt angenommen.
+        print(
+            f"Warnung: {len(names) - len(parsed)} von {len(names)} Bildern ohne Zeitstempel im Namen, "
+            f"Replay nutzt gleichmäßige {fps:g} fps in Namensreihenfolge."
+        )
+        names = sorted(names)
+        return names, [index * 1000.0 / fps for index in range(len(names))]
+
+    def is_opened(self) -> bool:
+        return self.frame_count > 0
+
+    def timestamp_ms(self, index: int) -> float:
+        return self._timestamps[index]
+
+    def has_frame(self, index: int) -> bool:
+        return index < self.frame_count
+
+    def grab_to(self, index: int) -> bool:
+        if index >= self.frame_count:
+            return False
+        self._position = index
+        return True
+
+    def retrieve(self) -> Optional[np.ndarray]:
+        if self._position < 0:
+            return None
+        return cv2.imread(self._paths[self._position], cv2.IMREAD_COLOR)
+
+    def rewind(self) -> bool:
+        self._position = -1
+        return self.frame_count > 0
+
+    def release(self) -> None:
+        self._paths = []
+        self.frame_count = 0
+
+
+# ---------------------------------------------------------------------------
+# Replay-Capture mit derselben Schnittstelle wie cv2.VideoCapture
+# ---------------------------------------------------------------------------
+class ReplayCapture:
+    """
+    Spielt eine aufgezeichnete Session mit deterministischem Timing ab.
+
+    Modi:
+        realtime: Original-Zeitstempel, überfällige Frames werden wie bei einem
+                  Live-Stream mit Puffergröße 1 übersprungen.
+        fixed:    Gleichmäßiger Takt mit ``fps`` Bildern pro Sekunde.
+        fast:     Jeder ``grab`` liefert ohne Wartezeit den nächsten Frame.
+    """
+
+    # Kein Puffer zum Leeren: ``grab_latest_frame`` liest genau einen Frame je Aufruf.
+    drops_stale_frames = True
+
+    def __init__(self, source: str, mode: str = REPLAY_MODE_REALTIME, fps: Optional[float] = None) -> None:
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unbekannter Replay-Modus '{mode}', erlaubt: {', '.join(REPLAY_MODES)}")
+
+        if os.path.isdir(source):
+            self._frames = _DirectoryFrames(source, fps or DEFAULT_REPLAY_FPS)
+        else:
+            self._frames = _VideoFrames(source)
+
+        self.mode = mode
+        self.fps = float(fps) if fps else self._frames.fps
+        self._index = -1
+        self._grabbed = False
+        self._start_time: Optional[float] = None
+
+    def _due_ms(self, index: int) -> float:
+        if self.mode == REPLAY_MODE_FIXED:
+            return index * 1000.0 / self.fps
+        return self._frames.timestamp_ms(index) - self._frames.timestamp_ms(0)
+
+    def isOpened(self) -> bool:  # noqa: N802 - cv2.VideoCapture-Schnittstelle
+        return self._frames.is_opened()
+
+    def grab(self) -> bool:
+        self._grabbed = False
+        target = self._index + 1
+        if not self._frames.has_frame(target):
+            return False
+
+        if self.mode != REPLAY_MODE_FAST:
+            if self._start_time is None:
+                self._start_time = time.perf_counter()
+            elapsed_ms = (time.perf_counter() - self._start_time) * 1000.0
+
+            while self._frames.has_frame(target + 1) and self._due_ms(target + 1) <= elapsed_ms:
+                target += 1
+
+            wait_ms = self._due_ms(target) - elapsed_ms
+            if wait_ms > 0:
+                time.sleep(wait_ms / 1000.0)
+
+        if not self._frames.grab_to(target):
+            return False
+        self._index = target
+        self._grabbed = True
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        # Wie bei cv2.VideoCapture liefert retrieve nach einem fehlgeschlagenen grab nichts.
+        if not self._grabbed:
+            return False, None
+        frame = self._frames.retrieve()
+        return frame is not None, frame
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def rewind(self) -> bool:
+        """Springt an den Anfang der Aufzeichnung und startet die Replay-Uhr neu."""
+        self._index = -1
+        self._grabbed = False
+        self._start_time = None
+        return self._frames.rewind()
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            return self._frames.timestamp_ms(self._index) if self._index >= 0 else 0.0
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._index + 1)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self._frames.frame_count)
+        return 0.0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        # Puffergröße ist für das Replay bedeutungslos, wird aber wie beim Stream akzeptiert.
+        return prop_id == cv2.CAP_PROP_BUFFERSIZE
+
+    def release(self) -> None:
+        self._frames.release()
+
+
+def configure_replay(source: str, mode: str = REPLAY_MODE_REALTIME, fps: Optional[float] = None) -> ReplayCapture:
+    return ReplayCapture(source, mode=mode, fps=fps)
+
+
+# ---------------------------------------------------------------------------
+# Offline-Benchmark des Detektors
+# ---------------------------------------------------------------------------
+def benchmark_replay(cap: ReplayCapture, template_boxes: list) -> None:
+    from main2 import FRAME_ROTATION, evaluate_oriented_frame
+
+    durations_ms: List[float] = []
+    accepted = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            break
+
+        # Gleicher Pfad wie die Live-Schleife (inkl. ORIENTATION_AWARE_DETECTION)
+        start = time.perf_counter()
+        evaluation = evaluate_oriented_frame(frame, template_boxes, FRAME_ROTATION)
+        durations_ms.append((time.perf_counter() - start) * 1000.0)
+        if evaluation.capture_frame is not None:
+            accepted += 1
+
+    if not durations_ms:
+        print("Keine Frames im Replay gefunden.")
+        return
+
+    timings = np.asarray(durations_ms)
+    print(f"Frames: {len(timings)}, akzeptiert: {accepted}")
+    print(
+        f"Detektion [ms]: mittel {timings.mean():.2f}, p50 {np.percentile(timings, 50):.2f}, "
+        f"p95 {np.percentile(timings, 95):.2f}, max {timings.max():.2f}"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def main() -> None:
+    from main2 import DEFAULT_TEMPLATE_BOXES, JSON_TEMPLATE_PATH, load_template_boxes, run_detection_loop
+
+    parser = argparse.ArgumentParser(description="Aufgezeichnete Session durch den Detektor abspielen.")
+    parser.add_argument("source", help="Videodatei oder Verzeichnis mit Einzelbildern (Zeitstempel in ms im Namen)")
+    parser.add_argument("--mode", choices=REPLAY_MODES, default=REPLAY_MODE_REALTIME)
+    parser.add_argument("--fps", type=float, default=None, help="Bildrate für den Modus 'fixed'")
+    parser.add_argument("--benchmark", action="store_true", help="Alle Frames ohne Anzeige auswerten")
+    args = parser.parse_args()
+
+    template_boxes = load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES)
+    cap = configure_replay(args.source, mode=args.mode, fps=args.fps)
+    if not cap.isOpened():
+        print(f"Fehler: Konnte Replay-Quelle '{args.source}' nicht öffnen.")
+        return
+
+    try:
+        if args.benchmark:
+            benchmark_replay(cap, template_boxes)
+        else:
+            run_detection_loop(cap, template_boxes)
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import queue
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DEFAULT_LOCK_THRESHOLD = 0.8
+DEFAULT_UNLOCK_THRESHOLD = 0.6
+DEFAULT_MIN_DWELL_FRAMES = 5
+DEFAULT_LOSS_FRAMES = 3
+
+STATE_SEARCHING = "searching"
+STATE_ACQUIRED = "acquired"
+STATE_STABLE = "stable"
+
+EVENT_ACQUIRED = "acquired"
+EVENT_STABLE = "stable"
+EVENT_LOST = "lost"
+EVENT_TEMPLATE_CHANGED = "template_changed"
+
+
+@dataclass
+class LockEvent:
+    """Zustandswechsel der Screen-Erkennung."""
+
+    kind: str
+    frame_index: int
+    timestamp: float
+    template_id: Optional[str]
+    accuracy: float
+    payload: Any = None
+
+
+EventCallback = Callable[[LockEvent], None]
+
+
+# ---------------------------------------------------------------------------
+# Hysterese-Zustandsautomat
+# ---------------------------------------------------------------------------
+class ScreenLockStateMachine:
+    """
+    Entscheidet pro Frame, ob der Screen gefunden, stabil oder verloren ist.
+
+    Ein Screen wird erst bei ``lock_threshold`` erfasst, gilt danach aber bis unter
+    ``unlock_threshold`` als vorhanden (Hysterese gegen Flattern am Schwellwert). Nach
+    ``min_dwell_frames`` Frames in Folge ist er stabil; ``stable`` wird pro Stabilitätsphase
+    genau einmal gemeldet, und zwar bei einem Frame oberhalb von ``lock_threshold``, damit
+    der Aufrufer dessen Capture weiterverarbeiten kann. Verloren ist der Screen erst nach
+    ``loss_frames`` Frames in Folge unterhalb von ``unlock_threshold``.
+
+    Ereignisse gehen an ``on_event`` und/oder in ``events`` (nicht-blockierend).
+    """
+
+    def __init__(
+        self,
+        lock_threshold: float = DEFAULT_LOCK_THRESHOLD,
+        unlock_threshold: float = DEFAULT_UNLOCK_THRESHOLD,
+        min_dwell_frames: int = DEFAULT_MIN_DWELL_FRAMES,
+        loss_frames: int = DEFAULT_LOSS_FRAMES,
+        on_event: Optional[EventCallback] = None,
+        events: Optional["queue.Queue[LockEvent]"] = None,
+    ) -> None:
+        if unlock_threshold > lock_threshold:
+            raise ValueError("unlock_threshold darf nicht größer als lock_threshold sein.")
+        self.lock_threshold = lock_threshold
+        self.unlock_threshold = unlock_threshold
+        self.min_dwell_frames = max(1, min_dwell_frames)
+        self.loss_frames = max(1, loss_frames)
+        self.on_event = on_event
+        self.events = events
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = STATE_SEARCHING
+        self.template_id: Optional[str] = None
+        self.frame_index = 0
+        self._dwell = 0
+        self._misses = 0
+
+    @property
+    def locked(self) -> bool:
+        return self.state != STATE_SEARCHING
+
+    def _emit(self, kind: str, accuracy: float, payload: Any, emitted: List[LockEvent]) -> None:
+        event = LockEvent(kind, self.frame_index, time.time(), self.template_id, accuracy, payload)
+        emitted.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+        if self.events is not None:
+            try:
+                self.events.put_nowait(event)
+            except queue.Full:
+                pass
+
+    def update(self, accuracy: float, template_id: Optional[str] = None, payload: Any = None) -> List[LockEvent]:
+        """Verarbeitet das Ergebnis eines Frames und gibt die ausgelösten Ereignisse zurück."""
+        self.frame_index += 1
+        emitted: List[LockEvent] = []
+
+        if self.state == STATE_SEARCHING:
+            if accuracy >= self.lock_threshold:
+                self.state = STATE_ACQUIRED
+                self.template_id = template_id
+                self._dwell = 1
+                self._misses = 0
+                self._emit(EVENT_ACQUIRED, accuracy, payload, emitted)
+                self._check_stable(accuracy, payload, emitted)
+            return emitted
+
+        if accuracy < self.unlock_threshold:
+            self._misses += 1
+            if self._misses >= self.loss_frames:
+                self._emit(EVENT_LOST, accuracy, payload, emitted)
+                self.state = STATE_SEARCHING
+                self.template_id = None
+                self._dwell = 0
+            return emitted
+
+        self._misses = 0
+        if template_id != self.template_id and accuracy >= self.lock_threshold:
+            # Anderes Layout auf demselben Screen: neue Stabilitätsphase beginnen.
+            self.template_id = template_id
+            self.state = STATE_ACQUIRED
+            self._dwell = 1
+            self._emit(EVENT_TEMPLATE_CHANGED, accuracy, payload, emitted)
+            self._check_stable(accuracy, payload, emitted)
+            return emitted
+
+        self._dwell += 1
+        self._check_stable(accuracy, payload, emitted)
+        return emitted
+
+    def _check_stable(self, accuracy: float, payload: Any, emitted: List[LockEvent]) -> None:
+        if (
+            self.state == STATE_ACQUIRED
+            and self._dwell >= self.min_dwell_frames
+            and accuracy >= self.lock_threshold
+        ):
+            self.state = STATE_STABLE
+            self._emit(EVENT_STABLE, accuracy, payload, emitted)
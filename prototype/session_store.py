@@ -0,0 +1,316 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from capture_archive import CaptureArchive
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_IMAGE_FORMAT = ".webp"
+DEFAULT_IMAGE_QUALITY = 90
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    template_id TEXT NOT NULL,
+    accuracy REAL NOT NULL,
+    homography BLOB,
+    matches TEXT NOT NULL,
+    image_format TEXT,
+    image BLOB,
+    image_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_captures_timestamp ON captures (timestamp);
+CREATE INDEX IF NOT EXISTS idx_captures_template ON captures (template_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_captures_session ON captures (session, timestamp);
+"""
+
+# Spalten, die nach der ersten Version hinzugekommen sind (Name, Typ).
+_MIGRATIONS = (("image_key", "TEXT"),)
+
+
+@dataclass
+class CaptureRecord:
+    """Kompakter Datensatz einer akzeptierten Erfassung (ohne Bilddaten)."""
+
+    id: int
+    session: str
+    timestamp: float
+    template_id: str
+    accuracy: float
+    homography: Optional[np.ndarray]
+    matches: Dict[str, float]
+    image_key: Optional[str] = None
+
+
+@dataclass
+class _PendingCapture:
+    timestamp: float
+    template_id: str
+    accuracy: float
+    homography: Optional[np.ndarray]
+    matches: Dict[str, float]
+    capture_frame: Optional[np.ndarray]
+
+
+# ---------------------------------------------------------------------------
+# Append-only Session-Store
+# ---------------------------------------------------------------------------
+class SessionStore:
+    """
+    Schreibt akzeptierte Erfassungen append-only in eine SQLite-Datenbank.
+
+    ``append`` legt nur einen Verweis in eine Queue. Ein Hintergrund-Thread entzerrt
+    den Screen, komprimiert ihn und schreibt Datensätze gebündelt in einer Transaktion
+    (spätestens nach ``batch_size`` Einträgen oder ``flush_interval`` Sekunden).
+
+    Mit ``archive`` landen die Bilder inhaltsadressiert im CaptureArchive (Duplikate nur
+    als Referenz), die Tabelle hält dann nur den Schlüssel in ``image_key``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        target_size: Tuple[int, int],
+        session: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        image_format: str = DEFAULT_IMAGE_FORMAT,
+        image_quality: int = DEFAULT_IMAGE_QUALITY,
+        archive: Optional[CaptureArchive] = None,
+    ) -> None:
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self.target_size = target_size
+        self.session = session or time.strftime("%Y%m%d_%H%M%S")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.image_format = image_format
+        self.archive = archive
+        self._encode_params = self._encode_params_for(image_format, image_quality)
+
+        with sqlite3.connect(db_path) as connection:
+            connection.executescript(_SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(captures)")}
+            for name, column_type in _MIGRATIONS:
+                if name not in columns:
+                    connection.execute(f"ALTER TABLE captures ADD COLUMN {name} {column_type}")
+
+        self._queue: "queue.Queue[Optional[_PendingCapture]]" = queue.Queue()
+        self.dropped = 0  # Datensätze, die der Writer wegen eines Fehlers verworfen hat
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _encode_params_for(image_format: str, quality: int) -> List[int]:
+        if image_format == ".webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, quality]
+        if image_format in (".jpg", ".jpeg"):
+            return [cv2.IMWRITE_JPEG_QUALITY, quality]
+        if image_format == ".png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, 3]
+        return []
+
+    def append(
+        self,
+        template_id: str,
+        accuracy: float,
+        homography: Optional[np.ndarray],
+        box_ids: Sequence[str],
+        box_scores: Optional[Sequence[float]],
+        capture_frame: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Nicht-blockierend. ``capture_frame`` darf danach vom Aufrufer nicht mehr verändert werden.
+
+        Ist der Writer-Thread ausgefallen, wird dessen Fehler hier gemeldet statt weiter
+        in eine Queue ohne Leser zu schreiben.
+        """
+        self._raise_if_dead()
+        matches = {str(box_id): float(score) for box_id, score in zip(box_ids, box_scores or [])}
+        self._queue.put(
+            _PendingCapture(
+                timestamp if timestamp is not None else time.time(),
+                template_id,
+                float(accuracy),
+                None if homography is None else np.asarray(homography, dtype=np.float64),
+                matches,
+                capture_frame,
+            )
+        )
+
+    def _store_image(self, pending: _PendingCapture) -> Tuple[Optional[bytes], Optional[str]]:
+        if pending.capture_frame is None or pending.homography is None:
+            return None, None
+        warped = cv2.warpPerspective(pending.capture_frame, np.linalg.inv(pending.homography), self.target_size)
+        if self.archive is not None:
+            key, _ = self.archive.add(
+                warped,
+                {"session": self.session, "template_id": pending.template_id},
+                timestamp=pending.timestamp,
+            )
+            return None, key
+        ok, encoded = cv2.imencode(self.image_format, warped, self._encode_params)
+        return (encoded.tobytes() if ok else None), None
+
+    def _to_row(self, pending: _PendingCapture) -> tuple:
+        image, image_key = self._store_image(pending)
+        return (
+            self.session,
+            pending.timestamp,
+            pending.template_id,
+            pending.accuracy,
+            None if pending.homography is None else pending.homography.tobytes(),
+            json.dumps(pending.matches, separators=(",", ":")),
+            self.image_format if image is not None else None,
+            image,
+            image_key,
+        )
+
+    def _raise_if_dead(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"SessionStore-Writer ausgefallen: {self._error}") from self._error
+        if not self._thread.is_alive():
+            raise RuntimeError("SessionStore ist geschlossen.")
+
+    def _run(self) -> None:
+        try:
+            self._write_loop()
+        except BaseException as exc:  # pylint: disable=broad-except
+            # Fehler der Datenbank selbst: merken, damit append/close ihn melden.
+            print(f"SessionStore-Writer beendet: {exc!r}")
+            self._error = exc
+
+    def _write_loop(self) -> None:
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        rows: List[tuple] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        try:
+            while not stopping:
+                timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    pending = self._queue.get(timeout=timeout)
+                    if pending is None:
+                        stopping = True
+                    else:
+                        rows.append(self._to_row(pending))
+                except queue.Empty:
+                    pass
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Ein fehlerhafter Datensatz (Kodierung, Archiv, Homographie) darf den Writer nicht beenden.
+                    self.dropped += 1
+                    print(f"SessionStore: Datensatz verworfen ({pending.template_id}, {pending.timestamp:.3f}): {exc!r}")
+
+                if rows and (stopping or len(rows) >= self.batch_size or time.monotonic() >= deadline):
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO captures (session, timestamp, template_id, accuracy, homography, "
+                            "matches, image_format, image, image_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                    rows = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        """Schreibt ausstehende Datensätze und beendet den Hintergrund-Thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"SessionStore-Writer ausgefallen: {self._error}") from self._error
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Offline-Abfragen
+# ---------------------------------------------------------------------------
+def _record_from_row(row: tuple) -> CaptureRecord:
+    record_id, session, timestamp, template_id, accuracy, homography, matches, image_key = row
+    return CaptureRecord(
+        record_id,
+        session,
+        timestamp,
+        template_id,
+        accuracy,
+        None if homography is None else np.frombuffer(homography, dtype=np.float64).reshape(3, 3),
+        json.loads(matches),
+        image_key,
+    )
+
+
+def query_captures(
+    db_path: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    template_id: Optional[str] = None,
+    session: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[CaptureRecord]:
+    clauses: List[str] = []
+    params: List[object] = []
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    if template_id is not None:
+        clauses.append("template_id = ?")
+        params.append(template_id)
+    if session is not None:
+        clauses.append("session = ?")
+        params.append(session)
+
+    sql = "SELECT id, session, timestamp, template_id, accuracy, homography, matches, image_key FROM captures"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY timestamp"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    with sqlite3.connect(db_path) as connection:
+        return [_record_from_row(row) for row in connection.execute(sql, params)]
+
+
+def load_capture_image(
+    db_path: str,
+    record_id: int,
+    archive: Optional[CaptureArchive] = None,
+) -> Optional[np.ndarray]:
+    with sqlite3.connect(db_path) as connection:
+        row = connection.execute("SELECT image, image_key FROM captures WHERE id = ?", (record_id,)).fetchone()
+    if row is None:
+        return None
+    image, image_key = row
+    if image is None:
+        return archive.load(image_key) if archive is not None and image_key is not None else None
+    return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
@@ -0,0 +1,189 @@
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from main2 import (
+    DetectionProfile,
+    TemplateBox,
+    detection_worker_initargs,
+    evaluate_oriented_frame,
+    get_runtime_config,
+    init_detection_worker,
+)
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+SLOTS_PER_WORKER = 2
+
+
+@dataclass
+class SharedFrameResult:
+    """Kleines Ergebnis, das als einziges zurück über die Prozessgrenze geht."""
+
+    accuracy: float
+    homography: Optional[np.ndarray]
+    box_scores: Optional[List[float]]
+
+
+# ---------------------------------------------------------------------------
+# Worker-Seite
+# ---------------------------------------------------------------------------
+_worker_template_boxes: List[TemplateBox] = []
+_worker_rotation: Optional[int] = None
+_worker_segments: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    segment = _worker_segments.get(name)
+    if segment is not None:
+        return segment
+
+    # Alte Ringe (nach Auflösungswechsel) freigeben, bevor der neue angehängt wird.
+    for old in _worker_segments.values():
+        old.close()
+    _worker_segments.clear()
+
+    # Die Worker teilen sich den Resource-Tracker des Elternprozesses, der das Segment
+    # besitzt und beim Schließen des Detektors wieder freigibt.
+    segment = shared_memory.SharedMemory(name=name)
+    _worker_segments[name] = segment
+    return segment
+
+
+def _init_worker(
+    template_boxes: List[TemplateBox],
+    rotation: Optional[int],
+    opencv_threads: Optional[int],
+    profile: DetectionProfile,
+    backend_name: str,
+) -> None:
+    global _worker_template_boxes, _worker_rotation  # pylint: disable=global-statement
+    init_detection_worker(opencv_threads, profile, backend_name)
+    _worker_template_boxes = template_boxes
+    _worker_rotation = rotation
+
+
+def _evaluate_slot(segment_name: str, offset: int, shape: Tuple[int, ...], dtype: str) -> SharedFrameResult:
+    segment = _attach_segment(segment_name)
+    frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf, offset=offset)
+    evaluation = evaluate_oriented_frame(frame, _worker_template_boxes, _worker_rotation)
+    return SharedFrameResult(evaluation.accuracy, evaluation.homography, evaluation.box_scores)
+
+
+# ---------------------------------------------------------------------------
+# Eltern-Seite: Ring aus Frame-Slots im Shared Memory
+# ---------------------------------------------------------------------------
+class SharedFrameRing:
+    """Feste Anzahl gleich großer Frame-Slots in einem Shared-Memory-Segment."""
+
+    def __init__(self, slot_count: int, slot_bytes: int) -> None:
+        self.slot_count = slot_count
+        self.slot_bytes = slot_bytes
+        self.segment = shared_memory.SharedMemory(create=True, size=slot_count * slot_bytes)
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for index in range(slot_count):
+            self._free.put(index)
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        return self._free.get(timeout=timeout)
+
+    def release(self, index: int) -> None:
+        self._free.put(index)
+
+    def write(self, index: int, frame: np.ndarray) -> int:
+        offset = index * self.slot_bytes
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.segment.buf, offset=offset)
+        np.copyto(view, frame)
+        return offset
+
+    def drain(self) -> None:
+        """Wartet, bis alle Slots wieder frei sind."""
+        taken = [self._free.get() for _ in range(self.slot_count)]
+        for index in taken:
+            self._free.put(index)
+
+    def close(self) -> None:
+        self.segment.close()
+        self.segment.unlink()
+
+
+class SharedFrameDetector:
+    """
+    Multiprocessing-Backend für ``evaluate_frame`` ohne Pixel-Pickling.
+
+    Frames werden einmal in einen freien Ring-Slot kopiert; an die Worker gehen nur
+    Segmentname, Offset, Form und Datentyp. Zurück kommen Accuracy, Homographie und
+    Box-Scores. Sind alle Slots belegt, blockiert ``submit`` (Backpressure).
+    """
+
+    def __init__(
+        self,
+        template_boxes: List[TemplateBox],
+        workers: Optional[int] = None,
+        rotation: Optional[int] = None,
+        slots: Optional[int] = None,
+    ) -> None:
+        self.workers = workers or get_runtime_config().effective_detection_workers
+        self.slot_count = slots or self.workers * SLOTS_PER_WORKER
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            # Profil und Backend des Elternprozesses, nicht die eingebauten Vorgaben
+            initargs=(template_boxes, rotation, *detection_worker_initargs()),
+        )
+        self._ring: Optional[SharedFrameRing] = None
+        self._ring_lock = threading.Lock()
+
+    def _acquire_slot(self, frame: np.ndarray) -> Tuple[SharedFrameRing, int]:
+        """
+        Liefert Ring und freien Slot in einem Schritt unter ``_ring_lock``.
+
+        Ein Größenwechsel wartet dort, bis alle laufenden Frames des alten Rings fertig
+        sind; kein anderer Thread kann in der Zwischenzeit einen Slot aus dem alten Ring
+        holen. Die Freigabe der Slots (Done-Callback) braucht den Lock nicht.
+        """
+        with self._ring_lock:
+            if self._ring is None or frame.nbytes > self._ring.slot_bytes:
+                if self._ring is not None:
+                    self._ring.drain()
+                    self._ring.close()
+                self._ring = SharedFrameRing(self.slot_count, frame.nbytes)
+            ring = self._ring
+            return ring, ring.acquire()
+
+    def submit(self, frame: np.ndarray) -> "Future[SharedFrameResult]":
+        ring, index = self._acquire_slot(frame)
+        try:
+            offset = ring.write(index, frame)
+            future = self._executor.submit(_evaluate_slot, ring.name, offset, frame.shape, frame.dtype.str)
+        except BaseException:
+            ring.release(index)
+            raise
+        future.add_done_callback(lambda _: ring.release(index))
+        return future
+
+    def evaluate(self, frame: np.ndarray) -> SharedFrameResult:
+        return self.submit(frame).result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._ring_lock:
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+
+    def __enter__(self) -> "SharedFrameDetector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
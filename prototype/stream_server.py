@@ -0,0 +1,344 @@
+import argparse
+import shutil
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from replay import REPLAY_MODE_FIXED, REPLAY_MODE_REALTIME, ReplayCapture
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+DEFAULT_HTTP_HOST = "127.0.0.1"  # nur lokal; "0.0.0.0" gibt den Kamera-Stream im Netz frei
+DEFAULT_HTTP_PORT = 8080
+MJPEG_PATH = "/video"
+MJPEG_BOUNDARY = "paralensframe"
+JPEG_QUALITY = 90
+
+# Zeitstempel-Marker: Schwarz/Weiß-Blöcke oben links im (unrotierten) Frame.
+# Zwei Wächterblöcke (weiß, schwarz) gefolgt von TIMESTAMP_BITS Datenbits.
+TIMESTAMP_BLOCK_PX = 16
+TIMESTAMP_BITS = 40
+TIMESTAMP_GUARD = (1, 0)
+_TIMESTAMP_MODULO = 1 << TIMESTAMP_BITS
+
+
+# ---------------------------------------------------------------------------
+# Zeitstempel-Marker
+# ---------------------------------------------------------------------------
+def _now_ms() -> int:
+    return int(time.time() * 1000.0) % _TIMESTAMP_MODULO
+
+
+def embed_timestamp(frame: np.ndarray, timestamp_ms: Optional[int] = None) -> int:
+    """Schreibt den Zeitstempel als Blockcode in den Frame (in-place) und gibt ihn zurück."""
+    if timestamp_ms is None:
+        timestamp_ms = _now_ms()
+
+    bits = list(TIMESTAMP_GUARD) + [
+        (timestamp_ms >> (TIMESTAMP_BITS - 1 - index)) & 1 for index in range(TIMESTAMP_BITS)
+    ]
+    size = TIMESTAMP_BLOCK_PX
+    for index, bit in enumerate(bits):
+        frame[0:size, index * size:(index + 1) * size] = 255 if bit else 0
+    return timestamp_ms
+
+
+def read_timestamp(frame: np.ndarray) -> Optional[int]:
+    """Liest einen mit ``embed_timestamp`` geschriebenen Zeitstempel, sonst None."""
+    size = TIMESTAMP_BLOCK_PX
+    total_bits = len(TIMESTAMP_GUARD) + TIMESTAMP_BITS
+    if frame.shape[0] < size or frame.shape[1] < total_bits * size:
+        return None
+
+    strip = frame[0:size, 0:total_bits * size]
+    if strip.ndim == 3:
+        strip = strip.mean(axis=2)
+    # Randpixel jedes Blocks ignorieren, damit Kompressionsartefakte nicht stören.
+    margin = size // 4
+    blocks = strip[margin:size - margin].reshape(size - 2 * margin, total_bits, size)
+    levels = blocks[:, :, margin:size - margin].mean(axis=(0, 2))
+    bits = [1 if level > 127 else 0 for level in levels]
+
+    if tuple(bits[:len(TIMESTAMP_GUARD)]) != TIMESTAMP_GUARD:
+        return None
+
+    value = 0
+    for bit in bits[len(TIMESTAMP_GUARD):]:
+        value = (value << 1) | bit
+    return value
+
+
+def latency_ms(timestamp_ms: int) -> float:
+    return float((_now_ms() - timestamp_ms) % _TIMESTAMP_MODULO)
+
+
+# ---------------------------------------------------------------------------
+# Frame-Verteilung
+# ---------------------------------------------------------------------------
+class FrameBroadcaster:
+    """Liest die Replay-Quelle in einem Thread und hält immer nur den neuesten JPEG-Frame."""
+
+    def __init__(self, cap: ReplayCapture, loop: bool, jpeg_quality: int = JPEG_QUALITY) -> None:
+        self._cap = cap
+        self._loop = loop
+        self._jpeg_quality = jpeg_quality
+        self._condition = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._sequence = 0
+        self._raw_listeners: List["FfmpegRtspPublisher"] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-broadcaster", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def add_raw_listener(self, listener: "FfmpegRtspPublisher") -> None:
+        self._raw_listeners.append(listener)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            ret, frame = self._cap.read()
+            if not ret or frame is None:
+                if not self._loop or not self._cap.rewind():
+                    break
+                continue
+
+            embed_timestamp(frame)
+            # Beendete Publisher (z. B. ffmpeg abgestürzt) werden abgehängt statt pro Frame zu scheitern.
+            self._raw_listeners = [listener for listener in self._raw_listeners if listener.push(frame)]
+
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality])
+            if not ok:
+                continue
+            with self._condition:
+                self._jpeg = encoded.tobytes()
+                self._sequence += 1
+                self._condition.notify_all()
+
+        self.stop()
+
+    def wait_for_frame(self, last_sequence: int, timeout: float = 1.0) -> Optional[tuple]:
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._sequence != last_sequence or self._stopped.is_set(),
+                timeout=timeout,
+            )
+            if self._stopped.is_set() and self._sequence == last_sequence:
+                return None
+            return self._sequence, self._jpeg
+
+
+def _make_handler(broadcaster: FrameBroadcaster) -> type:
+    class MjpegHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server-Schnittstelle
+            if self.path.split("?")[0] != MJPEG_PATH:
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}")
+            self.end_headers()
+
+            sequence = 0
+            try:
+                while True:
+                    result = broadcaster.wait_for_frame(sequence)
+                    if result is None:
+                        break
+                    sequence, jpeg = result
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(f"--{MJPEG_BOUNDARY}\r\n".encode("ascii"))
+                    self.wfile.write(b"Content-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+            return
+
+    return MjpegHandler
+
+
+# ---------------------------------------------------------------------------
+# Optionales RTSP über lokales ffmpeg
+# ---------------------------------------------------------------------------
+class FfmpegRtspPublisher:
+    """
+    Schiebt Rohframes an ffmpeg, das sie als H.264 per RTSP veröffentlicht.
+
+    ffmpeg ist nur Publisher: unter ``rtsp_url`` muss ein lokaler RTSP-Server
+    (z. B. mediamtx) laufen, von dem der Detektor den Stream abholt.
+    """
+
+    def __init__(self, rtsp_url: str, fps: float) -> None:
+        self._rtsp_url = rtsp_url
+        self._fps = fps
+        self._process: Optional[subprocess.Popen] = None
+        self._dead = False
+
+    def _start(self, width: int, height: int) -> None:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg wurde nicht im PATH gefunden.")
+        command = [
+            ffmpeg, "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{self._fps:g}",
+            "-i", "-",
+            "-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency", "-pix_fmt", "yuv420p",
+            "-f", "rtsp", "-rtsp_transport", "tcp", self._rtsp_url,
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def push(self, frame: np.ndarray) -> bool:
+        """Schreibt einen Frame; ``False``, sobald ffmpeg nicht mehr annimmt."""
+        if self._dead:
+            return False
+        try:
+            if self._process is None:
+                self._start(frame.shape[1], frame.shape[0])
+            self._process.stdin.write(np.ascontiguousarray(frame).tobytes())
+        except (RuntimeError, OSError) as exc:
+            # Start- wie Schreibfehler hängen nur diesen Publisher ab, der Broadcaster läuft weiter.
+            print(f"RTSP-Publisher beendet: {exc}")
+            self._dead = True
+            return False
+        return True
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin:
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        self._process.wait(timeout=5)
+
+
+# ---------------------------------------------------------------------------
+# Latenzmessung auf Detektorseite
+# ---------------------------------------------------------------------------
+def measure_latency(stream_url: str, template_boxes: list, max_frames: int = 300) -> None:
+    from main2 import FRAME_ROTATION, configure_capture, evaluate_oriented_frame, grab_latest_frame
+
+    cap = configure_capture(stream_url)
+    if not cap.isOpened():
+        print(f"Fehler: Konnte Stream '{stream_url}' nicht öffnen.")
+        return
+
+    latencies: List[float] = []
+    try:
+        for _ in range(max_frames):
+            frame = grab_latest_frame(cap)
+            if frame is None:
+                break
+            timestamp_ms = read_timestamp(frame)
+            # Derselbe Pfad wie die Live-Schleife (Rotation, Orientierungsmodus, aktives Profil).
+            evaluate_oriented_frame(frame, template_boxes, FRAME_ROTATION)
+            if timestamp_ms is not None:
+                latencies.append(latency_ms(timestamp_ms))
+    finally:
+        cap.release()
+
+    if not latencies:
+        print("Keine Frames mit Zeitstempel empfangen.")
+        return
+
+    values = np.asarray(latencies)
+    print(f"Glass-to-Result Latenz über {len(values)} Frames [ms]:")
+    print(
+        f"  mittel {values.mean():.1f}, p50 {np.percentile(values, 50):.1f}, "
+        f"p95 {np.percentile(values, 95):.1f}, max {values.max():.1f}"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Programm-Einstiegspunkt
+# ---------------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokaler Ersatz für die 'IP Webcam'-App.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Video oder Bildsequenz als MJPEG (und optional RTSP) streamen")
+    serve.add_argument("source", help="Videodatei oder Verzeichnis mit Einzelbildern")
+    serve.add_argument("--host", default=DEFAULT_HTTP_HOST,
+                       help="Bind-Adresse; 0.0.0.0 macht den Stream im ganzen Netz erreichbar")
+    serve.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT)
+    serve.add_argument("--mode", choices=[REPLAY_MODE_REALTIME, REPLAY_MODE_FIXED], default=REPLAY_MODE_REALTIME)
+    serve.add_argument("--fps", type=float, default=None)
+    serve.add_argument("--loop", action="store_true", help="Quelle endlos wiederholen")
+    serve.add_argument("--rtsp-url", default=None, help="Zusätzlich per ffmpeg an diese RTSP-URL publizieren")
+
+    measure = subparsers.add_parser("measure", help="Latenz eines Streams mit eingebetteten Zeitstempeln messen")
+    measure.add_argument("url", help=f"z. B. http://127.0.0.1:{DEFAULT_HTTP_PORT}{MJPEG_PATH}")
+    measure.add_argument("--frames", type=int, default=300)
+    measure.add_argument("--profile", default=None, help="Detektionsprofil (JSON/TOML), Standard wie main2")
+
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        from main2 import (
+            DEFAULT_TEMPLATE_BOXES,
+            DETECTION_PROFILE_PATH,
+            JSON_TEMPLATE_PATH,
+            activate_detection_profile,
+            load_template_boxes,
+        )
+
+        activate_detection_profile(args.profile or DETECTION_PROFILE_PATH)
+        measure_latency(args.url, load_template_boxes(JSON_TEMPLATE_PATH, DEFAULT_TEMPLATE_BOXES), args.frames)
+        return
+
+    cap = ReplayCapture(args.source, mode=args.mode, fps=args.fps)
+    if not cap.isOpened():
+        print(f"Fehler: Konnte Quelle '{args.source}' nicht öffnen.")
+        return
+
+    if args.rtsp_url and shutil.which("ffmpeg") is None:
+        print("Fehler: --rtsp-url benötigt ffmpeg, das nicht im PATH gefunden wurde.")
+        cap.release()
+        return
+
+    broadcaster = FrameBroadcaster(cap, loop=args.loop)
+    publisher: Optional[FfmpegRtspPublisher] = None
+    if args.rtsp_url:
+        publisher = FfmpegRtspPublisher(args.rtsp_url, cap.fps)
+        broadcaster.add_raw_listener(publisher)
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(broadcaster))
+    server.daemon_threads = True
+    broadcaster.start()
+    display_host = "127.0.0.1" if args.host in ("", "0.0.0.0") else args.host
+    print(f"MJPEG-Stream: http://{display_host}:{args.port}{MJPEG_PATH}")
+    if args.rtsp_url:
+        print(f"RTSP-Stream:  {args.rtsp_url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broadcaster.stop()
+        server.server_close()
+        if publisher is not None:
+            publisher.close()
+        cap.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Konfiguration & Konstanten
+# ---------------------------------------------------------------------------
+TEMPLATE_POLL_INTERVAL = 1.0
+TEMPLATE_EXTENSION = ".json"
+
+# Aus <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_INOTIFY_EVENT = struct.Struct("iIII")
+_INOTIFY_READ_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class CompiledGeometry:
+    """Vorberechnete Geometrie eines Templates für die Detektion."""
+
+    name: str
+    path: str
+    boxes: List[Dict[str, Any]]  # Box-Dicts ohne Label (z. B. für Session-Store und Warp-Anzeige)
+    geometry: np.ndarray  # (N, 4) float32: x, y, w, h in Prozent, schreibgeschützt
+    parent: Optional[str] = None
+    sources: Tuple[str, ...] = ()  # Dateien der Vererbungskette, das Template selbst zuerst
+
+
+BoxFilter = Callable[[List[Dict[str, Any]], str], List[Dict[str, Any]]]
+
+
+def compile_geometry(template: Any, box_filter: Optional[BoxFilter] = None) -> CompiledGeometry:
+    """Baut aus einem Registry-Template die Geometrie für ``evaluate_frame``."""
+    boxes = template.as_dicts(with_label=False)
+    if box_filter is not None:
+        boxes = box_filter(boxes, template.name)
+    geometry = np.array(
+        [[box["x"], box["y"], box["width"], box["height"]] for box in boxes], dtype=np.float32
+    ).reshape(-1, 4)
+    geometry.setflags(write=False)
+    return CompiledGeometry(template.name, template.path, boxes, geometry, template.parent, template.sources)
+
+
+# ---------------------------------------------------------------------------
+# Änderungsquellen
+# ---------------------------------------------------------------------------
+class _InotifySource:
+    """Nicht-blockierendes inotify über ctypes; ``changes`` kostet ohne Ereignis einen read()."""
+
+    def __init__(self, directory: str) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc nicht gefunden")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify nicht verfügbar")
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch fehlgeschlagen für '{directory}'")
+
+    def changes(self) -> Optional[Set[str]]:
+        """Geänderte Dateinamen seit dem letzten Aufruf; ``None`` nach Queue-Überlauf."""
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, _INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if name:
+                    changed.add(os.fsdecode(name))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingSource:
+    """Fallback ohne inotify: vergleicht mtime und Größe aller Dateien des Verzeichnisses."""
+
+    def __init__(self, directory: str, poll_interval: float) -> None:
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._next_check = time.monotonic() + poll_interval
+        self._signatures = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        signatures: Dict[str, Tuple[int, int]] = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return signatures
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def changes(self) -> Optional[Set[str]]:
+        now = time.monotonic()
+        if now < self._next_check:
+            return set()
+        self._next_check = now + self.poll_interval
+        signatures = self._scan()
+        changed = {
+            name for name in signatures.keys() | self._signatures.keys()
+            if signatures.get(name) != self._signatures.get(name)
+        }
+        self._signatures = signatures
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Template-Watcher
+# ---------------------------------------------------------------------------
+class TemplateWatcher:
+    """
+    Hält die kompilierte Geometrie aller Templates eines Verzeichnisses aktuell.
+
+    ``poll`` wird zwischen zwei Frames aufgerufen, kompiliert nur die geänderten Dateien
+    neu und ersetzt danach den gesamten Cache mit einer einzigen Zuweisung. Ein laufender
+    Frame arbeitet so immer auf einem vollständigen Stand. Ist eine geänderte Datei
+    ungültig (z. B. halb geschrieben), bleibt die bisherige Geometrie aktiv.
+
+    Unter Linux meldet inotify die Änderungen, sonst wird alle ``poll_interval`` Sekunden
+    per ``stat`` verglichen. ``registry`` ist die Template-Registry aus template-gen,
+    ``box_filter`` wählt optional die Boxen aus, die in die Geometrie eingehen.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        registry: Any,
+        poll_interval: float = TEMPLATE_POLL_INTERVAL,
+        use_inotify: bool = True,
+        box_filter: Optional[BoxFilter] = None,
+    ) -> None:
+        self.directory = directory
+        self.registry = registry
+        self.box_filter = box_filter
+        self.version = 0
+        self._source = None
+        if use_inotify:
+            try:
+                self._source = _InotifySource(directory)
+            except (OSError, AttributeError) as exc:
+                print(f"inotify nicht nutzbar ({exc}), Template-Verzeichnis wird gepollt.")
+        if self._source is None:
+            self._source = _PollingSource(directory, poll_interval)
+        self._cache: Dict[str, CompiledGeometry] = {
+            name: compile_geometry(template, box_filter) for name, template in registry.scan(directory).items()
+        }
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if isinstance(self._source, _InotifySource) else "polling"
+
+    @property
+    def templates(self) -> Dict[str, CompiledGeometry]:
+        return self._cache
+
+    def get(self, name: str) -> Optional[CompiledGeometry]:
+        return self._cache.get(name)
+
+    def _all_files(self) -> Set[str]:
+        try:
+            names = set(os.listdir(self.directory))
+        except OSError:
+            names = set()
+        return names | {os.path.basename(item.path) for item in self._cache.values()}
+
+    def poll(self) -> List[str]:
+        """Übernimmt geänderte Templates und gibt deren Namen zurück."""
+        changed = self._source.changes()
+        if changed is None:
+            changed = self._all_files()
+        changed = {name for name in changed if name.endswith(TEMPLATE_EXTENSION)}
+        if not changed:
+            return []
+        # Kinder eines geänderten Eltern-Layouts müssen mit neu aufgelöst werden.
+        changed |= {
+            os.path.basename(item.path)
+            for item in self._cache.values()
+            if any(os.path.basename(source) in changed for source in item.sources[1:])
+        }
+
+        cache = dict(self._cache)
+        updated: List[str] = []
+        for filename in sorted(changed):
+            name = os.path.splitext(filename)[0]
+            path = os.path.join(self.directory, filename)
+            if not os.path.exists(path):
+                if cache.pop(name, None) is not None:
+                    self.registry.invalidate(path)
+                    updated.append(name)
+                continue
+            try:
+                compiled = compile_geometry(self.registry.get(path), self.box_filter)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"Template '{filename}' ungültig, behalte bisherige Geometrie: {exc}")
+                continue
+            previous = cache.get(name)
+            if previous is not None and np.array_equal(previous.geometry, compiled.geometry) \
+                    and previous.boxes == compiled.boxes:
+                continue
+            cache[name] = compiled
+            updated.append(name)
+
+        if updated:
+            self._cache = cache
+            self.version += 1
+        return updated
+
+    def close(self) -> None:
+        self._source.close()
@@ -2,7 +2,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
-from modules.resolution_tester import ResolutionTester
+from modules.resolution_tester import ResolutionTester, format_validation
 from utils.json_handler import JsonHandler
 import os
 from typing import List, Dict, Any, Optional
@@ -104,6 +104,8 @@ class TestingScreen(ttk.Frame):
                   command=self.export_image).pack(side="left", padx=2)
         ttk.Button(action_frame, text="📊 Export All",
                   command=self.export_all_resolutions).pack(side="left", padx=2)
+        ttk.Button(action_frame, text="📏 Validate Sizes",
+                  command=self.validate_sizes).pack(side="left", padx=2)
         
         # Preview Area
         preview_container = ttk.Frame(self)
@@ -442,7 +444,8 @@ class TestingScreen(ttk.Frame):
                         self.current_template,
                         output_dir=output_dir,
                         resolutions=dialog.selected_resolutions,
-                        background_image=background
+                        background_image=background,
+                        progress_callback=self.on_export_progress
                     )
                     
                     messagebox.showinfo("Success", 
@@ -451,6 +454,32 @@ class TestingScreen(ttk.Frame):
                 except Exception as e:
                     messagebox.showerror("Error", f"Export failed: {str(e)}")
 
+    
+    def on_export_progress(self, done: int, total: int, filepath: str):
+        """Zeigt den Export-Fortschritt in der Statusleiste"""
+        self.status_label.config(text=f"Exported {done}/{total}: {os.path.basename(filepath)}")
+        self.update_idletasks()
+    
+    def validate_sizes(self):
+        """Prüft die Box-Größen auf allen Auflösungen numerisch (ohne Rendern)"""
+        if not self.current_template:
+            messagebox.showwarning("No Template", "Please load a template first")
+            return
+        
+        name = self.template_label.cget("text")
+        # load_template liefert die Boxen mit ``type``: dieselben OCR-Ausnahmen wie validate_directory
+        validation = self.resolution_tester.validate_templates({name: self.current_template})
+        flagged = len(validation.flagged())
+        self.status_label.config(text=f"Size validation: {flagged} issues")
+        
+        window = tk.Toplevel(self)
+        window.title("Size Validation")
+        window.geometry("720x500")
+        text = tk.Text(window, font=('Consolas', 9), wrap="none")
+        text.pack(fill="both", expand=True)
+        text.insert("1.0", format_validation(validation, max_rows=500))
+        text.config(state="disabled")
+
 
 class ResolutionSelectionDialog(tk.Toplevel):
     """Dialog zur Auswahl mehrerer Auflösungen"""
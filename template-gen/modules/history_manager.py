@@ -5,6 +5,11 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 import shutil
 
+from modules.template_versions import TemplateDiff, TemplateVersionLog
+from utils.template_registry import get_registry
+
+CURRENT_TEMPLATE_NAME = "template.json"
+
 
 class HistoryManager:
     def __init__(self, base_path: str = "data"):
@@ -194,6 +199,10 @@ class HistoryManager:
         """
         Aktualisiert das Template eines Projekts
         
+        Statt bei jedem Speichern eine weitere Kopie abzulegen, wird nur der Diff zur
+        Vorversion im Versionslog des Projekts angehängt; ``template.json`` im
+        Projekt-Ordner enthält immer den aktuellen, flachen Stand.
+        
         Args:
             project_id: Projekt-ID
             template_path: Neuer Template-Pfad
@@ -205,13 +214,18 @@ class HistoryManager:
             with open(info_path, 'r', encoding='utf-8') as f:
                 project_info = json.load(f)
             
-            # Kopiere Template in Projekt-Ordner
-            template_name = os.path.basename(template_path)
-            new_template_path = os.path.join(project_dir, template_name)
-            shutil.copy2(template_path, new_template_path)
+            # Version festhalten (unveränderte Stände erzeugen keine neue Version)
+            boxes = get_registry().get(template_path).as_dicts()
+            version, _ = TemplateVersionLog(project_dir).append(boxes, os.path.basename(template_path))
+            
+            # Aktueller Stand aufgelöst, damit "extends" auch außerhalb des Template-Ordners gilt
+            new_template_path = os.path.join(project_dir, CURRENT_TEMPLATE_NAME)
+            with open(new_template_path, 'w', encoding='utf-8') as f:
+                json.dump(boxes, f, indent=2, ensure_ascii=False)
             
             # Aktualisiere Info
             project_info['template_path'] = new_template_path
+            project_info['template_version'] = version
             project_info['last_modified'] = datetime.now().isoformat()
             
             # Speichere
@@ -221,6 +235,46 @@ class HistoryManager:
             # Aktualisiere Historie
             self.add_to_history(project_info)
     
+    def get_template_versions(self, project_id: str) -> List[Dict[str, Any]]:
+        """
+        Listet die Template-Versionen eines Projekts auf
+        
+        Args:
+            project_id: Projekt-ID
+            
+        Returns:
+            Liste mit Version, Zeitstempel, Quelle und Kurzbeschreibung
+        """
+        return TemplateVersionLog(os.path.join(self.projects_path, project_id)).versions()
+    
+    def load_template_version(self, project_id: str, version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Stellt einen Template-Stand eines Projekts wieder her
+        
+        Args:
+            project_id: Projekt-ID
+            version: Version (Standard: neueste)
+            
+        Returns:
+            Liste von Box-Dictionaries
+        """
+        return TemplateVersionLog(os.path.join(self.projects_path, project_id)).reconstruct(version)
+    
+    def diff_template_versions(self, project_id: str, from_version: int,
+                               to_version: Optional[int] = None) -> TemplateDiff:
+        """
+        Vergleicht zwei Template-Versionen eines Projekts
+        
+        Args:
+            project_id: Projekt-ID
+            from_version: Ausgangsversion
+            to_version: Zielversion (Standard: neueste)
+            
+        Returns:
+            TemplateDiff
+        """
+        return TemplateVersionLog(os.path.join(self.projects_path, project_id)).diff(from_version, to_version)
+    
     def delete_project(self, project_id: str):
         """
         Löscht ein Projekt
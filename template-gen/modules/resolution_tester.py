@@ -1,8 +1,131 @@
 """Resolution Tester für Template-Tests auf verschiedenen Auflösungen"""
 from PIL import Image, ImageDraw, ImageFont
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+import argparse
+import csv
 import os
 
+import numpy as np
+
+
+# Mindestgrößen in Pixeln für die numerische Validierung
+MIN_OCR_WIDTH_PX = 32  # wenige Zeichen brauchen etwa diese Breite
+MIN_OCR_HEIGHT_PX = 20  # darunter liest OCR Ziffern nicht mehr zuverlässig
+MIN_EDGE_PX = 8  # kleinere Boxen überstehen Canny + Vierecks-Näherung nicht
+
+STATUS_OK = 0
+STATUS_OCR = 1
+STATUS_EDGE = 2
+STATUS_LABELS = {STATUS_OK: "ok", STATUS_OCR: "zu klein für OCR", STATUS_EDGE: "zu klein für Kanten"}
+OCR_EXEMPT_TYPES = ("checkbox",)  # werden über Schwarzanteil gelesen, nicht per OCR
+
+# Export: höchstens so viele Testbilder gleichzeitig im Speicher (8K RGB ~ 100 MB)
+EXPORT_MAX_IN_FLIGHT = 2
+
+# Fortschritt: (fertig, gesamt, Pfad der gerade geschriebenen Datei)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+@dataclass
+class ResolutionValidation:
+    """Pixelgrößen aller Boxen × Auflösungen als Tabelle (eine Zeile je Box)"""
+    resolutions: List[str]
+    sizes: np.ndarray  # (R, 2): Breite, Höhe der Auflösungen
+    templates: List[str]  # Template-Name je Zeile
+    box_ids: List[str]  # Box-ID je Zeile
+    widths: np.ndarray  # (B, R) Pixelbreite, gerundet wie beim Zeichnen
+    heights: np.ndarray  # (B, R) Pixelhöhe
+    status: np.ndarray  # (B, R) STATUS_OK / STATUS_OCR / STATUS_EDGE
+
+    @property
+    def has_errors(self) -> bool:
+        return bool((self.status != STATUS_OK).any())
+
+    def flagged(self) -> List[Dict[str, Any]]:
+        """
+        Alle Box-Auflösungs-Paare mit Befund
+        
+        Returns:
+            Liste von Dictionaries (Template, Box, Auflösung, Pixelgröße, Befund)
+        """
+        rows, columns = np.nonzero(self.status)
+        return [
+            {
+                "template": self.templates[row],
+                "box": self.box_ids[row],
+                "resolution": self.resolutions[column],
+                "width_px": int(self.widths[row, column]),
+                "height_px": int(self.heights[row, column]),
+                "status": STATUS_LABELS[int(self.status[row, column])],
+            }
+            for row, column in zip(rows.tolist(), columns.tolist())
+        ]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Kennzahlen je Auflösung
+        
+        Returns:
+            Liste mit kleinster Box und Anzahl Befunde je Auflösung
+        """
+        if not self.box_ids:
+            return []
+        smallest = np.minimum(self.widths, self.heights).min(axis=0)
+        ocr = (self.status == STATUS_OCR).sum(axis=0)
+        edge = (self.status == STATUS_EDGE).sum(axis=0)
+        return [
+            {
+                "resolution": name,
+                "size": f"{int(width)}x{int(height)}",
+                "smallest_px": int(smallest[index]),
+                "ocr": int(ocr[index]),
+                "edge": int(edge[index]),
+            }
+            for index, (name, (width, height)) in enumerate(zip(self.resolutions, self.sizes))
+        ]
+
+    def to_csv(self, path: str):
+        """Schreibt die vollständige Tabelle (eine Zeile je Box und Auflösung)"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["template", "box", "resolution", "width_px", "height_px", "status"])
+            for row, (template, box_id) in enumerate(zip(self.templates, self.box_ids)):
+                for column, resolution in enumerate(self.resolutions):
+                    writer.writerow([
+                        template, box_id, resolution,
+                        int(self.widths[row, column]), int(self.heights[row, column]),
+                        STATUS_LABELS[int(self.status[row, column])],
+                    ])
+
+
+def format_validation(validation: ResolutionValidation, max_rows: int = 50) -> str:
+    """
+    Formatiert eine Validierung als Text-Tabelle
+    
+    Args:
+        validation: Ergebnis von ``ResolutionTester.validate_templates``
+        max_rows: Maximale Anzahl aufgelisteter Befunde
+        
+    Returns:
+        Mehrzeiliger Text
+    """
+    lines = [f"{'Auflösung':<18} {'Größe':>10} {'min. px':>8} {'OCR':>5} {'Kante':>6}"]
+    for row in validation.summary():
+        lines.append(f"{row['resolution']:<18} {row['size']:>10} {row['smallest_px']:>8} "
+                     f"{row['ocr']:>5} {row['edge']:>6}")
+    flagged = validation.flagged()
+    if flagged:
+        lines.append("")
+        lines.append(f"{len(flagged)} Befunde:")
+        for row in flagged[:max_rows]:
+            lines.append(f"  {row['template']} / {row['box']} @ {row['resolution']}: "
+                         f"{row['width_px']}x{row['height_px']}px, {row['status']}")
+        if len(flagged) > max_rows:
+            lines.append(f"  ... {len(flagged) - max_rows} weitere")
+    return "\n".join(lines)
+
 
 class ResolutionTester:
     """Testet Templates auf verschiedenen Bildschirmauflösungen"""
@@ -353,46 +476,244 @@ class ResolutionTester:
     def export_test_results(self, template: List[Dict[str, Any]], 
                            output_dir: str = "data/test_results",
                            resolutions: List[str] = None,
-                           background_image: Image.Image = None) -> List[str]:
+                           background_image: Image.Image = None,
+                           workers: Optional[int] = None,
+                           max_in_flight: int = EXPORT_MAX_IN_FLIGHT,
+                           progress_callback: Optional[ProgressCallback] = None) -> List[str]:
         """
         Exportiert Testergebnisse für mehrere Auflösungen
         
+        Jede Auflösung wird in einem Worker-Prozess gerendert und dort sofort als PNG
+        gespeichert; der aufrufende Prozess hält kein Bild. Es sind nie mehr als
+        ``max_in_flight`` Bilder gleichzeitig in Arbeit, damit 5K/8K-Exporte den
+        Speicher nicht sprengen.
+        
         Args:
             template: Template-Daten
             output_dir: Ausgabe-Verzeichnis
             resolutions: Liste zu testender Auflösungen (None = alle)
             background_image: Optionales Hintergrundbild
+            workers: Anzahl Worker-Prozesse (None = CPU-Anzahl, 1 = seriell im Prozess)
+            max_in_flight: Maximale Anzahl gleichzeitig gerenderter Bilder
+            progress_callback: Wird nach jeder geschriebenen Datei aufgerufen
             
         Returns:
-            Liste der generierten Dateipfade
+            Liste der generierten Dateipfade (in Reihenfolge der Auflösungen)
         """
         os.makedirs(output_dir, exist_ok=True)
         
         if resolutions is None:
             resolutions = [r for r in self.RESOLUTIONS.keys() if r != "Custom"]
         
-        generated_files = []
+        jobs = self._export_jobs(resolutions, output_dir)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, max_in_flight, len(jobs)))
         
-        for resolution_name in resolutions:
-            if resolution_name not in self.RESOLUTIONS:
-                continue
-            
-            self.set_resolution(resolution_name)
+        done_count = 0
+        
+        def report(filepath: str):
+            nonlocal done_count
+            done_count += 1
+            if progress_callback is not None:
+                progress_callback(done_count, len(jobs), filepath)
+        
+        if workers == 1:
+            for job in jobs:
+                report(_render_to_file(template, background_image, *job))
+            return [filepath for _, _, filepath in jobs]
+        
+        written = set()
+        pending = set()
+        queue = iter(jobs)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_export_worker,
+                                 initargs=(template, background_image)) as executor:
+            def submit_next() -> bool:
+                job = next(queue, None)
+                if job is None:
+                    return False
+                pending.add(executor.submit(_render_in_worker, *job))
+                return True
             
-            # Generiere Testbild
-            test_image = self.apply_template(
-                template,
-                background_image=background_image,
-                show_grid=True,
-                show_dimensions=True
-            )
+            for _ in range(max(1, max_in_flight)):
+                if not submit_next():
+                    break
             
-            # Speichere Bild
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        pending.discard(future)
+                        filepath = future.result()
+                        written.add(filepath)
+                        report(filepath)
+                        submit_next()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        
+        return [filepath for _, _, filepath in jobs if filepath in written]
+    
+    def _resolution_size(self, resolution_name: str) -> Optional[Tuple[int, int]]:
+        """Größe einer Auflösung (Custom = aktuelle Custom-Größe), None wenn unbekannt"""
+        if resolution_name == "Custom":
+            return self.custom_resolution
+        return self.RESOLUTIONS.get(resolution_name)
+    
+    def _export_jobs(self, resolutions: Sequence[str], output_dir: str) -> List[Tuple[str, Tuple[int, int], str]]:
+        """Baut (Auflösung, Größe, Zieldatei) für jede gültige Auflösung"""
+        jobs = []
+        for resolution_name in resolutions:
+            size = self._resolution_size(resolution_name)
+            if size is None:
+                continue
             safe_name = resolution_name.replace(" ", "_").replace("(", "").replace(")", "")
-            filename = f"test_{safe_name}.png"
-            filepath = os.path.join(output_dir, filename)
+            jobs.append((resolution_name, size, os.path.join(output_dir, f"test_{safe_name}.png")))
+        return jobs
+    
+    def validate_templates(self, templates: Dict[str, List[Dict[str, Any]]],
+                           resolutions: Optional[Sequence[str]] = None,
+                           min_ocr_width: int = MIN_OCR_WIDTH_PX,
+                           min_ocr_height: int = MIN_OCR_HEIGHT_PX,
+                           min_edge: int = MIN_EDGE_PX) -> ResolutionValidation:
+        """
+        Prüft die Pixelgrößen aller Boxen auf allen Auflösungen, ohne Bilder zu rendern
+        
+        Alle Boxen aller Templates werden zu einem ``(B, 2)``-Array gestapelt und per
+        Broadcasting gegen die ``(R, 2)``-Auflösungen gerechnet; die Pixelgrößen entsprechen
+        exakt denen in ``apply_template``.
+        
+        Args:
+            templates: Template-Name -> Box-Dictionaries (Prozentkoordinaten)
+            resolutions: Zu prüfende Auflösungen (None = alle außer Custom); unbekannte
+                Namen lösen ValueError aus, statt still übersprungen zu werden
+            min_ocr_width: Mindestbreite in Pixeln für OCR
+            min_ocr_height: Mindesthöhe in Pixeln für OCR
+            min_edge: Mindestkantenlänge in Pixeln für die Kantendetektion
+            
+        Returns:
+            ResolutionValidation
+        """
+        if resolutions is None:
+            resolutions = [r for r in self.RESOLUTIONS.keys() if r != "Custom"]
+        unknown = [r for r in resolutions if self._resolution_size(r) is None]
+        if unknown:
+            raise ValueError(f"Unbekannte Auflösung(en): {', '.join(unknown)}")
+        names = []
+        sizes = []
+        for resolution_name in resolutions:
+            size = self._resolution_size(resolution_name)
+            names.append(resolution_name)
+            sizes.append(size)
+        sizes = np.array(sizes, dtype=np.float64).reshape(-1, 2)
+        
+        template_names = []
+        box_ids = []
+        percent = []
+        needs_ocr = []
+        for template_name, boxes in templates.items():
+            for box in boxes:
+                template_names.append(template_name)
+                box_ids.append(str(box.get("id", f"box_{len(box_ids) + 1}")))
+                percent.append((box["width"], box["height"]))
+                needs_ocr.append(box.get("type") not in OCR_EXEMPT_TYPES)
+        percent = np.array(percent, dtype=np.float64).reshape(-1, 2) / 100
+        needs_ocr = np.array(needs_ocr, dtype=bool)
+        
+        # (B, 1) * (1, R) -> (B, R); floor entspricht int() bei positiven Werten
+        widths = np.floor(percent[:, :1] * sizes[:, 0]).astype(np.int32)
+        heights = np.floor(percent[:, 1:] * sizes[:, 1]).astype(np.int32)
+        
+        status = np.full(widths.shape, STATUS_OK, dtype=np.int8)
+        ocr_small = (widths < min_ocr_width) | (heights < min_ocr_height)
+        status[ocr_small & needs_ocr[:, None]] = STATUS_OCR
+        status[np.minimum(widths, heights) < min_edge] = STATUS_EDGE
+        
+        return ResolutionValidation(
+            resolutions=names,
+            sizes=sizes.astype(np.int32),
+            templates=template_names,
+            box_ids=box_ids,
+            widths=widths,
+            heights=heights,
+            status=status,
+        )
+    
+    def validate_directory(self, directory: str,
+                           resolutions: Optional[Sequence[str]] = None) -> ResolutionValidation:
+        """
+        Validiert alle JSON-Templates eines Verzeichnisses
+        
+        Args:
+            directory: Verzeichnis mit JSON-Templates
+            resolutions: Zu prüfende Auflösungen (None = alle außer Custom)
             
-            test_image.save(filepath)
-            generated_files.append(filepath)
+        Returns:
+            ResolutionValidation
+        """
+        from utils.template_registry import get_registry
         
-        return generated_files
+        # Mit Zusatzfeldern, damit der Box-Typ (z. B. checkbox) die OCR-Ausnahme steuert
+        templates = {
+            name: template.as_dicts(with_extra=True) for name, template in get_registry().scan(directory).items()
+        }
+        return self.validate_templates(templates, resolutions)
+
+
+# ---------------------------------------------------------------------------
+# Export-Worker (Modulebene, damit ProcessPoolExecutor sie picklen kann)
+# ---------------------------------------------------------------------------
+_export_state: Dict[str, Any] = {}
+
+
+def _init_export_worker(template: List[Dict[str, Any]], background_image: Optional[Image.Image]):
+    """Übergibt Template und Hintergrund einmal je Worker statt je Auflösung"""
+    _export_state["template"] = template
+    _export_state["background_image"] = background_image
+
+
+def _render_to_file(template: List[Dict[str, Any]], background_image: Optional[Image.Image],
+                    resolution_name: str, size: Tuple[int, int], filepath: str) -> str:
+    """Rendert eine Auflösung, speichert sie und gibt das Bild sofort wieder frei"""
+    tester = ResolutionTester()
+    tester.set_resolution(resolution_name, *size)
+    test_image = tester.apply_template(
+        template,
+        background_image=background_image,
+        show_grid=True,
+        show_dimensions=True
+    )
+    test_image.save(filepath)
+    return filepath
+
+
+def _render_in_worker(resolution_name: str, size: Tuple[int, int], filepath: str) -> str:
+    return _render_to_file(_export_state["template"], _export_state["background_image"],
+                           resolution_name, size, filepath)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prüft Box-Größen aller Templates auf allen Auflösungen")
+    parser.add_argument("directory", help="Verzeichnis mit JSON-Templates")
+    parser.add_argument("--resolution", action="append", dest="resolutions",
+                        help="Nur diese Auflösung prüfen (mehrfach möglich)")
+    parser.add_argument("--csv", dest="csv_path", help="Vollständige Tabelle als CSV schreiben")
+    args = parser.parse_args(argv)
+    
+    tester = ResolutionTester()
+    for resolution_name in args.resolutions or []:
+        if tester._resolution_size(resolution_name) is None:
+            parser.error(f"Unbekannte Auflösung '{resolution_name}' "
+                         f"(verfügbar: {', '.join(tester.get_available_resolutions())})")
+    
+    validation = tester.validate_directory(args.directory, args.resolutions)
+    print(format_validation(validation))
+    if args.csv_path:
+        validation.to_csv(args.csv_path)
+    return 1 if validation.has_errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
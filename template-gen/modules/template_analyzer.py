@@ -0,0 +1,339 @@
+"""Template Analyzer: Überlappungen, Lint-Befunde und Trennschärfe der Boxen"""
+import argparse
+import heapq
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.template_registry import get_registry
+
+
+@dataclass(frozen=True)
+class BoxOverlap:
+    """Überlappung zweier Boxen (Flächen in Prozent²)"""
+    first: str
+    second: str
+    intersection: float
+    iou: float
+    containment: float  # Schnittfläche / Fläche der kleineren Box
+
+
+@dataclass(frozen=True)
+class LintIssue:
+    """Einzelner Befund; ``severity`` ist "error" oder "warning\""""
+    severity: str
+    code: str
+    box_ids: Tuple[str, ...]
+    message: str
+
+
+@dataclass(frozen=True)
+class BoxScore:
+    """Schätzung, wie zuverlässig eine Box bei der Detektion zugeordnet wird"""
+    id: str
+    max_iou: float  # höchste IoU mit einer anderen Box desselben Templates
+    jitter_iou: float  # IoU mit sich selbst bei Versatz um ``jitter`` Prozent
+    shared_with: int  # Anzahl anderer Templates mit nahezu gleicher Box (nur im Batch)
+    score: float
+
+
+@dataclass
+class TemplateReport:
+    """Ergebnis der Analyse eines Templates"""
+    name: str
+    box_count: int
+    overlaps: List[BoxOverlap] = field(default_factory=list)
+    issues: List[LintIssue] = field(default_factory=list)
+    scores: Dict[str, BoxScore] = field(default_factory=dict)
+    recommended_ids: List[str] = field(default_factory=list)
+
+    @property
+    def has_errors(self) -> bool:
+        return any(issue.severity == "error" for issue in self.issues)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["scores"] = [asdict(score) for score in self.scores.values()]
+        return data
+
+
+def _bounds(box: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    x, y = float(box["x"]), float(box["y"])
+    return x, y, x + float(box["width"]), y + float(box["height"])
+
+
+def _iou(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> float:
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def sweep_overlaps(boxes: Sequence[Dict[str, Any]]) -> List[BoxOverlap]:
+    """
+    Findet alle überlappenden Box-Paare per Sweep-Line über die x-Achse
+
+    Boxen werden nach linker Kante sortiert; aktiv sind nur Boxen, deren rechte Kante
+    noch nicht passiert ist (Min-Heap). Jede Box wird gegen alle aktiven Boxen auf
+    y-Überlappung geprüft: O(n log n + n·a) mit a = Zahl gleichzeitig aktiver Boxen.
+    Übereinander gestapelte Boxen mit gleichem x-Bereich (Seitenleiste, ScrollBars)
+    sind alle gleichzeitig aktiv, dort bleibt es im schlimmsten Fall bei n² Vergleichen;
+    bei Templates mit wenigen Dutzend Boxen ist das unkritisch.
+
+    Args:
+        boxes: Box-Dictionaries mit x, y, width, height in Prozent
+
+    Returns:
+        Liste aller Paare mit positiver Schnittfläche
+    """
+    order = sorted(range(len(boxes)), key=lambda index: float(boxes[index]["x"]))
+    bounds = [_bounds(box) for box in boxes]
+    active: List[Tuple[float, int]] = []
+    overlaps: List[BoxOverlap] = []
+
+    for index in order:
+        left, top, right, bottom = bounds[index]
+        while active and active[0][0] <= left:
+            heapq.heappop(active)
+        for _, other in active:
+            o_left, o_top, o_right, o_bottom = bounds[other]
+            inter_w = min(right, o_right) - max(left, o_left)
+            inter_h = min(bottom, o_bottom) - max(top, o_top)
+            if inter_w <= 0 or inter_h <= 0:
+                continue
+            inter = inter_w * inter_h
+            area = (right - left) * (bottom - top)
+            other_area = (o_right - o_left) * (o_bottom - o_top)
+            union = area + other_area - inter
+            smaller = min(area, other_area)
+            first, second = sorted((other, index))
+            overlaps.append(BoxOverlap(
+                first=str(boxes[first]["id"]),
+                second=str(boxes[second]["id"]),
+                intersection=inter,
+                iou=inter / union if union > 0 else 0.0,
+                containment=inter / smaller if smaller > 0 else 0.0,
+            ))
+        heapq.heappush(active, (right, index))
+
+    return overlaps
+
+
+class TemplateAnalyzer:
+    """Prüft Templates auf problematische Boxen und schlägt eine Box-Auswahl für die Detektion vor"""
+
+    def __init__(
+        self,
+        duplicate_iou: float = 0.9,
+        containment: float = 0.9,
+        min_size: float = 0.5,
+        jitter: float = 0.5,
+        min_score: float = 0.2,
+    ):
+        """
+        Initialisiert den Analyzer
+
+        Args:
+            duplicate_iou: Ab dieser IoU gelten zwei Boxen als Duplikat
+            containment: Ab diesem Anteil gilt die kleinere Box als in der größeren enthalten
+            min_size: Minimale Breite/Höhe in Prozent, darunter ist eine Box degeneriert
+            jitter: Angenommener Lagefehler der Detektion in Prozent je Achse
+            min_score: Mindest-Trennschärfe für die empfohlene Box-Auswahl
+        """
+        self.duplicate_iou = duplicate_iou
+        self.containment = containment
+        self.min_size = min_size
+        self.jitter = jitter
+        self.min_score = min_score
+
+    def _jitter_iou(self, box: Dict[str, Any]) -> float:
+        width, height = float(box["width"]), float(box["height"])
+        if width <= 0 or height <= 0:
+            return 0.0
+        inter = max(0.0, width - self.jitter) * max(0.0, height - self.jitter)
+        return inter / (2 * width * height - inter)
+
+    def lint(self, boxes: Sequence[Dict[str, Any]], overlaps: Sequence[BoxOverlap]) -> List[LintIssue]:
+        """
+        Sammelt Befunde zu einzelnen Boxen und Box-Paaren
+
+        Args:
+            boxes: Box-Dictionaries
+            overlaps: Ergebnis von ``sweep_overlaps``
+
+        Returns:
+            Liste von Befunden
+        """
+        issues: List[LintIssue] = []
+        seen_ids: Dict[str, int] = {}
+        for box in boxes:
+            box_id = str(box["id"])
+            seen_ids[box_id] = seen_ids.get(box_id, 0) + 1
+            left, top, right, bottom = _bounds(box)
+            if float(box["width"]) < self.min_size or float(box["height"]) < self.min_size:
+                issues.append(LintIssue("error", "degenerate", (box_id,),
+                                        f"{box_id}: {box['width']} x {box['height']} % ist zu klein"))
+            if left < 0 or top < 0 or right > 100 or bottom > 100:
+                issues.append(LintIssue("error", "out_of_bounds", (box_id,),
+                                        f"{box_id}: ragt über den Screen hinaus ({left:.2f}, {top:.2f}, {right:.2f}, {bottom:.2f})"))
+
+        for box_id, count in seen_ids.items():
+            if count > 1:
+                issues.append(LintIssue("error", "duplicate_id", (box_id,), f"ID {box_id} kommt {count}x vor"))
+
+        for overlap in overlaps:
+            pair = (overlap.first, overlap.second)
+            if overlap.iou >= self.duplicate_iou:
+                issues.append(LintIssue("error", "duplicate", pair,
+                                        f"{overlap.first} und {overlap.second} sind nahezu deckungsgleich (IoU {overlap.iou:.2f})"))
+            elif overlap.containment >= self.containment:
+                issues.append(LintIssue("warning", "contained", pair,
+                                        f"{overlap.first} und {overlap.second}: kleinere Box liegt zu {overlap.containment:.0%} in der größeren"))
+        return issues
+
+    def analyze(
+        self,
+        boxes: Sequence[Dict[str, Any]],
+        name: str = "<template>",
+        shared: Optional[Dict[str, int]] = None,
+    ) -> TemplateReport:
+        """
+        Analysiert ein Template
+
+        Der Score einer Box ist ``(1 - max_iou) * jitter_iou``: Boxen, die einer Nachbarbox
+        ähneln, werden bei der IoU-Zuordnung verwechselt, und kleine Boxen verlieren schon
+        bei wenig Lagefehler die Mindest-IoU.
+
+        Args:
+            boxes: Box-Dictionaries
+            name: Template-Name für den Bericht
+            shared: Box-ID -> Anzahl anderer Templates mit gleicher Box (aus ``analyze_directory``)
+
+        Returns:
+            TemplateReport
+        """
+        overlaps = sweep_overlaps(boxes)
+        report = TemplateReport(name=name, box_count=len(boxes), overlaps=overlaps)
+        report.issues = self.lint(boxes, overlaps)
+
+        max_iou: Dict[str, float] = {str(box["id"]): 0.0 for box in boxes}
+        for overlap in overlaps:
+            max_iou[overlap.first] = max(max_iou[overlap.first], overlap.iou)
+            max_iou[overlap.second] = max(max_iou[overlap.second], overlap.iou)
+        for box in boxes:
+            box_id = str(box["id"])
+            jitter_iou = self._jitter_iou(box)
+            report.scores[box_id] = BoxScore(
+                id=box_id,
+                max_iou=max_iou[box_id],
+                jitter_iou=jitter_iou,
+                shared_with=(shared or {}).get(box_id, 0),
+                score=(1.0 - max_iou[box_id]) * jitter_iou,
+            )
+
+        report.recommended_ids = self._recommend(boxes, report)
+        return report
+
+    def _recommend(self, boxes: Sequence[Dict[str, Any]], report: TemplateReport) -> List[str]:
+        excluded = {
+            box_id
+            for issue in report.issues
+            if issue.code in ("degenerate", "out_of_bounds")
+            for box_id in issue.box_ids
+        }
+        areas = {str(box["id"]): float(box["width"]) * float(box["height"]) for box in boxes}
+        children: Dict[str, List[str]] = {}
+        for overlap in report.overlaps:
+            smaller, larger = sorted((overlap.first, overlap.second), key=lambda box_id: areas[box_id])
+            if overlap.iou >= self.duplicate_iou:
+                excluded.add(smaller)
+            elif overlap.containment >= self.containment:
+                children.setdefault(larger, []).append(smaller)
+        for container, contained in children.items():
+            if len(contained) > 1:
+                # Gruppen-Box (z. B. Scrollbar-Spur um Start und Ende): die Kinder sind trennschärfer.
+                excluded.add(container)
+            else:
+                # Einzelne verschachtelte Box deckt sich mit dem Rand der äußeren.
+                excluded.update(contained)
+
+        valid = [str(box["id"]) for box in boxes if str(box["id"]) not in excluded]
+        selected = [box_id for box_id in valid if report.scores[box_id].score >= self.min_score]
+        return selected or valid or [str(box["id"]) for box in boxes]
+
+    def select_boxes(self, boxes: List[Dict[str, Any]], name: str = "<template>") -> List[Dict[str, Any]]:
+        """
+        Gibt die empfohlene Box-Teilmenge für die Detektion zurück
+
+        Args:
+            boxes: Box-Dictionaries
+            name: Template-Name
+
+        Returns:
+            Teilmenge von ``boxes`` in ursprünglicher Reihenfolge
+        """
+        recommended = set(self.analyze(boxes, name).recommended_ids)
+        return [box for box in boxes if str(box["id"]) in recommended]
+
+    def analyze_directory(self, directory: str) -> List[TemplateReport]:
+        """
+        Analysiert alle Templates eines Verzeichnisses
+
+        Zusätzlich wird je Box gezählt, in wie vielen anderen Templates eine nahezu
+        deckungsgleiche Box vorkommt; solche Boxen unterscheiden die Templates nicht.
+
+        Args:
+            directory: Verzeichnis mit JSON-Templates
+
+        Returns:
+            Liste von TemplateReports, nach Namen sortiert
+        """
+        templates = {name: template.as_dicts() for name, template in get_registry().scan(directory).items()}
+
+        reports = []
+        for name, boxes in templates.items():
+            shared: Dict[str, int] = {}
+            for box in boxes:
+                bounds = _bounds(box)
+                shared[str(box["id"])] = sum(
+                    1
+                    for other_name, other_boxes in templates.items()
+                    if other_name != name
+                    and any(_iou(bounds, _bounds(other)) >= self.duplicate_iou for other in other_boxes)
+                )
+            reports.append(self.analyze(boxes, name, shared))
+        return reports
+
+
+def format_report(report: TemplateReport, min_score: float = 0.2) -> str:
+    lines = [f"{report.name}: {report.box_count} Boxen, {len(report.overlaps)} Überlappungen, "
+             f"Auswahl {len(report.recommended_ids)}/{report.box_count}"]
+    for issue in report.issues:
+        lines.append(f"  [{issue.severity}] {issue.code}: {issue.message}")
+    weak = [score for score in report.scores.values() if score.score < min_score]
+    for score in weak:
+        lines.append(f"  [info] schwach: {score.id} (Score {score.score:.2f}, Jitter-IoU {score.jitter_iou:.2f})")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analysiert Templates auf Überlappungen und problematische Boxen")
+    parser.add_argument("directory", help="Verzeichnis mit JSON-Templates")
+    parser.add_argument("--json", dest="json_path", help="Bericht zusätzlich als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    analyzer = TemplateAnalyzer()
+    reports = analyzer.analyze_directory(args.directory)
+    for report in reports:
+        print(format_report(report, analyzer.min_score))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([report.to_dict() for report in reports], f, indent=2, ensure_ascii=False)
+    return 1 if any(report.has_errors for report in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
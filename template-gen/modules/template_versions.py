@@ -0,0 +1,283 @@
+"""Template-Versionierung: strukturelle Diffs je Projekt statt vollständiger Kopien"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+GEOMETRY_KEYS = ("x", "y", "width", "height")
+BOX_KEYS = GEOMETRY_KEYS + ("label",)
+VERSION_LOG_NAME = "template_versions.jsonl"
+SNAPSHOT_INTERVAL = 20  # jede n-te Version speichert zusätzlich den vollständigen Stand
+
+
+@dataclass
+class TemplateDiff:
+    """Unterschied zwischen zwei Template-Ständen"""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    renamed: Dict[str, str] = field(default_factory=dict)  # alte ID -> neue ID (per IoU zugeordnet)
+    changed: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # ID (neu) -> geänderte Felder
+    order: Optional[List[str]] = None  # neue Reihenfolge, nur falls sie sich geändert hat
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.renamed or self.changed or self.order)
+
+    @property
+    def geometry_changed_ids(self) -> List[str]:
+        """IDs, deren Geometrie die Detektion neu berechnen muss"""
+        ids = [box["id"] for box in self.added]
+        ids.extend(box_id for box_id, fields in self.changed.items() if any(key in fields for key in GEOMETRY_KEYS))
+        return ids
+
+    def summary(self) -> str:
+        parts = []
+        for count, text in ((len(self.added), "neu"), (len(self.removed), "entfernt"),
+                            (len(self.renamed), "umbenannt"), (len(self.changed), "geändert")):
+            if count:
+                parts.append(f"{count} {text}")
+        return ", ".join(parts) if parts else "unverändert"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key in ("added", "removed", "renamed", "changed", "order"):
+            value = getattr(self, key)
+            if value:
+                data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TemplateDiff":
+        return cls(
+            added=list(data.get("added", [])),
+            removed=list(data.get("removed", [])),
+            renamed=dict(data.get("renamed", {})),
+            changed=dict(data.get("changed", {})),
+            order=data.get("order"),
+        )
+
+
+def _box_iou(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    inter_w = min(a["x"] + a["width"], b["x"] + b["width"]) - max(a["x"], b["x"])
+    inter_h = min(a["y"] + a["height"], b["y"] + b["height"]) - max(a["y"], b["y"])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    union = a["width"] * a["height"] + b["width"] * b["height"] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: new[key] for key in BOX_KEYS if key in new and old.get(key) != new[key]}
+
+
+def diff_templates(old: List[Dict[str, Any]], new: List[Dict[str, Any]], min_iou: float = 0.5) -> TemplateDiff:
+    """
+    Vergleicht zwei Box-Listen strukturell
+
+    Boxen werden zuerst über die ID zugeordnet (ein Dictionary-Lookup je Box). Nur die
+    übrig gebliebenen werden paarweise per IoU verglichen, damit eine umbenannte, aber
+    kaum verschobene Box nicht als entfernt + neu erscheint.
+
+    Args:
+        old: Bisherige Boxen
+        new: Neue Boxen
+        min_iou: Mindest-IoU für die Zuordnung ohne gleiche ID
+
+    Returns:
+        TemplateDiff
+    """
+    diff = TemplateDiff()
+    old_by_id = {box["id"]: box for box in old}
+    new_ids = {box["id"] for box in new}
+    unmatched_old = [box for box in old if box["id"] not in new_ids]
+    unmatched_new = []
+
+    for box in new:
+        previous = old_by_id.get(box["id"])
+        if previous is None:
+            unmatched_new.append(box)
+            continue
+        fields = _changed_fields(previous, box)
+        if fields:
+            diff.changed[box["id"]] = fields
+
+    # Gierige IoU-Zuordnung der Reste, beste Paare zuerst
+    pairs = sorted(
+        ((_box_iou(a, b), index_a, index_b)
+         for index_a, a in enumerate(unmatched_old)
+         for index_b, b in enumerate(unmatched_new)),
+        reverse=True,
+    )
+    used_old, used_new = set(), set()
+    for overlap, index_a, index_b in pairs:
+        if overlap < min_iou:
+            break
+        if index_a in used_old or index_b in used_new:
+            continue
+        used_old.add(index_a)
+        used_new.add(index_b)
+        a, b = unmatched_old[index_a], unmatched_new[index_b]
+        diff.renamed[a["id"]] = b["id"]
+        fields = _changed_fields(a, b)
+        if fields:
+            diff.changed[b["id"]] = fields
+
+    diff.removed = [box["id"] for index, box in enumerate(unmatched_old) if index not in used_old]
+    diff.added = [dict(box) for index, box in enumerate(unmatched_new) if index not in used_new]
+
+    if [box["id"] for box in apply_diff(old, diff)] != [box["id"] for box in new]:
+        diff.order = [box["id"] for box in new]
+    return diff
+
+
+def apply_diff(boxes: List[Dict[str, Any]], diff: TemplateDiff) -> List[Dict[str, Any]]:
+    """
+    Wendet einen Diff an
+
+    Args:
+        boxes: Ausgangsstand
+        diff: Ergebnis von ``diff_templates``
+
+    Returns:
+        Neuer Stand (neue Dictionaries)
+    """
+    removed = set(diff.removed)
+    result = []
+    for box in boxes:
+        if box["id"] in removed:
+            continue
+        updated = dict(box)
+        updated["id"] = diff.renamed.get(box["id"], box["id"])
+        updated.update(diff.changed.get(updated["id"], {}))
+        result.append(updated)
+    result.extend(dict(box) for box in diff.added)
+
+    if diff.order:
+        position = {box_id: index for index, box_id in enumerate(diff.order)}
+        result.sort(key=lambda box: position.get(box["id"], len(position)))
+    return result
+
+
+class TemplateVersionLog:
+    """
+    Versionslog eines Projekts (eine JSON-Zeile je Version)
+
+    Jede Zeile enthält den Diff zur Vorversion, jede ``SNAPSHOT_INTERVAL``-te zusätzlich
+    den vollständigen Stand, damit die Rekonstruktion nicht über die ganze Historie läuft.
+    """
+
+    def __init__(self, project_dir: str):
+        """
+        Initialisiert das Versionslog
+
+        Args:
+            project_dir: Projekt-Verzeichnis
+        """
+        self.path = os.path.join(project_dir, VERSION_LOG_NAME)
+        self._entries: Optional[List[Dict[str, Any]]] = None
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = [json.loads(line) for line in f if line.strip()]
+        return self._entries
+
+    @property
+    def latest_version(self) -> int:
+        entries = self._load()
+        return entries[-1]["version"] if entries else 0
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """
+        Übersicht aller Versionen
+
+        Returns:
+            Liste mit Version, Zeitstempel, Quelle und Kurzbeschreibung
+        """
+        return [
+            {
+                "version": entry["version"],
+                "timestamp": entry["timestamp"],
+                "source": entry.get("source"),
+                "summary": TemplateDiff.from_dict(entry["diff"]).summary(),
+            }
+            for entry in self._load()
+        ]
+
+    def reconstruct(self, version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Stellt einen Template-Stand wieder her
+
+        Args:
+            version: Gewünschte Version (Standard: neueste)
+
+        Returns:
+            Liste von Box-Dictionaries
+        """
+        entries = self._load()
+        if version is None:
+            version = self.latest_version
+        if version == 0:
+            return []
+        if not 1 <= version <= len(entries):
+            raise ValueError(f"Version {version} existiert nicht (1-{len(entries)})")
+
+        start = version - 1
+        while start > 0 and "snapshot" not in entries[start]:
+            start -= 1
+        boxes = [dict(box) for box in entries[start].get("snapshot", [])]
+        if "snapshot" not in entries[start]:
+            boxes = apply_diff(boxes, TemplateDiff.from_dict(entries[start]["diff"]))
+        for entry in entries[start + 1:version]:
+            boxes = apply_diff(boxes, TemplateDiff.from_dict(entry["diff"]))
+        return boxes
+
+    def append(self, boxes: List[Dict[str, Any]], source: Optional[str] = None) -> Tuple[int, TemplateDiff]:
+        """
+        Legt eine neue Version an, sofern sich der Stand geändert hat
+
+        Args:
+            boxes: Neuer Template-Stand
+            source: Herkunft (z. B. Dateiname des gespeicherten Templates)
+
+        Returns:
+            (Versionsnummer, Diff zur Vorversion); bei unverändertem Stand die bisherige Version
+        """
+        previous = self.reconstruct()
+        diff = diff_templates(previous, boxes)
+        if diff.is_empty and self.latest_version:
+            return self.latest_version, diff
+
+        version = self.latest_version + 1
+        entry: Dict[str, Any] = {
+            "version": version,
+            "timestamp": datetime.now().isoformat(),
+            "source": source,
+            "diff": diff.to_dict(),
+        }
+        if version % SNAPSHOT_INTERVAL == 0:
+            entry["snapshot"] = [dict(box) for box in boxes]
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._load().append(entry)
+        return version, diff
+
+    def diff(self, from_version: int, to_version: Optional[int] = None) -> TemplateDiff:
+        """
+        Diff zwischen zwei gespeicherten Versionen
+
+        Args:
+            from_version: Ausgangsversion
+            to_version: Zielversion (Standard: neueste)
+
+        Returns:
+            TemplateDiff
+        """
+        return diff_templates(self.reconstruct(from_version), self.reconstruct(to_version))
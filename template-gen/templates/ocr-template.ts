@@ -1,5 +1,8 @@
+// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.
+
 import { TemplateLayout } from './use-template-layout';
 import { loadTemplateConfig } from './template';
+import type { ExpectedUnitConfig } from '@/features/ocr';
 
 export type OcrTemplateBox = {
   id: string;
@@ -8,16 +11,19 @@ export type OcrTemplateBox = {
   width: number;
   height: number;
   type?: 'value' | 'checkbox' | 'scrollbar';
+  expectedKeyUnits?: string[] | ExpectedUnitConfig;
+  expectedUnits?: string[] | ExpectedUnitConfig;
+  sameUnitAs?: string;
   options?: {
     orientation?: 'horizontal' | 'vertical';
     cells?: number;
     valuesRegion?: { x: number; y: number; width: number; height: number };
-    checkboxThreshold?: number;
+    blackRatioMin?: number;
+    single?: boolean;
   };
 };
 
-// Default loader: reuse existing template boxes and default type to 'value'.
-// You can later specialize this per layout and annotate JSONs with per-box `type` and `options`.
+// Load OCR template with proper type mapping from JSON configuration
 export function loadOcrTemplate(layout: TemplateLayout): OcrTemplateBox[] {
   return loadTemplateConfig(layout).map((b) => ({
     id: b.id,
@@ -25,8 +31,10 @@ export function loadOcrTemplate(layout: TemplateLayout): OcrTemplateBox[] {
     y: b.y,
     width: b.width,
     height: b.height,
-    type: 'value',
+    type: b.type || 'value', // Use the type from JSON, default to 'value'
+    expectedUnits: b.expectedUnits,
+    expectedKeyUnits: b.expectedKeyUnits,
+    sameUnitAs: b.sameUnitAs,
+    options: b.options, // Include options for checkboxes and scrollbars
   }));
 }
-
-
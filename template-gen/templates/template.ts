@@ -1,3 +1,6 @@
+// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.
+
+import type { ExpectedUnitConfig } from '@/features/ocr';
 
 interface TemplateBox{
   id: string;
@@ -6,6 +9,20 @@ interface TemplateBox{
   width: number;
   height: number;
   label: string;
+  type?: 'value' | 'checkbox' | 'scrollbar';
+  options?: {
+    orientation?: 'horizontal' | 'vertical';
+    cells?: number;
+    valuesRegion?: { x: number; y: number; width: number; height: number };
+    checkboxThreshold?: number;
+    blackRatioMin?: number;
+    readValue?: boolean;
+    valueBoxId?: string;
+    single?: boolean;
+  };
+  sameUnitAs?: string;
+  expectedUnits?: string[] | ExpectedUnitConfig;
+  expectedKeyUnits?: string[] | ExpectedUnitConfig;
 }
 
 enum TemplateLayout {
@@ -20,40 +37,172 @@ enum TemplateLayout {
   CylinderHeating = 'CylinderHeating',
 }
 
-// Statically require all JSON files so Metro can bundle them
-
-import screenDetection from "./0.1 Bildschirmaufbau_Screendetection.json";
-
-const injection: TemplateBox[] = require("./1. Einspritzen.json");
-const injectionSpeedScroll: TemplateBox[] = require(
-  "./1.1 Einspritzgeschwindigkeit_ScrollBar.json",
-);
-const injectionSwitchType: TemplateBox[] = require(
-  "./1.2 Umschaltart_Switch.json",
-);
-const holdingPressure: TemplateBox[] = require("./2. Nachdruck.json");
-const holdingPressureScroll: TemplateBox[] = require(
-  "./2.1 Nachdruck_ScrollBar.json",
-);
-const dosing: TemplateBox[] = require("./3. Dosieren.json");
-const dosingScroll: TemplateBox[] = require("./3.1 Dosieren_ScrollBar.json");
-const cylinderHeating: TemplateBox[] = require("./4. ZylinerHeizung.json");
-
-const TEMPLATE_DATA: Record<TemplateLayout, TemplateBox[]> = {
-  [TemplateLayout.ScreenDetection]: screenDetection,
-  [TemplateLayout.Injection]: injection,
-  [TemplateLayout.InjectionSpeed_ScrollBar]: injectionSpeedScroll,
-  [TemplateLayout.Injection_SwitchType]: injectionSwitchType,
-  [TemplateLayout.HoldingPressure]: holdingPressure,
-  [TemplateLayout.HoldingPressure_ScrollBar]: holdingPressureScroll,
-  [TemplateLayout.Dosing]: dosing,
-  [TemplateLayout.Dosing_ScrollBar]: dosingScroll,
-  [TemplateLayout.CylinderHeating]: cylinderHeating,
+// Normalisierte Geometrie (0..1 des Screens), je Box x, y, Breite, Höhe hintereinander
+const TEMPLATE_GEOMETRY: Record<TemplateLayout, readonly number[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    0.0154, 0.0462, 0.0439, 0.0348, 0.016, 0.1109, 0.0422, 0.0344,
+    0.0151, 0.1756, 0.0445, 0.033, 0.0162, 0.2398, 0.0427, 0.0335,
+    0.0146, 0.3695, 0.0445, 0.0326, 0.0156, 0.4337, 0.0433, 0.0339,
+    0.0145, 0.4983, 0.0439, 0.0344, 0.0156, 0.5623, 0.0427, 0.0326,
+    0.0159, 0.6256, 0.0427, 0.0326, 0.0154, 0.6876, 0.0433, 0.033,
+    0.0979, 0.0004, 0.0436, 0.0337, 0.94, 0.0458, 0.0448, 0.0351,
+    0.941, 0.1122, 0.0448, 0.0337, 0.941, 0.1762, 0.0438, 0.0323,
+    0.939, 0.2393, 0.0476, 0.0337, 0.9429, 0.3055, 0.041, 0.0323,
+    0.939, 0.3697, 0.0467, 0.0344, 0.94, 0.4343, 0.0457, 0.0344,
+    0.9405, 0.4981, 0.0438, 0.0344, 0.9424, 0.5621, 0.0429, 0.0337,
+    0.94, 0.6249, 0.0457, 0.0344,
+  ],
+  [TemplateLayout.Injection]: [
+    0.2268, 0.204, 0.5461, 0.1588, 0.7365, 0.4198, 0.1264, 0.0275,
+    0.7866, 0.5044, 0.035, 0.025,
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    0.0772, 0.7237, 0.0399, 0.067, 0.0776, 0.7228, 0.8492, 0.0682,
+    0.8576, 0.7236, 0.0681, 0.0666,
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    0.1261, 0.1383, 0.027, 0.0202, 0.7255, 0.1618, 0.1375, 0.0276,
+    0.1246, 0.2529, 0.027, 0.0214, 0.7327, 0.278, 0.1093, 0.0293,
+    0.1242, 0.3131, 0.0277, 0.0202, 0.734, 0.3376, 0.1253, 0.0282,
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    0.2259, 0.1795, 0.5477, 0.1571, 0.7369, 0.3701, 0.1084, 0.0321,
+    0.7356, 0.5291, 0.1084, 0.0331, 0.7405, 0.6485, 0.1245, 0.0341,
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    0.0826, 0.725, 0.0292, 0.0683, 0.0835, 0.725, 0.8425, 0.0683,
+    0.8754, 0.7243, 0.0499, 0.0697,
+  ],
+  [TemplateLayout.Dosing]: [
+    0.2245, 0.1806, 0.547, 0.1557, 0.7127, 0.3666, 0.1424, 0.0282,
+    0.7245, 0.4364, 0.1068, 0.0259, 0.0815, 0.6051, 0.3902, 0.0259,
+    0.478, 0.6041, 0.3742, 0.0271, 0.7244, 0.6567, 0.1106, 0.031,
+    0.7242, 0.688, 0.1106, 0.0328,
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    0.0803, 0.626, 0.0303, 0.0636, 0.0817, 0.6264, 0.8465, 0.0629,
+    0.0813, 0.7241, 0.0283, 0.0674, 0.0832, 0.7211, 0.8455, 0.072,
+    0.8728, 0.6262, 0.0571, 0.0653, 0.8721, 0.7196, 0.0558, 0.0714,
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    0.156, 0.34, 0.7323, 0.0351,
+  ],
+};
+
+const TEMPLATE_IDS: Record<TemplateLayout, readonly string[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    "box_1", "box_2", "box_3", "box_4",
+    "box_5", "box_6", "box_7", "box_8",
+    "box_9", "box_10", "box_11", "box_12",
+    "box_13", "box_14", "box_15", "box_16",
+    "box_17", "box_18", "box_19", "box_20",
+    "box_21",
+  ],
+  [TemplateLayout.Injection]: [
+    "injection_profile_modal", "spray_pessure_limit", "increase_specific_point_printer_checkbox",
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    "injection_speed_start", "injection_speed_items", "injection_speed_end",
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    "transshipment_position_checkbox", "transshipment_position", "switch_over_time_checkbox", "switch_over_time",
+    "switching_pressure_checkbox", "switching_pressure",
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    "holding_pressure_profile_modal", "holding_pressure_time", "cooling_time", "screw_diameter",
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    "specific_back_pressure_start", "specific_back_pressure_items", "specific_back_pressure_end",
+  ],
+  [TemplateLayout.Dosing]: [
+    "dosing_profile_modal", "dosing_stroke", "dosing_delay_time", "relieve_dosing",
+    "relieve_after_dosing", "discharge_speed_before", "discharge_speed_after",
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    "dosing_speed_start", "dosing_speed_items", "specific_back_pressure_start", "specific_back_pressure_items",
+    "dosing_speed_end", "specific_back_pressure_end",
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    "cylinder_heating_items",
+  ],
+};
+
+const TEMPLATE_LABELS: Record<TemplateLayout, readonly string[]> = {
+  [TemplateLayout.ScreenDetection]: [
+    "Box 1", "Box 2", "Box 3",
+    "Box 4", "Box 5", "Box 6",
+    "Box 7", "Box 8", "Box 9",
+    "Box 10", "Box 11", "Box 12",
+    "Box 13", "Box 14", "Box 15",
+    "Box 16", "Box 17", "Box 18",
+    "Box 19", "Box 20", "Box 21",
+  ],
+  [TemplateLayout.Injection]: [
+    "Injection Profile Modal", "Spray Pessure Limit", "Increase Specific Point Printer Checkbox",
+  ],
+  [TemplateLayout.InjectionSpeed_ScrollBar]: [
+    "Injection Speed Start", "Injection Speed Items", "Injection Speed End",
+  ],
+  [TemplateLayout.Injection_SwitchType]: [
+    "Transshipment Position Checkbox", "Transshipment Position", "Switch Over Time Checkbox",
+    "Switch Over Time", "Switching Pressure Checkbox", "Switching Pressure",
+  ],
+  [TemplateLayout.HoldingPressure]: [
+    "Holding Pressure Profile Modal", "Holding Pressure Time", "Cooling Time",
+    "Screw Diameter",
+  ],
+  [TemplateLayout.HoldingPressure_ScrollBar]: [
+    "Specific Back Pressure Start", "Specific Back Pressure Items", "Specific Back Pressure End",
+  ],
+  [TemplateLayout.Dosing]: [
+    "Dosing Profile Modal", "Dosing Stroke", "Dosing Delay Time",
+    "Relieve Dosing", "Relieve After Dosing", "Discharge Speed Before",
+    "Discharge Speed After",
+  ],
+  [TemplateLayout.Dosing_ScrollBar]: [
+    "Dosing Speed Start", "Dosing Speed Items", "Specific Back Pressure Start",
+    "Specific Back Pressure Items", "Dosing Speed End", "Specific Back Pressure End",
+  ],
+  [TemplateLayout.CylinderHeating]: [
+    "Cylinder Heating Items",
+  ],
+};
+
+// OCR-Felder je Box-ID (nur Boxen, die welche haben)
+const TEMPLATE_FIELDS: Partial<Record<TemplateLayout, Record<string, Partial<TemplateBox>>>> = {
 };
 
+const TEMPLATE_CACHE: Partial<Record<TemplateLayout, TemplateBox[]>> = {};
+
+// Flache Geometrie ohne Objekt-Erzeugung (z. B. für Overlays): [x0, y0, w0, h0, x1, ...]
+function loadTemplateGeometry(layout: TemplateLayout): readonly number[] {
+  return TEMPLATE_GEOMETRY[layout] ?? [];
+}
+
+function loadTemplateIds(layout: TemplateLayout): readonly string[] {
+  return TEMPLATE_IDS[layout] ?? [];
+}
+
+// Boxen in Prozent wie in den JSON-Templates; werden je Layout einmal gebaut
 function loadTemplateConfig(layout: TemplateLayout): TemplateBox[] {
-  return TEMPLATE_DATA[layout] ?? [];
+  const cached = TEMPLATE_CACHE[layout];
+  if (cached) return cached;
+  const geometry = loadTemplateGeometry(layout);
+  const ids = loadTemplateIds(layout);
+  const labels = TEMPLATE_LABELS[layout] ?? [];
+  const fields = TEMPLATE_FIELDS[layout] ?? {};
+  const boxes: TemplateBox[] = ids.map((id, i) => ({
+    ...fields[id],
+    id,
+    x: geometry[i * 4] * 100,
+    y: geometry[i * 4 + 1] * 100,
+    width: geometry[i * 4 + 2] * 100,
+    height: geometry[i * 4 + 3] * 100,
+    label: labels[i],
+  }));
+  TEMPLATE_CACHE[layout] = boxes;
+  return boxes;
 }
 
 export type { TemplateBox }
-export { TemplateLayout, loadTemplateConfig }
\ No newline at end of file
+export { TemplateLayout, loadTemplateConfig, loadTemplateGeometry, loadTemplateIds }
@@ -1,7 +1,9 @@
+// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.
+
 import { useMemo } from 'react';
 import { Dimensions } from 'react-native';
 import type { OverlayBox } from '@/features/fullscan/types';
-import { TemplateLayout, loadTemplateConfig, type TemplateBox } from './template';
+import { TemplateLayout, loadTemplateGeometry, loadTemplateIds } from './template';
 
 interface UseTemplateLayoutOptions {
   layout: TemplateLayout | null;
@@ -16,13 +18,22 @@ interface UseTemplateLayoutOptions {
   offsetY?: number;
 }
 
-function scaleTemplateBoxes(boxes: TemplateBox[], w: number, h: number, color: string, offsetX: number, offsetY: number): OverlayBox[] {
-  return boxes.map(b => ({
-    id: b.id,
-    x: Math.round((b.x / 100) * w + offsetX),
-    y: Math.round((b.y / 100) * h + offsetY),
-    width: Math.round((b.width / 100) * w),
-    height: Math.round((b.height / 100) * h),
+// Geometrie ist bereits normiert (0..1), daher nur Multiplikation je Koordinate
+function scaleTemplateGeometry(
+  geometry: readonly number[],
+  ids: readonly string[],
+  w: number,
+  h: number,
+  color: string,
+  offsetX: number,
+  offsetY: number,
+): OverlayBox[] {
+  return ids.map((id, i) => ({
+    id,
+    x: Math.round(geometry[i * 4] * w + offsetX),
+    y: Math.round(geometry[i * 4 + 1] * h + offsetY),
+    width: Math.round(geometry[i * 4 + 2] * w),
+    height: Math.round(geometry[i * 4 + 3] * h),
     color,
   }));
 }
@@ -66,11 +77,10 @@ export function useTemplateLayout({
 
   return useMemo(() => {
     if (!layout || w <= 0 || h <= 0) return [];
-    const boxes = loadTemplateConfig(layout);
-    return scaleTemplateBoxes(boxes, w, h, color, resolvedOffsetX, resolvedOffsetY);
+    return scaleTemplateGeometry(
+      loadTemplateGeometry(layout), loadTemplateIds(layout), w, h, color, resolvedOffsetX, resolvedOffsetY,
+    );
   }, [layout, w, h, color, resolvedOffsetX, resolvedOffsetY]);
 }
 
 export { TemplateLayout };
-
-
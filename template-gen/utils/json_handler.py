@@ -2,12 +2,15 @@
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from utils.template_registry import get_registry, resolve_parent_path
 
 
 class JsonHandler:
     @staticmethod
-    def save_template(template_data: List[Dict[str, Any]], project_name: str, base_path: str = "data/templates") -> str:
+    def save_template(template_data: List[Dict[str, Any]], project_name: str, base_path: str = "data/templates",
+                      extends: Optional[str] = None) -> str:
         """
         Speichert Template-Daten im JSON-Format mit relativen Koordinaten
         
@@ -15,6 +18,8 @@ class JsonHandler:
             template_data: Liste von Box-Dictionaries
             project_name: Name des Projekts
             base_path: Basis-Pfad für Templates
+            extends: Name eines Eltern-Templates in ``base_path``; gespeichert werden
+                dann nur neue/geänderte Boxen und entfernte IDs
             
         Returns:
             Pfad zur gespeicherten Datei
@@ -38,8 +43,21 @@ class JsonHandler:
             }
             relative_data.append(relative_box)
         
+        output: Any = relative_data
+        if extends:
+            parent = get_registry().get(resolve_parent_path(extends, filepath))
+            inherited = {box.id: box.to_dict() for box in parent.boxes}
+            own_ids = {box["id"] for box in relative_data}
+            output = {
+                "extends": extends,
+                "boxes": [box for box in relative_data if inherited.get(box["id"]) != box],
+            }
+            removed = [box_id for box_id in inherited if box_id not in own_ids]
+            if removed:
+                output["remove"] = removed
+        
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(relative_data, f, indent=2, ensure_ascii=False)
+            json.dump(output, f, indent=2, ensure_ascii=False)
         
         return filepath
     
@@ -52,15 +70,11 @@ class JsonHandler:
             filepath: Pfad zur JSON-Datei
             
         Returns:
-            Liste von Box-Dictionaries mit relativen Koordinaten
+            Liste von Box-Dictionaries mit relativen Koordinaten, inklusive der App-Felder
+            (``type``, ``options``, ``expectedUnits``, ...)
         """
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"Template file not found: {filepath}")
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        return data
+        # Geparst und validiert wird nur einmal je Dateistand (Registry-Cache)
+        return get_registry().get(filepath).as_dicts(with_extra=True)
     
     @staticmethod
     def save_project_metadata(project_info: Dict[str, Any], base_path: str = "data/projects") -> str:
@@ -0,0 +1,274 @@
+"""Binäres Template-Bundle: alle Templates in einer versionierten, mmap-fähigen Datei"""
+import argparse
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.template_registry import Template, TemplateBox, TemplateRegistry, get_registry
+
+
+BUNDLE_MAGIC = b"PTBN"
+BUNDLE_VERSION = 2
+BUNDLE_EXTENSION = ".ptb"
+
+# Kopf: Magic, Version, reserviert, Anzahl Templates/Boxen/Strings, Offsets der Abschnitte
+_HEADER = struct.Struct("<4sHHIIIIIIII")
+_ALIGNMENT = 16
+
+TEMPLATE_RECORD = np.dtype([("name", "<u4"), ("first_box", "<u4"), ("box_count", "<u4"), ("parent", "<u4")])
+NO_PARENT = 0xFFFFFFFF
+BOX_RECORD = np.dtype([("id", "<u4"), ("label", "<u4")])
+GEOMETRY_DTYPE = np.dtype("<f4")
+
+
+class TemplateBundleError(ValueError):
+    """Datei ist kein gültiges Template-Bundle"""
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class _StringTable:
+    """Dedupliziert Strings (z. B. ``box_1`` kommt in fast jedem Template vor)"""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.encoded: List[bytes] = []
+
+    def add(self, text: str) -> int:
+        index = self._index.get(text)
+        if index is None:
+            index = len(self.encoded)
+            self._index[text] = index
+            self.encoded.append(text.encode("utf-8"))
+        return index
+
+
+def compile_bundle(templates: Iterable[Template], output_path: str,
+                   registry: Optional[TemplateRegistry] = None) -> int:
+    """
+    Schreibt Templates als Bundle
+
+    Layout (little-endian, Abschnitte auf 16 Byte ausgerichtet): Kopf, Template-Records
+    (Name, erste Box, Anzahl, Eltern-Name), Box-Records (ID, Label als String-Index), float32-Geometrie
+    ``(Boxen, 4)`` mit x, y, Breite, Höhe in Prozent, String-Offsets und UTF-8-Daten.
+    Vererbung ist bereits aufgelöst; der Eltern-Name bleibt für die Detektion erhalten.
+
+    Args:
+        templates: Bereits validierte Templates (z. B. aus ``TemplateRegistry.scan``)
+        output_path: Zieldatei; wird atomar ersetzt
+        registry: Registry, deren gecachtes Bundle für ``output_path`` vor dem Ersetzen
+            geschlossen wird (Standard: prozessweite Registry)
+
+    Returns:
+        Anzahl geschriebener Templates
+    """
+    strings = _StringTable()
+    template_records = []
+    box_records = []
+    geometry = []
+    for template in templates:
+        parent = strings.add(template.parent) if template.parent is not None else NO_PARENT
+        template_records.append((strings.add(template.name), len(box_records), len(template.boxes), parent))
+        for box in template.boxes:
+            box_records.append((strings.add(box.id), strings.add(box.label)))
+            geometry.append((box.x, box.y, box.width, box.height))
+
+    template_array = np.array(template_records, dtype=TEMPLATE_RECORD)
+    box_array = np.array(box_records, dtype=BOX_RECORD)
+    geometry_array = np.array(geometry, dtype=GEOMETRY_DTYPE).reshape(-1, 4)
+    string_offsets = np.zeros(len(strings.encoded) + 1, dtype="<u4")
+    np.cumsum([len(item) for item in strings.encoded], out=string_offsets[1:])
+    string_data = b"".join(strings.encoded)
+
+    sections = [template_array.tobytes(), box_array.tobytes(), geometry_array.tobytes(), string_offsets.tobytes()]
+    offsets = []
+    position = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+    string_data_offset = position
+
+    header = _HEADER.pack(
+        BUNDLE_MAGIC, BUNDLE_VERSION, 0,
+        len(template_array), len(box_array), len(strings.encoded),
+        *offsets, string_data_offset,
+    )
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+        f.write(b"\0" * (string_data_offset - f.tell()))
+        f.write(string_data)
+    # Ein noch gemapptes altes Bundle blockiert os.replace unter Windows (PermissionError)
+    (registry or get_registry()).invalidate(output_path)
+    os.replace(tmp_path, output_path)
+    return len(template_array)
+
+
+def compile_directory(directory: str, output_path: str, registry: Optional[TemplateRegistry] = None) -> int:
+    """
+    Packt alle gültigen JSON-Templates eines Verzeichnisses in ein Bundle
+
+    Args:
+        directory: Verzeichnis mit JSON-Templates
+        output_path: Zieldatei
+        registry: Registry zum Laden (Standard: prozessweite Registry)
+
+    Returns:
+        Anzahl geschriebener Templates
+    """
+    registry = registry or get_registry()
+    return compile_bundle(registry.scan(directory).values(), output_path, registry)
+
+
+class TemplateBundle:
+    """
+    Read-only-Sicht auf ein Bundle per ``mmap``
+
+    Geometrie wird als float32-View direkt aus der gemappten Datei geliefert; Strings
+    werden erst beim Zugriff dekodiert. Pro Box entsteht kein Dictionary, solange der
+    Aufrufer nicht ausdrücklich ``template`` verlangt.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # leere Datei
+                raise TemplateBundleError(f"{path}: Leeres Bundle.") from e
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+
+        if len(self._mm) < _HEADER.size:
+            raise TemplateBundleError(f"{path}: Datei zu kurz für ein Bundle.")
+        (magic, version, _, template_count, box_count, string_count,
+         templates_offset, boxes_offset, geometry_offset, strings_offset,
+         string_data_offset) = _HEADER.unpack_from(self._mm, 0)
+        if magic != BUNDLE_MAGIC:
+            raise TemplateBundleError(f"{path}: Kein Template-Bundle.")
+        if version != BUNDLE_VERSION:
+            raise TemplateBundleError(f"{path}: Bundle-Version {version} wird nicht unterstützt (erwartet {BUNDLE_VERSION}).")
+
+        try:
+            self._templates = np.frombuffer(self._mm, TEMPLATE_RECORD, template_count, templates_offset)
+            self._boxes = np.frombuffer(self._mm, BOX_RECORD, box_count, boxes_offset)
+            self._geometry = np.frombuffer(self._mm, GEOMETRY_DTYPE, box_count * 4, geometry_offset).reshape(-1, 4)
+            self._string_offsets = np.frombuffer(self._mm, "<u4", string_count + 1, strings_offset)
+        except ValueError as e:
+            raise TemplateBundleError(f"{path}: Bundle ist abgeschnitten.") from e
+        self._string_data_offset = string_data_offset
+        if string_data_offset + int(self._string_offsets[-1]) > len(self._mm):
+            raise TemplateBundleError(f"{path}: Bundle ist abgeschnitten.")
+
+        self._by_name: Dict[str, int] = {
+            self.string(int(record["name"])): index for index, record in enumerate(self._templates)
+        }
+
+    def string(self, index: int) -> str:
+        start = self._string_data_offset + int(self._string_offsets[index])
+        end = self._string_data_offset + int(self._string_offsets[index + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._by_name)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def _record(self, name: str):
+        try:
+            return self._templates[self._by_name[name]]
+        except KeyError:
+            raise KeyError(f"Template '{name}' nicht im Bundle {self.path}") from None
+
+    def _box_slice(self, name: str) -> slice:
+        record = self._record(name)
+        first = int(record["first_box"])
+        return slice(first, first + int(record["box_count"]))
+
+    def parent(self, name: str) -> Optional[str]:
+        """Name des Eltern-Templates oder ``None``"""
+        index = int(self._record(name)["parent"])
+        return None if index == NO_PARENT else self.string(index)
+
+    def geometry(self, name: str) -> np.ndarray:
+        """
+        Box-Geometrie eines Templates
+
+        Args:
+            name: Template-Name
+
+        Returns:
+            Read-only float32-Array ``(N, 4)``: x, y, Breite, Höhe in Prozent
+        """
+        return self._geometry[self._box_slice(name)]
+
+    def ids(self, name: str) -> List[str]:
+        return [self.string(int(index)) for index in self._boxes["id"][self._box_slice(name)]]
+
+    def labels(self, name: str) -> List[str]:
+        return [self.string(int(index)) for index in self._boxes["label"][self._box_slice(name)]]
+
+    def template(self, name: str) -> Template:
+        """
+        Baut ein vollständiges ``Template`` (für Editor und bestehende Aufrufer)
+
+        Args:
+            name: Template-Name
+
+        Returns:
+            Template mit Pfad und mtime des Bundles
+        """
+        # Kürzeste float32-Darstellung, damit aus 22.68 nicht 22.680000305 wird
+        boxes = tuple(
+            TemplateBox(box_id, *(float(str(value)) for value in row), label)
+            for box_id, label, row in zip(self.ids(name), self.labels(name), self.geometry(name))
+        )
+        return Template(name=name, path=self.path, mtime_ns=self.mtime_ns, boxes=boxes)
+
+    def close(self):
+        """Gibt das Mapping frei, sofern Aufrufer keine ``geometry``-Views mehr halten"""
+        # Die eigenen Views zuerst lösen, sonst scheitert mmap.close() immer mit BufferError
+        empty = np.empty(0, dtype=GEOMETRY_DTYPE)
+        self._templates = np.empty(0, dtype=TEMPLATE_RECORD)
+        self._boxes = np.empty(0, dtype=BOX_RECORD)
+        self._geometry = empty.reshape(-1, 4)
+        self._string_offsets = np.zeros(1, dtype="<u4")
+        self._by_name = {}
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "TemplateBundle":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Packt JSON-Templates in ein binäres Bundle")
+    parser.add_argument("directory", help="Verzeichnis mit JSON-Templates")
+    parser.add_argument("output", nargs="?", help=f"Zieldatei (Standard: <directory>/templates{BUNDLE_EXTENSION})")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(args.directory, f"templates{BUNDLE_EXTENSION}")
+    count = compile_directory(args.directory, output)
+    print(f"{count} Templates nach '{output}' geschrieben ({os.path.getsize(output)} Bytes).")
+
+
+if __name__ == "__main__":
+    main()
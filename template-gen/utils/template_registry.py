@@ -0,0 +1,326 @@
+"""Template-Registry: Templates einmal parsen, validieren und nach Pfad + mtime cachen
+
+Ein Template ist entweder eine flache Liste von Boxen oder ein Objekt, das ein
+Eltern-Layout erweitert::
+
+    {"extends": "0.1 Bildschirmaufbau_Screendetection",
+     "boxes": [...],          # neue Boxen oder Überschreibungen per id
+     "remove": ["box_7"]}     # optional: geerbte Boxen entfernen
+
+``extends`` ist ein Template-Name oder Dateiname im selben Verzeichnis. Die Vererbung
+wird beim Laden aufgelöst; Aufrufer sehen immer die flache Box-Liste.
+"""
+import copy
+import json
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+
+REQUIRED_KEYS = ("id", "x", "y", "width", "height")
+MODELED_KEYS = REQUIRED_KEYS + ("label",)
+
+
+class TemplateValidationError(ValueError):
+    """Template-Datei ist kein gültiges Template"""
+
+
+@dataclass(frozen=True)
+class TemplateBox:
+    """Eine Box in Prozent des Screens; ``extra`` hält alle übrigen Schlüssel (z. B. ``type``)"""
+    id: str
+    x: float
+    y: float
+    width: float
+    height: float
+    label: str
+    extra: Tuple[Tuple[str, Any], ...] = ()
+
+    def to_dict(self, with_label: bool = True, with_extra: bool = False) -> Dict[str, Any]:
+        data = {"id": self.id, "x": self.x, "y": self.y, "width": self.width, "height": self.height}
+        if with_label:
+            data["label"] = self.label
+        if with_extra:
+            # Kopie, damit Aufrufer Listen wie ``options`` ändern dürfen, ohne den Cache zu verändern
+            data.update(copy.deepcopy(dict(self.extra)))
+        return data
+
+
+@dataclass(frozen=True)
+class Template:
+    """Geparstes, validiertes Template"""
+    name: str
+    path: str
+    mtime_ns: int
+    boxes: Tuple[TemplateBox, ...]
+    parent_path: Optional[str] = None  # direktes Eltern-Template (bei "extends")
+    sources: Tuple[str, ...] = ()  # alle Dateien der Vererbungskette, das Template selbst zuerst
+
+    @property
+    def parent(self) -> Optional[str]:
+        """Name des direkten Eltern-Templates"""
+        if self.parent_path is None:
+            return None
+        return os.path.splitext(os.path.basename(self.parent_path))[0]
+
+    def as_dicts(self, with_label: bool = True, with_extra: bool = False) -> List[Dict[str, Any]]:
+        """
+        Gibt die Boxen als neue Dictionaries zurück (für bestehende Aufrufer)
+
+        Args:
+            with_label: Label mit ausgeben
+            with_extra: Nicht modellierte Schlüssel (``type``, ``options``, ...) mit ausgeben
+
+        Returns:
+            Liste von Box-Dictionaries, die der Aufrufer verändern darf
+        """
+        return [box.to_dict(with_label, with_extra) for box in self.boxes]
+
+
+def parse_template(data: Any, source: str = "<template>", allow_empty: bool = False) -> Tuple[TemplateBox, ...]:
+    """
+    Validiert und normalisiert rohe Template-Daten
+
+    Einträge ohne die Pflichtfelder werden übersprungen; ohne gültige Box ist
+    das Template ungültig (außer mit ``allow_empty``, z. B. bei geerbten Boxen).
+
+    Args:
+        data: Geladenes JSON (Liste von Box-Objekten)
+        source: Name für Fehlermeldungen
+        allow_empty: Leere Box-Liste zulassen
+
+    Returns:
+        Tupel von TemplateBox
+    """
+    if not isinstance(data, list):
+        raise TemplateValidationError(f"{source}: Template JSON muss eine Liste sein.")
+
+    boxes = []
+    for item in data:
+        if not isinstance(item, dict) or not all(key in item for key in REQUIRED_KEYS):
+            continue
+        try:
+            boxes.append(TemplateBox(
+                id=str(item["id"]),
+                x=float(item["x"]),
+                y=float(item["y"]),
+                width=float(item["width"]),
+                height=float(item["height"]),
+                label=str(item.get("label", f"Box {len(boxes) + 1}")),
+                extra=tuple((key, value) for key, value in item.items() if key not in MODELED_KEYS),
+            ))
+        except (TypeError, ValueError):
+            continue
+
+    if not boxes and not allow_empty:
+        raise TemplateValidationError(f"{source}: Keine gültigen Boxen in JSON gefunden.")
+    return tuple(boxes)
+
+
+def merge_boxes(
+    parent: Tuple[TemplateBox, ...],
+    own: Tuple[TemplateBox, ...],
+    remove: Tuple[str, ...] = (),
+) -> Tuple[TemplateBox, ...]:
+    """
+    Löst die Vererbung auf: geerbte Boxen in Eltern-Reihenfolge, gleiche IDs werden
+    an Ort und Stelle überschrieben, neue Boxen hinten angehängt. Eine Überschreibung
+    ohne eigene Zusatzfelder behält die des Eltern-Templates.
+
+    Args:
+        parent: Boxen des (bereits aufgelösten) Eltern-Templates
+        own: Boxen des Kind-Templates
+        remove: IDs geerbter Boxen, die entfallen
+
+    Returns:
+        Flaches Tupel von TemplateBox
+    """
+    overrides = {box.id: box for box in own}
+    removed = set(remove)
+    merged = []
+    for box in parent:
+        if box.id in removed:
+            continue
+        override = overrides.pop(box.id, None)
+        if override is None:
+            merged.append(box)
+        else:
+            merged.append(override if override.extra else replace(override, extra=box.extra))
+    merged.extend(box for box in own if box.id in overrides)
+    return tuple(merged)
+
+
+def resolve_parent_path(reference: str, child_path: str) -> str:
+    """Pfad des Eltern-Templates; ``reference`` ist Name oder Dateiname relativ zum Kind"""
+    filename = reference if reference.endswith(".json") else f"{reference}.json"
+    return os.path.join(os.path.dirname(child_path), filename)
+
+
+class TemplateRegistry:
+    """
+    Gemeinsamer Cache für alle Template-Konsumenten
+
+    Jede Datei wird genau einmal gelesen und validiert. Ein erneuter Zugriff kostet
+    nur ein ``stat``; ändern sich mtime oder Größe, wird die Datei neu geparst.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Pfad -> (Signaturen aller Dateien der Vererbungskette, Template)
+        self._cache: Dict[str, Tuple[Tuple[Tuple[str, Tuple[int, int]], ...], Template]] = {}
+        self._bundles: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str) -> Template:
+        """
+        Liefert das geparste Template einer Datei
+
+        Bei ``extends`` wird die Kette einmal aufgelöst; der Cache-Eintrag bleibt gültig,
+        solange sich keine Datei der Kette ändert.
+
+        Args:
+            path: Pfad zur JSON-Datei
+
+        Returns:
+            Template (aus dem Cache, falls unverändert)
+        """
+        return self._get(self._key(path), path, ())[1]
+
+    def _get(self, key: str, path: str, chain: Tuple[str, ...]):
+        if key in chain:
+            names = " -> ".join(os.path.basename(item) for item in chain + (key,))
+            raise TemplateValidationError(f"Zyklische Vererbung: {names}")
+        signature = self._signature(key)
+        if signature is None:
+            with self._lock:
+                self._cache.pop(key, None)
+            raise FileNotFoundError(f"Template file not found: {path}")
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0][0] == (key, signature) and all(
+            self._signature(source) == source_signature for source, source_signature in cached[0][1:]
+        ):
+            return cached
+
+        with open(key, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        source = os.path.basename(key)
+        dependencies: Tuple[Tuple[str, Tuple[int, int]], ...] = ((key, signature),)
+        parent: Optional[Template] = None
+
+        if isinstance(data, dict):
+            reference = data.get("extends")
+            if reference is not None and not isinstance(reference, str):
+                raise TemplateValidationError(f"{source}: 'extends' muss ein Template-Name sein.")
+            own = parse_template(data.get("boxes", []), source, allow_empty=reference is not None)
+            if reference is None:
+                boxes = own
+            else:
+                parent_path = resolve_parent_path(reference, key)
+                parent_dependencies, parent = self._get(self._key(parent_path), parent_path, chain + (key,))
+                boxes = merge_boxes(parent.boxes, own, tuple(str(item) for item in data.get("remove", [])))
+                if not boxes:
+                    raise TemplateValidationError(f"{source}: Keine Boxen nach Auflösung von '{reference}'.")
+                dependencies += parent_dependencies
+        else:
+            boxes = parse_template(data, source)
+
+        template = Template(
+            name=os.path.splitext(source)[0],
+            path=key,
+            mtime_ns=signature[0],
+            boxes=boxes,
+            parent_path=parent.path if parent is not None else None,
+            sources=tuple(item for item, _ in dependencies),
+        )
+        with self._lock:
+            self._cache[key] = (dependencies, template)
+        return dependencies, template
+
+    def scan(self, directory: str) -> Dict[str, Template]:
+        """
+        Lädt alle Templates eines Verzeichnisses; ungültige Dateien werden ausgelassen
+
+        Args:
+            directory: Verzeichnis mit JSON-Templates
+
+        Returns:
+            Dictionary Template-Name -> Template, nach Namen sortiert
+        """
+        templates: Dict[str, Template] = {}
+        if not os.path.isdir(directory):
+            return templates
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                template = self.get(os.path.join(directory, filename))
+            except (TemplateValidationError, ValueError, OSError) as e:
+                print(f"Template '{filename}' übersprungen: {e}")
+                continue
+            templates[template.name] = template
+        return templates
+
+    def bundle(self, path: str):
+        """
+        Öffnet ein binäres Template-Bundle (siehe ``utils.template_bundle``)
+
+        Args:
+            path: Pfad zur Bundle-Datei
+
+        Returns:
+            TemplateBundle (aus dem Cache, falls unverändert)
+        """
+        from utils.template_bundle import TemplateBundle
+
+        key = self._key(path)
+        stat = os.stat(key)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._bundles.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+        bundle = TemplateBundle(key)
+        with self._lock:
+            stale = self._bundles.get(key)
+            self._bundles[key] = (signature, bundle)
+        if stale is not None:
+            # Veraltetes Mapping freigeben, sonst bleibt die alte Datei bis zum GC geöffnet
+            stale[1].close()
+        return bundle
+
+    def invalidate(self, path: Optional[str] = None):
+        """Verwirft einen oder alle Cache-Einträge; verworfene Bundles werden geschlossen"""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+                evicted = list(self._bundles.values())
+                self._bundles.clear()
+            else:
+                self._cache.pop(self._key(path), None)
+                entry = self._bundles.pop(self._key(path), None)
+                evicted = [] if entry is None else [entry]
+        for _, bundle in evicted:
+            bundle.close()
+
+
+_registry = TemplateRegistry()
+
+
+def get_registry() -> TemplateRegistry:
+    """Prozessweite Registry"""
+    return _registry
@@ -0,0 +1,399 @@
+"""TypeScript-Export: erzeugt die Template-Module der App aus den JSON-Templates
+
+Erzeugt werden ``template.ts`` (Layouts, normalisierte Geometrie als flache Arrays,
+Loader), ``ocr-template.ts`` und ``use-template-layout.ts``. Die Geometrie wird hier
+einmal aufgelöst (inkl. ``extends``) und auf 0..1 normiert, damit die App zur Laufzeit
+kein JSON parsen und nicht pro Box durch 100 teilen muss. Dateien werden nur
+geschrieben, wenn sich ihr Inhalt tatsächlich geändert hat.
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.template_registry import Template, TemplateRegistry, get_registry
+
+
+# Enum-Schlüssel der App -> Template-Name (Dateiname ohne .json), in Enum-Reihenfolge
+LAYOUTS: Tuple[Tuple[str, str], ...] = (
+    ("ScreenDetection", "0.1 Bildschirmaufbau_Screendetection"),
+    ("Injection", "1. Einspritzen"),
+    ("InjectionSpeed_ScrollBar", "1.1 Einspritzgeschwindigkeit_ScrollBar"),
+    ("Injection_SwitchType", "1.2 Umschaltart_Switch"),
+    ("HoldingPressure", "2. Nachdruck"),
+    ("HoldingPressure_ScrollBar", "2.1 Nachdruck_ScrollBar"),
+    ("Dosing", "3. Dosieren"),
+    ("Dosing_ScrollBar", "3.1 Dosieren_ScrollBar"),
+    ("CylinderHeating", "4. ZylinerHeizung"),
+)
+
+# Felder, die nur die App auswertet (OCR-Typ, Einheiten); die Registry führt sie als ``extra``
+APP_KEYS = ("type", "options", "sameUnitAs", "expectedUnits", "expectedKeyUnits")
+GEOMETRY_DECIMALS = 6
+GENERATED_HEADER = "// Automatisch erzeugt von template-gen (python -m utils.ts_exporter). Nicht von Hand bearbeiten.\n"
+
+
+def app_fields(template: Template) -> Dict[str, Dict[str, Any]]:
+    """
+    Sammelt die App-Felder je Box-ID (Vererbung ist in der Registry bereits aufgelöst)
+
+    Args:
+        template: Aufgelöstes Template aus der Registry
+
+    Returns:
+        Dictionary Box-ID -> App-Felder (Kind überschreibt Eltern)
+    """
+    fields: Dict[str, Dict[str, Any]] = {}
+    for box in template.boxes:
+        extra = {key: value for key, value in box.extra if key in APP_KEYS}
+        if extra:
+            fields[box.id] = extra
+    return fields
+
+
+def _number(value: float) -> str:
+    text = f"{round(value, GEOMETRY_DECIMALS):.{GEOMETRY_DECIMALS}f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+def _string(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _layout_block(key: str, values: List[str], per_line: int) -> List[str]:
+    lines = [f"  [TemplateLayout.{key}]: ["]
+    for start in range(0, len(values), per_line):
+        lines.append("    " + ", ".join(values[start:start + per_line]) + ",")
+    lines.append("  ],")
+    return lines
+
+
+def render_template_module(templates: Sequence[Tuple[str, Template]]) -> str:
+    """
+    Erzeugt ``template.ts``
+
+    Args:
+        templates: (Enum-Schlüssel, Template) in Enum-Reihenfolge
+
+    Returns:
+        Quelltext des Moduls
+    """
+    out = [GENERATED_HEADER, "import type { ExpectedUnitConfig } from '@/features/ocr';", ""]
+    out += [
+        "interface TemplateBox{",
+        "  id: string;",
+        "  x: number;",
+        "  y: number;",
+        "  width: number;",
+        "  height: number;",
+        "  label: string;",
+        "  type?: 'value' | 'checkbox' | 'scrollbar';",
+        "  options?: {",
+        "    orientation?: 'horizontal' | 'vertical';",
+        "    cells?: number;",
+        "    valuesRegion?: { x: number; y: number; width: number; height: number };",
+        "    checkboxThreshold?: number;",
+        "    blackRatioMin?: number;",
+        "    readValue?: boolean;",
+        "    valueBoxId?: string;",
+        "    single?: boolean;",
+        "  };",
+        "  sameUnitAs?: string;",
+        "  expectedUnits?: string[] | ExpectedUnitConfig;",
+        "  expectedKeyUnits?: string[] | ExpectedUnitConfig;",
+        "}",
+        "",
+        "enum TemplateLayout {",
+    ]
+    out += [f"  {key} = '{key}'," for key, _ in templates]
+    out += ["}", ""]
+
+    out += [
+        "// Normalisierte Geometrie (0..1 des Screens), je Box x, y, Breite, Höhe hintereinander",
+        "const TEMPLATE_GEOMETRY: Record<TemplateLayout, readonly number[]> = {",
+    ]
+    for key, template in templates:
+        values = [_number(value / 100.0) for box in template.boxes
+                  for value in (box.x, box.y, box.width, box.height)]
+        out += _layout_block(key, values, 8)
+    out += ["};", "", "const TEMPLATE_IDS: Record<TemplateLayout, readonly string[]> = {"]
+    for key, template in templates:
+        out += _layout_block(key, [_string(box.id) for box in template.boxes], 4)
+    out += ["};", "", "const TEMPLATE_LABELS: Record<TemplateLayout, readonly string[]> = {"]
+    for key, template in templates:
+        out += _layout_block(key, [_string(box.label) for box in template.boxes], 3)
+    out += ["};", ""]
+
+    out += [
+        "// OCR-Felder je Box-ID (nur Boxen, die welche haben)",
+        "const TEMPLATE_FIELDS: Partial<Record<TemplateLayout, Record<string, Partial<TemplateBox>>>> = {",
+    ]
+    for key, template in templates:
+        fields = app_fields(template)
+        if not fields:
+            continue
+        out.append(f"  [TemplateLayout.{key}]: {{")
+        for box_id, extra in fields.items():
+            out.append(f"    {_string(box_id)}: {json.dumps(extra, ensure_ascii=False, sort_keys=True)},")
+        out.append("  },")
+    out += ["};", ""]
+
+    out += [
+        "const TEMPLATE_CACHE: Partial<Record<TemplateLayout, TemplateBox[]>> = {};",
+        "",
+        "// Flache Geometrie ohne Objekt-Erzeugung (z. B. für Overlays): [x0, y0, w0, h0, x1, ...]",
+        "function loadTemplateGeometry(layout: TemplateLayout): readonly number[] {",
+        "  return TEMPLATE_GEOMETRY[layout] ?? [];",
+        "}",
+        "",
+        "function loadTemplateIds(layout: TemplateLayout): readonly string[] {",
+        "  return TEMPLATE_IDS[layout] ?? [];",
+        "}",
+        "",
+        "// Boxen in Prozent wie in den JSON-Templates; werden je Layout einmal gebaut",
+        "function loadTemplateConfig(layout: TemplateLayout): TemplateBox[] {",
+        "  const cached = TEMPLATE_CACHE[layout];",
+        "  if (cached) return cached;",
+        "  const geometry = loadTemplateGeometry(layout);",
+        "  const ids = loadTemplateIds(layout);",
+        "  const labels = TEMPLATE_LABELS[layout] ?? [];",
+        "  const fields = TEMPLATE_FIELDS[layout] ?? {};",
+        "  const boxes: TemplateBox[] = ids.map((id, i) => ({",
+        "    ...fields[id],",
+        "    id,",
+        "    x: geometry[i * 4] * 100,",
+        "    y: geometry[i * 4 + 1] * 100,",
+        "    width: geometry[i * 4 + 2] * 100,",
+        "    height: geometry[i * 4 + 3] * 100,",
+        "    label: labels[i],",
+        "  }));",
+        "  TEMPLATE_CACHE[layout] = boxes;",
+        "  return boxes;",
+        "}",
+        "",
+        "export type { TemplateBox }",
+        "export { TemplateLayout, loadTemplateConfig, loadTemplateGeometry, loadTemplateIds }",
+        "",
+    ]
+    return "\n".join(out)
+
+
+OCR_TEMPLATE_MODULE = GENERATED_HEADER + """
+import { TemplateLayout } from './use-template-layout';
+import { loadTemplateConfig } from './template';
+import type { ExpectedUnitConfig } from '@/features/ocr';
+
+export type OcrTemplateBox = {
+  id: string;
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+  type?: 'value' | 'checkbox' | 'scrollbar';
+  expectedKeyUnits?: string[] | ExpectedUnitConfig;
+  expectedUnits?: string[] | ExpectedUnitConfig;
+  sameUnitAs?: string;
+  options?: {
+    orientation?: 'horizontal' | 'vertical';
+    cells?: number;
+    valuesRegion?: { x: number; y: number; width: number; height: number };
+    blackRatioMin?: number;
+    single?: boolean;
+  };
+};
+
+// Load OCR template with proper type mapping from JSON configuration
+export function loadOcrTemplate(layout: TemplateLayout): OcrTemplateBox[] {
+  return loadTemplateConfig(layout).map((b) => ({
+    id: b.id,
+    x: b.x,
+    y: b.y,
+    width: b.width,
+    height: b.height,
+    type: b.type || 'value', // Use the type from JSON, default to 'value'
+    expectedUnits: b.expectedUnits,
+    expectedKeyUnits: b.expectedKeyUnits,
+    sameUnitAs: b.sameUnitAs,
+    options: b.options, // Include options for checkboxes and scrollbars
+  }));
+}
+"""
+
+USE_TEMPLATE_LAYOUT_MODULE = GENERATED_HEADER + """
+import { useMemo } from 'react';
+import { Dimensions } from 'react-native';
+import type { OverlayBox } from '@/features/fullscan/types';
+import { TemplateLayout, loadTemplateGeometry, loadTemplateIds } from './template';
+
+interface UseTemplateLayoutOptions {
+  layout: TemplateLayout | null;
+  viewportWidth?: number;
+  viewportHeight?: number;
+  color?: string;
+  widthPercent?: number; // 0..1, default 0.75 (75% of screen width)
+  aspectRatio?: number;  // width/height, default 3/4
+  containerWidth?: number;
+  containerHeight?: number;
+  offsetX?: number;
+  offsetY?: number;
+}
+
+// Geometrie ist bereits normiert (0..1), daher nur Multiplikation je Koordinate
+function scaleTemplateGeometry(
+  geometry: readonly number[],
+  ids: readonly string[],
+  w: number,
+  h: number,
+  color: string,
+  offsetX: number,
+  offsetY: number,
+): OverlayBox[] {
+  return ids.map((id, i) => ({
+    id,
+    x: Math.round(geometry[i * 4] * w + offsetX),
+    y: Math.round(geometry[i * 4 + 1] * h + offsetY),
+    width: Math.round(geometry[i * 4 + 2] * w),
+    height: Math.round(geometry[i * 4 + 3] * h),
+    color,
+  }));
+}
+
+export function useTemplateLayout({
+                                    layout,
+                                    viewportWidth,
+                                    viewportHeight,
+                                    color = '#00FF88',
+                                    widthPercent,
+                                    aspectRatio,
+                                    containerWidth,
+                                    containerHeight,
+                                    offsetX,
+                                    offsetY,
+                                  }: UseTemplateLayoutOptions): OverlayBox[] {
+  const screen = Dimensions.get('window');
+  const containerW = containerWidth ?? screen.width;
+  const containerH = containerHeight ?? screen.height;
+
+  const effectiveWidthPercent = widthPercent ?? 0.75; // 75% of width by default
+  const effectiveAspectRatio = aspectRatio ?? (3 / 4); // width/height = 3/4 by default
+
+  let targetW = viewportWidth;
+  let targetH = viewportHeight;
+
+  if (targetW == null && targetH == null) {
+    targetW = Math.round(effectiveWidthPercent * containerW);
+    targetH = Math.round(targetW / effectiveAspectRatio);
+  } else if (targetW != null && targetH == null) {
+    targetH = Math.round(targetW / effectiveAspectRatio);
+  } else if (targetH != null && targetW == null) {
+    targetW = Math.round(targetH * effectiveAspectRatio);
+  }
+
+  const w = targetW ?? 0;
+  const h = targetH ?? 0;
+
+  const resolvedOffsetX = offsetX ?? Math.round((containerW - w) / 2);
+  const resolvedOffsetY = offsetY ?? Math.round((containerH - h) / 2);
+
+  return useMemo(() => {
+    if (!layout || w <= 0 || h <= 0) return [];
+    return scaleTemplateGeometry(
+      loadTemplateGeometry(layout), loadTemplateIds(layout), w, h, color, resolvedOffsetX, resolvedOffsetY,
+    );
+  }, [layout, w, h, color, resolvedOffsetX, resolvedOffsetY]);
+}
+
+export { TemplateLayout };
+"""
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Schreibt eine Datei nur bei geändertem Inhalt (atomar ersetzt)
+
+    Args:
+        path: Zieldatei
+        content: Neuer Inhalt
+
+    Returns:
+        True, wenn geschrieben wurde
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def export_typescript(directory: str, output_dir: Optional[str] = None,
+                      layouts: Sequence[Tuple[str, str]] = LAYOUTS,
+                      registry: Optional[TemplateRegistry] = None) -> List[str]:
+    """
+    Erzeugt die TypeScript-Module der App aus einem Template-Verzeichnis
+
+    Args:
+        directory: Verzeichnis mit JSON-Templates
+        output_dir: Zielverzeichnis (Standard: ``directory``)
+        layouts: (Enum-Schlüssel, Template-Name) in Enum-Reihenfolge
+        registry: Registry zum Laden (Standard: prozessweite Registry)
+
+    Returns:
+        Pfade der tatsächlich geschriebenen Dateien
+    """
+    registry = registry or get_registry()
+    output_dir = output_dir or directory
+    templates = [
+        (key, registry.get(os.path.join(directory, f"{name}.json"))) for key, name in layouts
+    ]
+    modules = {
+        "template.ts": render_template_module(templates),
+        "ocr-template.ts": OCR_TEMPLATE_MODULE,
+        "use-template-layout.ts": USE_TEMPLATE_LAYOUT_MODULE,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for filename, content in modules.items():
+        path = os.path.join(output_dir, filename)
+        if write_if_changed(path, content):
+            written.append(path)
+    return written
+
+
+def _parse_layout(text: str) -> Tuple[str, str]:
+    key, sep, name = text.partition("=")
+    if not sep or not key or not name:
+        raise argparse.ArgumentTypeError(f"Erwartet SCHLÜSSEL=Template-Name, erhalten '{text}'")
+    return key, name[:-len(".json")] if name.endswith(".json") else name
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Erzeugt die TypeScript-Template-Module der App")
+    parser.add_argument("directory", help="Verzeichnis mit JSON-Templates")
+    parser.add_argument("--output", help="Zielverzeichnis (Standard: <directory>)")
+    parser.add_argument("--layout", action="append", type=_parse_layout, default=[], metavar="KEY=NAME",
+                        help="Template eines Layouts überschreiben, z. B. "
+                             "ScreenDetection='0.12 Bildschirmaufbau_Screendetection'")
+    args = parser.parse_args(argv)
+
+    overrides = dict(args.layout)
+    unknown = set(overrides) - {key for key, _ in LAYOUTS}
+    if unknown:
+        parser.error(f"Unbekannte Layouts: {', '.join(sorted(unknown))}")
+    layouts = [(key, overrides.get(key, name)) for key, name in LAYOUTS]
+
+    written = export_typescript(args.directory, args.output, layouts)
+    if written:
+        for path in written:
+            print(f"Geschrieben: {path}")
+    else:
+        print("TypeScript-Module sind aktuell, nichts geschrieben.")
+
+
+if __name__ == "__main__":
+    main()